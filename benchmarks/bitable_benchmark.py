@@ -0,0 +1,91 @@
+"""
+多维表格读写性能评估：在本地启动飞书开放接口的替身，依次测量以下场景的耗时与请求数。
+1. 新增：目标多维表格为空，写入全部记录。
+2. 未变化：数据与快照一致，跳过写入。
+3. 更新：修改部分记录，原地更新。
+4. 读取：通过多维表格仓库查询全部记录。
+运行方式：`python benchmarks/bitable_benchmark.py --rows 20000 --latency 0.05`
+"""
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable
+
+import duckdb
+from click import command, option, help_option, INT, FLOAT
+from rich.console import Console
+from rich.table import Table
+
+from duckcp.configuration.logging_configuration import enable_logging_configuration
+from duckcp.configuration.meta_configuration import enable_metadata_configuration
+from duckcp.feishu.server import FeiShuServer, MAX_PAGE_SIZE
+from duckcp.service import meta_service, repository_service, storage_service, transformer_service
+
+
+def prepare(file: str, rows: int, columns: int, changed: float = 0.0):
+    """
+    生成来源数据：按比例修改部分记录。
+    """
+    with duckdb.connect(file) as connection:
+        connection.execute(f'''
+          create or replace table data as
+          select
+            range as id,
+            {', '.join(f"'value-' || (range * {column}) as c{column}" for column in range(1, columns + 1))},
+            if(range % {round(1 / changed) if changed else rows + 1} = 0, 'changed', 'original') as state
+          from
+            range({rows})
+        ''')
+
+
+@command(help='评估多维表格的读写性能')
+@option('--rows', type=INT, metavar='N', default=10000, show_default=True, help='记录数')
+@option('--columns', type=INT, metavar='N', default=8, show_default=True, help='文本列数')
+@option('--changed', type=FLOAT, metavar='RATIO', default=0.1, show_default=True, help='更新场景中修改的记录比例')
+@option('--latency', type=FLOAT, metavar='SECONDS', default=0.0, show_default=True, help='替身每个请求的额外延迟')
+@option('--page-size', type=INT, metavar='N', default=MAX_PAGE_SIZE, show_default=True, help='替身分页查询单页最多返回的记录数')
+@option('-v', '--verbose', is_flag=True, help='输出迁移日志')
+@help_option('-h', '--help', help='展示帮助信息')
+def main(rows: int, columns: int, changed: float, latency: float, page_size: int, verbose: bool):
+    enable_logging_configuration(None, [], True, False, not verbose)
+    table = Table(title=f'多维表格读写性能：{rows}行 × {columns + 2}列，延迟{latency}秒')
+    table.add_column('场景', no_wrap=True)
+    table.add_column('耗时(秒)', justify='right')
+    table.add_column('请求数', justify='right')
+    table.add_column('行/秒', justify='right')
+
+    with TemporaryDirectory() as folder, FeiShuServer(latency=latency, page_size=page_size) as server:
+        enable_metadata_configuration(join(folder, 'configuration.db'))
+        meta_service.meta_create()
+        source = join(folder, 'source.duckdb')
+        script = join(folder, 'script.sql')
+        with open(script, 'w', encoding='utf-8') as output:
+            output.write('select * from data order by id')
+        repository_service.repository_create('source', 'duckdb', {'file': source})
+        repository_service.repository_create('bitable', 'bitable', {
+            'access_key': 'benchmark',
+            'access_secret': 'benchmark',
+            'open_api': server.open_api,
+        })
+        storage_service.storage_create('bitable', 'data', {'document': 'benchmark', 'table': 'data'})
+        transformer_service.transformer_create('benchmark', 'source', 'bitable', 'data', script)
+
+        def measure(scenario: str, action: Callable[[], None]):
+            requests = server.requests.total()
+            started_at = perf_counter()
+            action()
+            elapsed = perf_counter() - started_at
+            table.add_row(scenario, f'{elapsed:.3f}', str(server.requests.total() - requests), f'{rows / elapsed:.0f}')
+
+        prepare(source, rows, columns)
+        measure('新增', lambda: transformer_service.transformer_execute('benchmark'))
+        measure('未变化', lambda: transformer_service.transformer_execute('benchmark'))
+        prepare(source, rows, columns, changed)
+        measure('更新', lambda: transformer_service.transformer_execute('benchmark'))
+        measure('读取', lambda: repository_service.repository_execute('bitable', 'select count(*) from data'))
+
+    Console().print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from click import Choice, Tuple
 
 from duckcp.configuration.logging_configuration import enable_logging_configuration
 from duckcp.configuration.meta_configuration import enable_metadata_configuration
+from duckcp.service import meta_service
 
 
 @click.group(help='数据同步工具')
@@ -19,3 +20,4 @@ from duckcp.configuration.meta_configuration import enable_metadata_configuratio
 def app(config_file: str, logging_file: str, logging: list[tuple[str, str]], message_only: bool, verbose: bool, quiet: bool) -> None:
     enable_logging_configuration(logging_file, logging, message_only, not quiet and verbose, quiet)
     enable_metadata_configuration(config_file)
+    meta_service.meta_upgrade()  # 已有的元信息数据库自动执行新增的迁移脚本
@@ -30,16 +30,26 @@ def repository():
 @option('--database', metavar='DATABASE', help='数据库名；用于[postgres]')
 @option('--username', metavar='USERNAME', help='登入用户；用于[postgres]')
 @option('--password', metavar='PASSWORD', help='登入密码；用于[postgres]')
+@option('--copy/--no-copy', is_flag=True, default=None, help='通过COPY导出查询结果；用于[postgres]')
+@option('--staging/--no-staging', is_flag=True, default=None, help='迁移时先通过COPY并行写入暂存表，再替换目标表的数据；需要在目标模式下建表的权限；用于[postgres]')
+@option('--writers', type=click.INT, metavar='WRITERS', help='通过暂存表迁移时并行写入的连接数；用于[postgres]')
 # ODPS
 @option('--end-point', metavar='END-POINT', help='地址；用于[odps]')
 @option('--project', metavar='PROJECT', help='项目；用于[odps]')
 # ODPS；BiTable
 @option('--access-key', metavar='KEY', help='凭证编码；用于[odps；bitable]')
 @option('--access-secret', metavar='SECRET', help='凭证密钥；用于[odps；bitable]')
+# BiTable
+@option('--open-api', metavar='URL', help='开放接口地址，默认为https://open.feishu.cn/open-apis；用于[bitable]')
 # DuckDB; SQLite
 @option('--file', metavar='FILE', help='文件；用于[duckdb；sqlite]')
 # File
 @option('--folder', metavar='FOLDER', help='目录；用于[file]')
+# DuckDB；File；BiTable；Federation
+@option('--threads', type=click.INT, metavar='THREADS', help='线程数：DuckDB的计算线程或MaxCompute的下载线程；用于[duckdb；file；bitable；federation；odps]')
+@option('--memory-limit', metavar='LIMIT', help='DuckDB内存上限，例如4GB；用于[duckdb；file；bitable；federation]')
+@option('--temp-directory', metavar='FOLDER', help='DuckDB临时文件目录，也用于存放Postgres的COPY导出文件；用于[duckdb；file；bitable；federation；postgres]')
+@option('--preserve-insertion-order/--no-preserve-insertion-order', is_flag=True, default=None, help='DuckDB是否保留插入顺序；用于[duckdb；file；bitable；federation]')
 # Others
 @help_option('-h', '--help', help='展示帮助信息')
 def repository_create(
@@ -51,22 +61,33 @@ def repository_create(
         database: str,
         username: str,
         password: str,
+        copy: bool,
+        staging: bool,
+        writers: int,
         # ODPS; BiTable
         end_point: str,
         project: str,
         access_key: str,
         access_secret: str,
+        # BiTable
+        open_api: str,
         # DuckDB; SQLite
         file: str,
         # File
         folder: str,
+        # DuckDB；File；BiTable；Federation
+        threads: int,
+        memory_limit: str,
+        temp_directory: str,
+        preserve_insertion_order: bool,
 ):
     logger.debug(
-        'name=%s, kind=%s, host=%s, port=%s, database=%s, username=%s, end_point=%s, project=%s, access_key=%s, file=%s, folder=%s',
+        'name=%s, kind=%s, host=%s, port=%s, database=%s, username=%s, copy=%s, staging=%s, writers=%s, end_point=%s, project=%s, access_key=%s, open_api=%s, file=%s, folder=%s, threads=%s, memory_limit=%s, temp_directory=%s, preserve_insertion_order=%s',
         name, kind,
-        host, port, database, username,
-        end_point, project, access_key,
+        host, port, database, username, copy, staging, writers,
+        end_point, project, access_key, open_api,
         file, folder,
+        threads, memory_limit, temp_directory, preserve_insertion_order,
     )
     repository_service.repository_create(name, kind, {
         'host': host or None,
@@ -74,12 +95,20 @@ def repository_create(
         'database': database or None,
         'username': username or None,
         'password': password or None,
+        'copy': copy,
+        'staging': staging,
+        'writers': writers or None,
         'end_point': end_point or None,
         'project': project or None,
         'access_key': access_key or None,
         'access_secret': access_secret or None,
+        'open_api': open_api or None,
         'file': absolute_path(file) if file else None,
         'folder': absolute_path(folder) if folder else None,
+        'threads': threads or None,
+        'memory_limit': memory_limit or None,
+        'temp_directory': absolute_path(temp_directory) if temp_directory else None,
+        'preserve_insertion_order': preserve_insertion_order,
     })
 
 
@@ -92,16 +121,26 @@ def repository_create(
 @option('--database', metavar='DATABASE', help='数据库名；用于[postgres]')
 @option('--username', metavar='USERNAME', help='登入用户；用于[postgres]')
 @option('--password', metavar='PASSWORD', help='登入密码；用于[postgres]')
+@option('--copy/--no-copy', is_flag=True, default=None, help='通过COPY导出查询结果；用于[postgres]')
+@option('--staging/--no-staging', is_flag=True, default=None, help='迁移时先通过COPY并行写入暂存表，再替换目标表的数据；需要在目标模式下建表的权限；用于[postgres]')
+@option('--writers', type=click.INT, metavar='WRITERS', help='通过暂存表迁移时并行写入的连接数；用于[postgres]')
 # ODPS
 @option('--end-point', metavar='END-POINT', help='地址；用于[odps]')
 @option('--project', metavar='PROJECT', help='项目；用于[odps]')
 # ODPS；BiTable
 @option('--access-key', metavar='KEY', help='凭证编码；用于[odps；bitable]')
 @option('--access-secret', metavar='SECRET', help='凭证密钥；用于[odps；bitable]')
+# BiTable
+@option('--open-api', metavar='URL', help='开放接口地址，默认为https://open.feishu.cn/open-apis；用于[bitable]')
 # DuckDB; SQLite
 @option('--file', metavar='FILE', help='文件；用于[duckdb；sqlite]')
 # File
 @option('--folder', metavar='FOLDER', help='目录；用于[file]')
+# DuckDB；File；BiTable；Federation
+@option('--threads', type=click.INT, metavar='THREADS', help='线程数：DuckDB的计算线程或MaxCompute的下载线程；用于[duckdb；file；bitable；federation；odps]')
+@option('--memory-limit', metavar='LIMIT', help='DuckDB内存上限，例如4GB；用于[duckdb；file；bitable；federation]')
+@option('--temp-directory', metavar='FOLDER', help='DuckDB临时文件目录，也用于存放Postgres的COPY导出文件；用于[duckdb；file；bitable；federation；postgres]')
+@option('--preserve-insertion-order/--no-preserve-insertion-order', is_flag=True, default=None, help='DuckDB是否保留插入顺序；用于[duckdb；file；bitable；federation]')
 # Others
 @help_option('-h', '--help', help='展示帮助信息')
 def repository_update(
@@ -113,22 +152,33 @@ def repository_update(
         database: str,
         username: str,
         password: str,
+        copy: bool,
+        staging: bool,
+        writers: int,
         # ODPS；BiTable
         end_point: str,
         project: str,
         access_key: str,
         access_secret: str,
+        # BiTable
+        open_api: str,
         # DuckDB; SQLite
         file: str,
         # File
         folder: str,
+        # DuckDB；File；BiTable；Federation
+        threads: int,
+        memory_limit: str,
+        temp_directory: str,
+        preserve_insertion_order: bool,
 ):
     logger.debug(
-        'name=%s, kind=%s, host=%s, port=%s, database=%s, username=%s, end_point=%s, project=%s, access_key=%s, file=%s, folder=%s',
+        'name=%s, kind=%s, host=%s, port=%s, database=%s, username=%s, copy=%s, staging=%s, writers=%s, end_point=%s, project=%s, access_key=%s, open_api=%s, file=%s, folder=%s, threads=%s, memory_limit=%s, temp_directory=%s, preserve_insertion_order=%s',
         name, kind,
-        host, port, database, username,
-        end_point, project, access_key,
+        host, port, database, username, copy, staging, writers,
+        end_point, project, access_key, open_api,
         file, folder,
+        threads, memory_limit, temp_directory, preserve_insertion_order,
     )
     repository_service.repository_update(name, kind, {
         'host': host,
@@ -136,12 +186,20 @@ def repository_update(
         'database': database,
         'username': username,
         'password': password,
+        'copy': copy,
+        'staging': staging,
+        'writers': writers,
         'end_point': end_point,
         'project': project,
         'access_key': access_key,
         'access_secret': access_secret,
+        'open_api': open_api,
         'file': absolute_path(file) if file else file,
         'folder': absolute_path(folder) if folder else file,
+        'threads': threads,
+        'memory_limit': memory_limit,
+        'temp_directory': absolute_path(temp_directory) if temp_directory else temp_directory,
+        'preserve_insertion_order': preserve_insertion_order,
     })
 
 
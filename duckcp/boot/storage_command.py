@@ -30,6 +30,9 @@ def storage():
 @option('--table', metavar='TABLE', help='表；用于[postgres；duckdb；odps；sqlite；bitable]')
 # BiTable
 @option('--document', metavar='DOCUMENT', help='多维表格文档；用于[bitable]')
+@option('--rewrite/--no-rewrite', is_flag=True, default=None, help='每次同步时删除全部记录后按查询结果的顺序重新写入；用于[bitable]')
+# ODPS
+@option('--partition', metavar='SPEC', help='分区，例如`ds=20240101,region=cn`；用于[odps]')
 # File
 @option('--file', metavar='FILE', help='文件名；用于[file]')
 @option('--format', metavar='FORMAT', type=Choice(['csv', 'parquet', 'json']), help='文件格式；用于[file]')
@@ -75,6 +78,9 @@ def storage_create(
         table: str,  # 表；用于[postgres；duckdb；odps；sqlite；bitable]
         # BiTable
         document: str,  # 多维表格文档；用于[bitable]
+        rewrite: bool,  # 删除全部记录后按查询结果的顺序重新写入；用于[bitable]
+        # ODPS
+        partition: str,  # 分区；用于[odps]
         # File
         file: str,  # 文件名；用于[file]
         format: str,  # 文件格式；用于[file]
@@ -109,8 +115,8 @@ def storage_create(
         preserve_order: bool,  # 是否保留原始顺序；用于[file]
 ):
     logger.debug(
-        'name=%s, repository=%s, catalog=%s, schema=%s, table=%s, document=%s, file=%s, format=%s, compression=%s, compression_level=%s, parquet_version=%s, field_ids=%s, row_group_size=%s, row_group_size_bytes=%s, row_group_per_file=%s, header=%s, delimiter=%s, quote_char=%s, escape_char=%s, null_literal=%s, force_quote=%s, prefix=%s, suffix=%s, date_format=%s, timestamp_format=%s, array=%s, per_thread_output=%s, file_size_bytes=%s, partition_by=%s, filename_pattern=%s, file_extension=%s, write_partition_columns=%s, use_tmp_file=%s, delete_before_write=%s, overwrite=%s, append=%s, preserve_order=%s',
-        name, repository, catalog, schema, table, document,
+        'name=%s, repository=%s, catalog=%s, schema=%s, table=%s, document=%s, rewrite=%s, partition=%s, file=%s, format=%s, compression=%s, compression_level=%s, parquet_version=%s, field_ids=%s, row_group_size=%s, row_group_size_bytes=%s, row_group_per_file=%s, header=%s, delimiter=%s, quote_char=%s, escape_char=%s, null_literal=%s, force_quote=%s, prefix=%s, suffix=%s, date_format=%s, timestamp_format=%s, array=%s, per_thread_output=%s, file_size_bytes=%s, partition_by=%s, filename_pattern=%s, file_extension=%s, write_partition_columns=%s, use_tmp_file=%s, delete_before_write=%s, overwrite=%s, append=%s, preserve_order=%s',
+        name, repository, catalog, schema, table, document, rewrite, partition,
         file, format, compression, compression_level,
         parquet_version, field_ids, row_group_size, row_group_size_bytes, row_group_per_file,
         header, delimiter, quote_char, escape_char, null_literal, force_quote, prefix, suffix,
@@ -124,6 +130,8 @@ def storage_create(
         'schema': schema,
         'table': table,
         'document': document,
+        'rewrite': rewrite,
+        'partition': partition,
         'file': file,
         'format': format,
         'compression': compression,
@@ -169,6 +177,9 @@ def storage_create(
 @option('--table', metavar='TABLE', help='表；用于[postgres；duckdb；odps；sqlite；bitable]')
 # BiTable
 @option('--document', metavar='DOCUMENT', help='多维表格文档；用于[bitable]')
+@option('--rewrite/--no-rewrite', is_flag=True, default=None, help='每次同步时删除全部记录后按查询结果的顺序重新写入；用于[bitable]')
+# ODPS
+@option('--partition', metavar='SPEC', help='分区，例如`ds=20240101,region=cn`；用于[odps]')
 # File
 @option('--file', metavar='FILE', help='文件名；用于[file]')
 @option('--format', metavar='FORMAT', type=Choice(['csv', 'parquet', 'json']), help='文件格式；用于[file]')
@@ -214,6 +225,9 @@ def storage_update(
         table: str,  # 表；用于[postgres；duckdb；odps；sqlite；bitable]
         # BiTable
         document: str,  # 多维表格文档；用于[bitable]
+        rewrite: bool,  # 删除全部记录后按查询结果的顺序重新写入；用于[bitable]
+        # ODPS
+        partition: str,  # 分区；用于[odps]
         # File
         file: str,  # 文件名；用于[file]
         format: str,  # 文件格式；用于[file]
@@ -248,8 +262,8 @@ def storage_update(
         preserve_order: bool,  # 是否保留原始顺序；用于[file]
 ):
     logger.debug(
-        'name=%s, repository=%s, catalog=%s, schema=%s, table=%s, document=%s, file=%s, format=%s, compression=%s, compression_level=%s, parquet_version=%s, field_ids=%s, row_group_size=%s, row_group_size_bytes=%s, row_group_per_file=%s, header=%s, delimiter=%s, quote_char=%s, escape_char=%s, null_literal=%s, force_quote=%s, prefix=%s, suffix=%s, date_format=%s, timestamp_format=%s, array=%s, per_thread_output=%s, file_size_bytes=%s, partition_by=%s, filename_pattern=%s, file_extension=%s, write_partition_columns=%s, use_tmp_file=%s, delete_before_write=%s, overwrite=%s, append=%s, preserve_order=%s',
-        name, repository, catalog, schema, table, document,
+        'name=%s, repository=%s, catalog=%s, schema=%s, table=%s, document=%s, rewrite=%s, partition=%s, file=%s, format=%s, compression=%s, compression_level=%s, parquet_version=%s, field_ids=%s, row_group_size=%s, row_group_size_bytes=%s, row_group_per_file=%s, header=%s, delimiter=%s, quote_char=%s, escape_char=%s, null_literal=%s, force_quote=%s, prefix=%s, suffix=%s, date_format=%s, timestamp_format=%s, array=%s, per_thread_output=%s, file_size_bytes=%s, partition_by=%s, filename_pattern=%s, file_extension=%s, write_partition_columns=%s, use_tmp_file=%s, delete_before_write=%s, overwrite=%s, append=%s, preserve_order=%s',
+        name, repository, catalog, schema, table, document, rewrite, partition,
         file, format, compression, compression_level,
         parquet_version, field_ids, row_group_size, row_group_size_bytes, row_group_per_file,
         header, delimiter, quote_char, escape_char, null_literal, force_quote, prefix, suffix,
@@ -263,6 +277,8 @@ def storage_update(
         'schema': schema,
         'table': table,
         'document': document,
+        'rewrite': rewrite,
+        'partition': partition,
         'file': file,
         'format': format,
         'compression': compression,
@@ -50,10 +50,11 @@ def task_list():
 
 @task.command('execute', help='执行任务')
 @argument('name', metavar='NAME')
+@option('-p', '--parallel', metavar='NUMBER', type=INT, default=1, help='同时执行的迁移数；默认1')
 @help_option('-h', '--help', help='展示帮助信息')
-def task_execute(name: str):
-    logger.debug('name=%s', name)
-    task_service.task_execute(name)
+def task_execute(name: str, parallel: int):
+    logger.debug('name=%s, parallel=%s', name, parallel)
+    task_service.task_execute(name, parallel)
 
 
 @task.command('bind', help='绑定迁移')
@@ -1,6 +1,6 @@
 import logging
 
-from click import help_option, argument, option, Choice
+from click import help_option, argument, option, Choice, INT
 from rich.console import Console
 from rich.table import Table
 
@@ -23,10 +23,21 @@ def transformer():
 @option('-t', '--target', metavar='REPOSITORY', required=True, help='目标仓库')
 @option('-o', '--storage', metavar='STORAGE', required=True, help='目标存储单元')
 @option('-f', '--script', metavar='FILE', required=True, help='迁移脚本')
+# File
+@option('--incremental', metavar='PATTERN', help='只读取新增或变化的文件，脚本通过`incremental_files()`获取文件列表；用于[file]')
+# Others
+@option('--partition-column', metavar='COLUMN', help='分区列：按取值范围拆分查询，通过多个连接并行读取；须为数值、日期或时间类型')
+@option('--partitions', metavar='N', type=INT, help='分区数：并行读取的连接数，须大于1')
+@option('--fingerprint', metavar='SQL', help='来源数据指纹：执行代价很低的查询，结果与上次成功执行时相同则跳过迁移，例如`select max(updated_at), count(*) from t`')
 @help_option('-h', '--help', help='展示帮助信息')
-def transformer_create(name: str, source: str, target: str, storage: str, script: str):
-    logger.debug('name=%s, source=%s, target=%s, storage=%s, script=%s', name, source, target, storage, script)
-    transformer_service.transformer_create(name, source, target, storage, script)
+def transformer_create(name: str, source: str, target: str, storage: str, script: str, incremental: str, partition_column: str, partitions: int, fingerprint: str):
+    logger.debug('name=%s, source=%s, target=%s, storage=%s, script=%s, incremental=%s, partition_column=%s, partitions=%s, fingerprint=%s', name, source, target, storage, script, incremental, partition_column, partitions, fingerprint)
+    transformer_service.transformer_create(name, source, target, storage, script, {
+        'incremental': incremental,
+        'partition_column': partition_column,
+        'partitions': partitions,
+        'fingerprint': fingerprint,
+    })
 
 
 @transformer.command('update', help='更新迁移信息')
@@ -35,10 +46,21 @@ def transformer_create(name: str, source: str, target: str, storage: str, script
 @option('-t', '--target', metavar='REPOSITORY', help='目标仓库')
 @option('-o', '--storage', metavar='STORAGE', help='目标存储单元')
 @option('-f', '--script', metavar='FILE', help='迁移脚本')
+# File
+@option('--incremental', metavar='PATTERN', help='只读取新增或变化的文件，脚本通过`incremental_files()`获取文件列表；用于[file]')
+# Others
+@option('--partition-column', metavar='COLUMN', help='分区列：按取值范围拆分查询，通过多个连接并行读取；须为数值、日期或时间类型')
+@option('--partitions', metavar='N', type=INT, help='分区数：并行读取的连接数，须大于1')
+@option('--fingerprint', metavar='SQL', help='来源数据指纹：执行代价很低的查询，结果与上次成功执行时相同则跳过迁移，例如`select max(updated_at), count(*) from t`')
 @help_option('-h', '--help', help='展示帮助信息')
-def transformer_update(name: str, source: str, target: str, storage: str, script: str):
-    logger.debug('name=%s, source=%s, target=%s, storage=%s, script=%s', name, source, target, storage, script)
-    transformer_service.transformer_update(name, source, target, storage, script)
+def transformer_update(name: str, source: str, target: str, storage: str, script: str, incremental: str, partition_column: str, partitions: int, fingerprint: str):
+    logger.debug('name=%s, source=%s, target=%s, storage=%s, script=%s, incremental=%s, partition_column=%s, partitions=%s, fingerprint=%s', name, source, target, storage, script, incremental, partition_column, partitions, fingerprint)
+    transformer_service.transformer_update(name, source, target, storage, script, {
+        'incremental': incremental,
+        'partition_column': partition_column,
+        'partitions': partitions,
+        'fingerprint': fingerprint,
+    })
 
 
 @transformer.command('delete', help='删除迁移；更新作业')
@@ -49,6 +71,26 @@ def transformer_delete(name: str):
     transformer_service.transformer_delete(name)
 
 
+@transformer.command('bind', help='绑定额外的目标存储单元；查询结果只计算一次')
+@argument('name', metavar='NAME')
+@option('-t', '--target', metavar='REPOSITORY', required=True, help='目标仓库')
+@option('-o', '--storage', metavar='STORAGE', required=True, help='目标存储单元')
+@help_option('-h', '--help', help='展示帮助信息')
+def transformer_bind(name: str, target: str, storage: str):
+    logger.debug('name=%s, target=%s, storage=%s', name, target, storage)
+    transformer_service.transformer_bind(name, target, storage)
+
+
+@transformer.command('unbind', help='解绑额外的目标存储单元')
+@argument('name', metavar='NAME')
+@option('-t', '--target', metavar='REPOSITORY', required=True, help='目标仓库')
+@option('-o', '--storage', metavar='STORAGE', required=True, help='目标存储单元')
+@help_option('-h', '--help', help='展示帮助信息')
+def transformer_unbind(name: str, target: str, storage: str):
+    logger.debug('name=%s, target=%s, storage=%s', name, target, storage)
+    transformer_service.transformer_unbind(name, target, storage)
+
+
 @transformer.command('list', help='列出所有迁移')
 @option('--source-kind', type=Choice(RepositoryKind.codes()), help='来源仓库类型')
 @option('--source-repository', metavar='REPOSITORY', help='来源仓库名称')
@@ -3,3 +3,4 @@ class Configuration:
     全局配置信息
     """
     file: str | None = None  # 元数据的保存路径
+    concurrency: int = 1  # 同时执行的迁移数：用于均分DuckDB连接可用的CPU与内存
@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class BatchSize(NamedTuple):
+    storage_id: int  # 所属存储单元
+    operation: str  # 写入操作：insert、create、delete
+    size: int  # 最佳批大小：每批的记录数
+    throughput: float  # 最佳批大小对应的吞吐量：行/秒
+    created_at: datetime = None
+    updated_at: datetime = None
@@ -0,0 +1,83 @@
+import logging
+from collections.abc import Iterator
+from time import perf_counter
+from typing import Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+MIN_FACTOR = 1.1  # 调整幅度的下限：避免在最佳值附近反复微调
+
+
+class Batcher:
+    """
+    自适应分批器：按批次切分数据，并根据每批的吞吐量（行/秒）调整下一批的大小。
+    1. 吞吐量提高时，沿当前方向按调整幅度继续放大或缩小。
+    2. 吞吐量下降时，回到最佳批大小，反转方向并减小调整幅度。
+    3. 批大小始终在[minimum, maximum]之间，例如接口允许的单批记录数上限。
+    只统计满批的耗时，最后一批不足时不参与调整。
+    切分时还可以限制每批的总权重，例如编码后的字节数：超过容量前截断，但每批至少包含一项。
+    """
+    size: int  # 下一批的大小
+    minimum: int  # 批大小下限
+    maximum: int  # 批大小上限
+    factor: float  # 调整幅度：每次按该倍数放大或缩小
+    direction: int  # 调整方向：1为放大，-1为缩小
+    best_size: Optional[int]  # 吞吐量最高的批大小
+    best_throughput: Optional[float]  # 最高吞吐量：行/秒
+
+    def __init__(self, size: int, minimum: int, maximum: int, factor: float = 2.0):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.size = self.clamp(size)
+        self.factor = max(MIN_FACTOR, factor)
+        self.direction = 1
+        self.best_size = None
+        self.best_throughput = None
+
+    def clamp(self, size: float) -> int:
+        """
+        将批大小限制在上下限之间。
+        """
+        return min(self.maximum, max(self.minimum, round(size)))
+
+    def observe(self, rows: int, elapsed: float):
+        """
+        记录一批的行数与耗时，并调整下一批的大小。
+        """
+        if rows < self.size or elapsed <= 0:
+            return
+        throughput = rows / elapsed
+        if self.best_throughput is None or throughput > self.best_throughput:
+            self.best_size, self.best_throughput = self.size, throughput
+        else:
+            self.direction = -self.direction
+            self.factor = max(MIN_FACTOR, self.factor ** 0.5)
+        size = self.clamp(self.best_size * self.factor ** self.direction)
+        if size == self.best_size:  # 已到达上限或下限：改为反方向尝试
+            self.direction = -self.direction
+            size = self.clamp(self.best_size * self.factor ** self.direction)
+        logger.debug('rows=%s, elapsed=%.3f, throughput=%.0f, size=%s', rows, elapsed, throughput, size)
+        self.size = size
+
+    def split[T](self, data: list[T], weigh: Callable[[T], int] = None, capacity: int = None) -> Iterator[list[T]]:
+        """
+        按当前批大小切分数据：调用方处理完一批、请求下一批时，才计入该批的耗时。
+        指定权重函数与容量时，每批的总权重不超过容量；因容量截断的批次不参与调整。
+        """
+        start = 0
+        while start < len(data):
+            size = self.size
+            end = min(len(data), start + size)
+            if weigh is not None:
+                total = 0
+                for index in range(start, end):
+                    total += weigh(data[index])
+                    if total > capacity and index > start:
+                        end = index
+                        break
+            bucket = data[start:end]
+            start = end
+            started_at = perf_counter()
+            yield bucket
+            if len(bucket) == size:
+                self.observe(len(bucket), perf_counter() - started_at)
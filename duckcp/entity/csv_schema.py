@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import NamedTuple, Any, Optional
+
+
+class CsvSchema(NamedTuple):
+    repository_id: int  # 所属仓库
+    pattern: str  # 文件模式：与迁移脚本中的写法一致
+    header: Optional[str]  # 探测时的表头行：无表头则为空
+    options: dict[str, Any]  # 格式参数：分隔符、字段类型等
+    elapsed: float  # 探测耗时：秒
+    created_at: datetime = None
+    updated_at: datetime = None
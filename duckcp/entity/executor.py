@@ -1,15 +1,19 @@
 import logging
 import sqlite3
 from collections import namedtuple
+from collections.abc import Iterator
 from typing import Self, Any, Sequence, Optional
 
 from pandas import DataFrame
 
 from duckcp.typing.cursor_protocol import CursorProtocol
+from duckcp.typing.frame_cursor_protocol import FrameCursorProtocol
 from duckcp.typing.record_constructor_protocol import RecordConstructorProtocol
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE = 100000  # 流式读取时每批的默认行数
+
 
 class Executor:
     """
@@ -45,6 +49,13 @@ class Executor:
         logger.debug('sql=%s, parameters=%s', sql, parameters)
         self.cursor.executemany(sql, parameters)
 
+    def script(self, sql: str):
+        """
+        执行包含多条语句的脚本，无返回结果：仅支持Sqlite。
+        """
+        logger.debug('sql=%s', sql)
+        self.cursor.executescript(sql)
+
     def execute(self, sql: str, *parameters: Any) -> tuple[list[str], list[Sequence[Any]]]:
         """
         执行单条语句，返回原始的结果。
@@ -59,6 +70,26 @@ class Executor:
         records = self.cursor.fetchall()
         return columns, records
 
+    def frames(self, sql: str, *parameters: Any, size: int = BATCH_SIZE) -> Iterator[DataFrame]:
+        """
+        执行查询语句，按批次流式返回DataFrame结构：
+        - 每批最多包含`size`行记录。
+        - 至少返回一批（可能为空），以便调用方获得列信息。
+        - 游标支持直接返回DataFrame时，不再逐行转换。
+        """
+        logger.debug('sql=%s, parameters=%s, size=%s', sql, parameters, size)
+        if not parameters:  # 勿删：不同类型Cursor中参数默认值不同，无法统一处理
+            parameters = [] if isinstance(self.cursor, sqlite3.Cursor) else None
+        self.cursor.execute(sql, parameters)
+        if isinstance(self.cursor, FrameCursorProtocol):
+            yield from self.cursor.fetch_frames(size)
+            return
+        columns = [column[0] for column in self.cursor.description] if self.cursor.description else []
+        records = self.cursor.fetchmany(size)
+        yield DataFrame(records, columns=columns)
+        while records := self.cursor.fetchmany(size):
+            yield DataFrame(records, columns=columns)
+
     def __call__(self, sql: str, *parameters: Any) -> DataFrame:
         """
         执行查询语句，返回DataFrame结构。
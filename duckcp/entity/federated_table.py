@@ -0,0 +1,14 @@
+from typing import NamedTuple, Optional
+
+from sqlglot import Expression
+
+
+class FederatedTable(NamedTuple):
+    """
+    联邦查询中引用的其他仓库的表。
+    """
+    view: str  # 在本地DuckDB中的表名
+    repository: str  # 所属仓库编码
+    table: Expression  # 在所属仓库中的表：不含仓库编码
+    columns: Optional[set[str]]  # 查询用到的列名：为空表示需要所有列
+    conditions: list[Expression]  # 可下推至所属仓库的过滤条件：列名不含表名
@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class Fingerprint(NamedTuple):
+    transformer_id: int  # 所属迁移
+    checksum: str  # 指纹摘要：包含迁移脚本与目标
+    created_at: datetime = None
+    updated_at: datetime = None
@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class Manifest(NamedTuple):
+    transformer_id: int  # 所属迁移
+    path: str  # 文件路径：相对于来源仓库目录
+    size: int  # 文件字节数
+    mtime: int  # 修改时间：纳秒
+    checksum: str  # 内容摘要
+    created_at: datetime = None
+    updated_at: datetime = None
@@ -0,0 +1,236 @@
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, Future
+from itertools import islice
+from queue import Queue, Empty, Full
+from threading import Event
+from typing import Any, Sequence, Optional
+
+from pandas import DataFrame
+
+from duckcp.entity.executor import BATCH_SIZE
+from duckcp.entity.repository import Repository
+from duckcp.helper.collection import split_range
+from duckcp.helper.sql import bounds_query, partition_query
+from duckcp.helper.validation import ensure
+from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
+
+logger = logging.getLogger(__name__)
+
+SQL_DIALECTS = {'postgres': 'postgres', 'sqlite': 'sqlite', 'odps': 'hive'}  # 仓库类型对应的sqlglot方言；其他类型使用DuckDB方言
+WAIT_SECONDS = 0.1  # 读取线程等待队列空位时，检查是否已取消的间隔
+
+
+class PartitionedCursor:
+    """
+    分区游标：按分区列的取值范围，将一条查询拆分成多条互不重叠的查询，通过多个连接并行读取，再合并成一个结果。
+    1. 先查询分区列的最小值与最大值，将其均分成若干区间；分区列为NULL的记录归入第一个区间。
+    2. 每个区间在独立的连接上执行，按批次读取后放入共享的有界队列。
+    3. 合并时按到达顺序返回各批数据，因此结果不保证原查询的顺序。
+    分区列必须是数值、日期或时间类型。
+    """
+    repository: Repository  # 来源仓库：每个分区单独建立连接
+    column: str  # 分区列
+    partitions: int  # 分区数
+    sql: Optional[str]  # 待执行的查询
+    size: int  # 每批的行数
+    queue: Optional[Queue]  # 各分区读取的数据：每个分区结束时放入None
+    futures: list[Future]
+    remaining: int  # 尚未读取完毕的分区数
+    blank: Optional[DataFrame]  # 某个分区返回的空数据：用于在没有结果时提供列信息
+    cancelled: Event  # 提前结束读取
+    pool: Optional[ThreadPoolExecutor]
+    head: Optional[DataFrame]  # 已取出、尚未返回的第一批数据：用于获取列信息
+    rows: Optional[Iterator[tuple[Any, ...]]]  # 逐行读取时的结果
+
+    def __init__(self, repository: Repository, column: str, partitions: int):
+        self.repository = repository
+        self.column = column
+        self.partitions = partitions
+        self.sql = None
+        self.size = BATCH_SIZE
+        self.queue = None
+        self.futures = []
+        self.remaining = 0
+        self.blank = None
+        self.cancelled = Event()
+        self.pool = None
+        self.head = None
+        self.rows = None
+
+    @property
+    def dialect(self) -> str:
+        return SQL_DIALECTS.get(self.repository.kind, 'duckdb')
+
+    @property
+    def description(self) -> Sequence[SupportsGetItemProtocol]:
+        if self.head is None:
+            self.head = self.__next()
+            if self.head is None:
+                self.head = self.blank if self.blank is not None else DataFrame()
+        return [(column, None, None, None, None, None, None) for column in self.head.columns]
+
+    def __stop(self):
+        """
+        取消并等待所有分区的读取线程结束。
+        """
+        if self.pool is None:
+            return
+        self.cancelled.set()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.pool = None
+        self.queue = None
+        self.futures = []
+        self.head = None
+        self.rows = None
+
+    def close(self):
+        """
+        关闭游标
+        """
+        self.__stop()
+
+    def executemany(self, sql: str, parameters: list[Sequence[Any]]):
+        """
+        批量执行：分区游标只读，不支持批量执行。
+        """
+        ensure(False, f'分区读取只支持查询语句，不支持批量执行({sql})')
+
+    def execute(self, sql: str, parameters: Sequence[Any] = None):
+        """
+        单句执行：记录查询语句，读取结果时才开始执行。
+        """
+        ensure(not parameters, '分区查询不支持参数')
+        self.__stop()
+        self.sql = sql
+
+    def __put(self, item: Optional[DataFrame]) -> bool:
+        """
+        放入队列：队列已满时等待空位，直至读取被取消。
+        """
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=WAIT_SECONDS)
+                return True
+            except Full:
+                continue
+        return False
+
+    def __read(self, sql: str):
+        """
+        在独立的连接上读取一个分区的数据。
+        """
+        try:
+            with self.repository.connect() as connection:
+                with connection.prepare(sql) as statement:
+                    for frame in statement.frames(size=self.size):
+                        if not self.__put(frame):
+                            return
+        finally:
+            self.__put(None)
+
+    def __start(self):
+        """
+        计算分区的取值范围，并为每个分区启动读取线程。
+        """
+        with self.repository.connect() as connection:
+            with connection.executor() as executor:
+                lower, upper = executor.record(bounds_query(self.sql, self.column, self.dialect))
+        logger.debug('column=%s, lower=%s, upper=%s', self.column, lower, upper)
+        if lower is None:
+            starts = [None]
+        else:
+            ensure(not isinstance(lower, str), f'分区列({self.column})必须是数值、日期或时间类型')
+            starts = split_range(lower, upper, self.partitions)
+            starts[0] = None  # 第一个分区不设下限，同时包含NULL值
+        bounds = list(zip(starts, starts[1:] + [None]))
+        logger.info('按列(%s)拆分成%s个分区并行读取', self.column, len(bounds))
+
+        self.cancelled = Event()
+        self.queue = Queue(maxsize=len(bounds) * 2)
+        self.remaining = len(bounds)
+        self.blank = None
+        self.pool = ThreadPoolExecutor(len(bounds))
+        self.futures = [
+            self.pool.submit(self.__read, partition_query(self.sql, self.column, start, end, self.dialect))
+            for start, end in bounds
+        ]
+
+    def __check(self):
+        """
+        任一分区读取失败时，抛出其异常。
+        """
+        for future in self.futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def __next(self) -> Optional[DataFrame]:
+        """
+        按到达顺序取出下一批非空数据；所有分区读取完毕时返回None。
+        """
+        if self.pool is None:
+            self.__start()
+        while self.remaining > 0:
+            try:
+                frame = self.queue.get(timeout=WAIT_SECONDS)
+            except Empty:
+                self.__check()
+                continue
+            if frame is None:
+                self.remaining -= 1
+                self.__check()
+            elif not frame.empty:
+                return frame
+            elif self.blank is None:
+                self.blank = frame  # 保留一批空数据，用于在没有结果时提供列信息
+        return None
+
+    def __frames(self) -> Iterator[DataFrame]:
+        """
+        返回合并后的各批数据：至少返回一批（可能为空）。
+        """
+        if self.head is not None:
+            head, self.head = self.head, None
+            yield head
+            yielded = True
+        else:
+            yielded = False
+        while (frame := self.__next()) is not None:
+            yielded = True
+            yield frame
+        if not yielded:
+            yield self.blank if self.blank is not None else DataFrame()
+
+    def fetch_frames(self, size: int) -> Iterator[DataFrame]:
+        """
+        按批次获取合并后的查询结果。
+        """
+        if self.pool is None:
+            self.size = size
+        try:
+            yield from self.__frames()
+        finally:
+            self.__stop()
+
+    def __records(self) -> Iterator[tuple[Any, ...]]:
+        """
+        逐行返回查询结果。
+        """
+        for frame in self.fetch_frames(self.size):
+            yield from frame.itertuples(index=False, name=None)
+
+    def fetchall(self) -> list[Sequence[Any]]:
+        """
+        获取查询结果。
+        """
+        if self.rows is None:
+            self.rows = self.__records()
+        return list(self.rows)
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        if self.rows is None:
+            self.rows = self.__records()
+        return list(islice(self.rows, size))
@@ -1,6 +1,8 @@
 from abc import abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
-from typing import NamedTuple, Any
+from typing import NamedTuple, Any, Optional
 
 from duckcp.entity.connection import Connection
 from duckcp.typing.connection_protocol import ConnectionProtocol
@@ -21,8 +23,28 @@ class Repository(NamedTuple):
         """
         pass
 
+    def parameter_limit(self, connection: Connection) -> Optional[int]:
+        """
+        连接上单条语句允许的参数个数上限：默认不限制，批量写入时每条语句只插入一行。
+        """
+        return None
+
     def connect(self) -> Connection:
         """
         建立新的数据库连接。
         """
         return Connection(self.establish_connection())
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[Connection]:
+        """
+        建立用于批量写入数据的连接：默认与普通连接相同，由具体的仓库按需优化。
+        """
+        with self.connect() as connection:
+            yield connection
+
+    def submit(self, sql: str):
+        """
+        预先提交查询语句，供后续执行时直接使用：默认不支持，由具体的仓库按需实现。
+        """
+        pass
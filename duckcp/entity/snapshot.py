@@ -5,7 +5,8 @@ from typing import NamedTuple, Any
 class Snapshot(NamedTuple):
     id: int
     storage_id: int  # 所属存储单元
-    checksum: str  # 摘要
+    checksum: str  # 摘要：同步进行中时为空
     records: list[Any]  # 记录
     created_at: datetime
     updated_at: datetime
+    digests: list[str]  # 记录的摘要：与记录一一对应
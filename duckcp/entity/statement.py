@@ -1,8 +1,9 @@
+from collections.abc import Iterator
 from typing import Self, Sequence, Any, Optional
 
 from pandas import DataFrame
 
-from duckcp.entity.executor import Executor
+from duckcp.entity.executor import Executor, BATCH_SIZE
 from duckcp.typing.record_constructor_protocol import RecordConstructorProtocol
 
 
@@ -49,6 +50,12 @@ class Statement:
         """
         return self.executor.execute(self.sql, *parameters)
 
+    def frames(self, *parameters: Any, size: int = BATCH_SIZE) -> Iterator[DataFrame]:
+        """
+        执行查询语句，按批次流式返回DataFrame结构。
+        """
+        return self.executor.frames(self.sql, *parameters, size=size)
+
     def __call__(self, *parameters: Any) -> DataFrame:
         """
         执行查询语句，返回DataFrame结构。
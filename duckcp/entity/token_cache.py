@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime
+from threading import Lock, Timer
+from typing import Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    进程内的访问凭证缓存：
+    1. 凭证有效时直接返回，不访问元数据库。
+    2. 刷新时持有锁：多个线程同时发现凭证过期，只有一个线程刷新，其余线程等待后复用结果。
+    3. 可在到期前安排后台续期：续期失败时保留原凭证，到期后由调用方同步刷新。
+    """
+    credential: Optional[tuple[str, datetime]]  # 访问凭证与失效时间：整体替换，读取时无需加锁
+    cold: bool  # 尚未从元数据库加载
+    lock: Lock  # 刷新凭证时持有
+    timer: Optional[Timer]  # 后台续期的定时器
+
+    def __init__(self):
+        self.credential = None
+        self.cold = True
+        self.lock = Lock()
+        self.timer = None
+
+    def token(self) -> Optional[str]:
+        """
+        返回有效的访问凭证；已过期或尚未获取时返回None。
+        """
+        credential = self.credential
+        if credential is not None and datetime.now() < credential[1]:
+            return credential[0]
+        return None
+
+    def put(self, access_token: str, expired_at: datetime):
+        """
+        更新访问凭证。
+        """
+        self.credential = (access_token, expired_at)
+
+    def schedule(self, at: datetime, action: Callable[[], None]):
+        """
+        安排在指定时刻执行后台续期：取代之前的安排。
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+        seconds = max(0.0, (at - datetime.now()).total_seconds())
+        self.timer = Timer(seconds, action)
+        self.timer.daemon = True
+        self.timer.start()
+        logger.debug('at=%s, seconds=%.0f', at, seconds)
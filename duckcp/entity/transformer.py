@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import NamedTuple
+from typing import NamedTuple, Any
 
 
 class Transformer(NamedTuple):
@@ -10,3 +10,4 @@ class Transformer(NamedTuple):
     script_file: str  # 迁移脚本
     created_at: datetime
     updated_at: datetime
+    properties: dict[str, Any]  # 迁移选项
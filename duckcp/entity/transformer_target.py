@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class TransformerTarget(NamedTuple):
+    transformer_id: int  # 所属迁移
+    storage_id: int  # 额外的目标存储单元
+    created_at: datetime
+    updated_at: datetime
@@ -8,8 +8,8 @@ from typing import TypedDict
 from duckcp.helper import http
 from duckcp.typing.authentication_token_type import AuthenticationToken
 
-OPEN_API = 'https://open.feishu.cn/open-apis'
-ACCESS_TOKEN_API = f'{OPEN_API}/auth/v3/tenant_access_token/internal/'
+OPEN_API = 'https://open.feishu.cn/open-apis'  # 默认的开放接口地址
+ACCESS_TOKEN_API = '{open_api}/auth/v3/tenant_access_token/internal/'
 
 logger = logging.getLogger(__name__)
 
@@ -36,10 +36,11 @@ class CredentialResponse(TypedDict):
 def tenant_access_token(token: AuthenticationToken) -> tuple[str, datetime]:
     """
     获得租户级别的访问凭证
-    @param token: 认证信息
+    @param token: 认证信息：可通过`open_api`指定开放接口地址。
     """
     logger.debug('token=%s', token)
-    response: CredentialResponse = http.post(ACCESS_TOKEN_API, params={
+    url = ACCESS_TOKEN_API.format(open_api=token.get('open_api') or OPEN_API)
+    response: CredentialResponse = http.post(url, params={
         'app_id': token['access_key'],
         'app_secret': token['access_secret'],
     })
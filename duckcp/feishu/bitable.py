@@ -2,18 +2,56 @@
 多维表格接口
 """
 import logging
-from typing import TypedDict, NotRequired, Any
+from threading import Lock
+from collections.abc import Iterator
+from typing import TypedDict, NotRequired, Any, Callable
 
+from duckcp.entity.batcher import Batcher
 from duckcp.feishu import OPEN_API, FeiShuError
 from duckcp.helper import http
-from duckcp.helper.collection import chunk
+from duckcp.helper.serialization import json_encode
+
+LIST_FIELDS_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/fields'
+LIST_RECORDS_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/records/search'
+BATCH_CREATE_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/records/batch_create'
+BATCH_DELETE_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/records/batch_delete'
+BATCH_UPDATE_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/records/batch_update'
+BATCH_GET_API = '{open_api}/bitable/v1/apps/{document}/tables/{table}/records/batch_get'
+BATCH_CREATE_LIMIT = 1000  # 批量创建接口单次最多提交的记录数
+BATCH_DELETE_LIMIT = 500  # 批量删除接口单次最多提交的记录数
+BATCH_UPDATE_LIMIT = 1000  # 批量更新接口单次最多提交的记录数
+BATCH_GET_LIMIT = 100  # 批量获取接口单次最多查询的记录数
+BATCH_PAYLOAD_LIMIT = 8 * 1024 * 1024  # 批量接口单次请求体的字节数上限：低于接口限制，为请求的其他部分留出余量
+
+# 字段类型
+TEXT = 1  # 多行文本
+NUMBER = 2  # 数字
+SINGLE_SELECT = 3  # 单选
+MULTI_SELECT = 4  # 多选
+DATE_TIME = 5  # 日期：毫秒级时间戳
+CHECKBOX = 7  # 复选框
+USER = 11  # 人员
+PHONE = 13  # 电话号码
+URL = 15  # 超链接
+ATTACHMENT = 17  # 附件
+SINGLE_LINK = 18  # 单向关联
+LOOKUP = 19  # 查找引用
+FORMULA = 20  # 公式
+DUPLEX_LINK = 21  # 双向关联
+LOCATION = 22  # 地理位置
+GROUP_CHAT = 23  # 群组
+CREATED_TIME = 1001  # 创建时间
+MODIFIED_TIME = 1002  # 最后更新时间
+CREATED_USER = 1003  # 创建人
+MODIFIED_USER = 1004  # 修改人
+AUTO_NUMBER = 1005  # 自动编号
+READONLY_TYPES = {LOOKUP, FORMULA, CREATED_TIME, MODIFIED_TIME, CREATED_USER, MODIFIED_USER, AUTO_NUMBER}  # 系统计算的字段：不可写入
 
-LIST_FIELDS_API = f'{OPEN_API}/bitable/v1/apps/{{document}}/tables/{{table}}/fields'
-LIST_RECORDS_API = f'{OPEN_API}/bitable/v1/apps/{{document}}/tables/{{table}}/records/search'
-BATCH_CREATE_API = f'{OPEN_API}/bitable/v1/apps/{{document}}/tables/{{table}}/records/batch_create'
-BATCH_DELETE_API = f'{OPEN_API}/bitable/v1/apps/{{document}}/tables/{{table}}/records/batch_delete'
 logger = logging.getLogger(__name__)
 
+fields_cache: dict[tuple[str, str, str], list['Field']] = {}  # 进程内缓存的字段：按接口地址、文档与表格索引
+fields_lock = Lock()
+
 
 class Record(TypedDict):
     """
@@ -61,6 +99,15 @@ class Batch[T](TypedDict):
     records: list[T]  # 记录集。
 
 
+class BatchGet(TypedDict):
+    """
+    批量获取结果响应。
+    """
+    records: list[Record]  # 记录集。
+    absent_record_ids: NotRequired[list[str]]  # 不存在的记录编号。
+    forbidden_record_ids: NotRequired[list[str]]  # 无权访问的记录编号。
+
+
 class Response[T](TypedDict):
     """
     操作结果响应。
@@ -70,73 +117,200 @@ class Response[T](TypedDict):
     data: T  # 结果。
 
 
-def list_fields(access_token: str, document: str, table: str) -> list[Field]:
-    url = LIST_FIELDS_API.format(document=document, table=table)
-    response: Response[Page[Field]] = http.get(url, headers={'Authorization': f'Bearer {access_token}'}, query={'page_size': 100})
-    if response['code'] == 0:
-        return response['data']['items']
-    else:
-        raise FeiShuError('获取字段', response.get('msg', ''))
+def payload_size(record: Any) -> int:
+    """
+    计算记录编码后的字节数：包括分隔记录的逗号。
+    """
+    return len(json_encode(record).encode()) + 1
 
 
-def list_records(access_token: str, document: str, table: str) -> list[Record]:
+def list_fields(access_token: str, document: str, table: str, open_api: str = OPEN_API) -> list[Field]:
     """
-    分页查询所有记录。
+    分页查询所有字段。
+    @param open_api: 开放接口地址。
+    """
+    url = LIST_FIELDS_API.format(open_api=open_api, document=document, table=table)
+    headers = {'Authorization': f'Bearer {access_token}'}
+    query: dict[str, Any] = {'page_size': 100}
+    fields: list[Field] = []
+    while True:
+        response: Response[Page[Field]] = http.get(url, headers=headers, query=query)
+        if response['code'] == 0:
+            fields.extend(response['data']['items'])
+            if response['data']['has_more']:
+                query['page_token'] = response['data']['page_token']
+            else:
+                break
+        else:
+            raise FeiShuError('获取字段', response.get('msg', ''))
+    return fields
+
+
+def cached_fields(access_token: str, document: str, table: str, open_api: str = OPEN_API) -> list[Field]:
     """
-    url = LIST_RECORDS_API.format(document=document, table=table)
+    查询所有字段：同一进程内只查询一次。
+    @param open_api: 开放接口地址。
+    """
+    key = (open_api, document, table)
+    with fields_lock:
+        if key not in fields_cache:
+            fields_cache[key] = list_fields(access_token, document, table, open_api)
+            logger.debug('document=%s, table=%s, fields=%s', document, table, len(fields_cache[key]))
+        return fields_cache[key]
+
+
+def record_pages(access_token: str, document: str, table: str, open_api: str = OPEN_API) -> Iterator[list[Record]]:
+    """
+    分页查询所有记录：逐页返回，调用方可边读取边处理。
+    @param open_api: 开放接口地址。
+    """
+    url = LIST_RECORDS_API.format(open_api=open_api, document=document, table=table)
     headers = {'Authorization': f'Bearer {access_token}'}
     query: dict[str, Any] = {'page_size': 500}
-    records: list[Record] = []
     while True:
         response: Response[Page[Record]] = http.post(url, headers=headers, query=query, params={})
         if response['code'] == 0:
-            records.extend(response['data']['items'])
+            yield response['data']['items'] or []
             if response['data']['has_more']:
                 query['page_token'] = response['data']['page_token']
             else:
                 break
         else:
             raise FeiShuError('获取记录', response.get('msg', ''))
-    return records
 
 
-def batch_create(access_token: str, document: str, table: str, records: list[Record]) -> list[Record]:
+def list_records(access_token: str, document: str, table: str, open_api: str = OPEN_API) -> list[Record]:
+    """
+    分页查询所有记录。
+    @param open_api: 开放接口地址。
+    """
+    return [record for page in record_pages(access_token, document, table, open_api) for record in page]
+
+
+def batch_create(
+        access_token: str,
+        document: str,
+        table: str,
+        records: list[Record],
+        batcher: Batcher = None,
+        confirm: Callable[[list[Record]], None] = None,
+        open_api: str = OPEN_API,
+) -> list[Record]:
     """
     批量创建记录。
     @param access_token: 访问凭证。
     @param document: 多维文档编号。
     @param table: 多维表格编号。
     @param records: 记录编号集合。
+    @param batcher: 分批器：未指定时每批按接口上限提交；每批编码后的字节数同样不超过上限。
+    @param confirm: 每批创建成功后回调，参数为该批创建的记录。
+    @param open_api: 开放接口地址。
     @return: 成功创建的记录。
     """
-    url = BATCH_CREATE_API.format(document=document, table=table)
+    url = BATCH_CREATE_API.format(open_api=open_api, document=document, table=table)
+    batcher = batcher or Batcher(BATCH_CREATE_LIMIT, BATCH_CREATE_LIMIT, BATCH_CREATE_LIMIT)
     result: list[Record] = []
-    for bucket in chunk(records, 1000):
+    for bucket in batcher.split(records, payload_size, BATCH_PAYLOAD_LIMIT):
         response: Response[Batch[Record]] = http.post(url, headers={'Authorization': f'Bearer {access_token}'}, params={'records': bucket})
         if response['code'] == 0:
             result.extend(response['data']['records'])
+            if confirm is not None:
+                confirm(response['data']['records'])
         else:
             raise FeiShuError('批量创建', response.get('msg', ''))
     logger.debug('rows=%s', len(result))
     return result
 
 
-def batch_delete(access_token: str, document: str, table: str, records: list[str]) -> list[str]:
+def batch_delete(
+        access_token: str,
+        document: str,
+        table: str,
+        records: list[str],
+        batcher: Batcher = None,
+        confirm: Callable[[list[str]], None] = None,
+        open_api: str = OPEN_API,
+) -> list[str]:
     """
     批量删除记录。
     @param access_token: 访问凭证。
     @param document: 多维文档编号。
     @param table: 多维表格编号。
     @param records: 记录编号集合。
+    @param batcher: 分批器：未指定时每批按接口上限提交；每批编码后的字节数同样不超过上限。
+    @param confirm: 每批提交成功后回调，参数为该批提交的记录编号（包括已不存在的记录）。
+    @param open_api: 开放接口地址。
     @return: 删除成功的记录编号集合。
     """
-    url = BATCH_DELETE_API.format(document=document, table=table)
+    url = BATCH_DELETE_API.format(open_api=open_api, document=document, table=table)
+    batcher = batcher or Batcher(BATCH_DELETE_LIMIT, BATCH_DELETE_LIMIT, BATCH_DELETE_LIMIT)
     result = []
-    for bucket in chunk(records, 500):
+    for bucket in batcher.split(records, payload_size, BATCH_PAYLOAD_LIMIT):
         response: Response[Batch[BatchDeleteRecord]] = http.post(url, headers={'Authorization': f'Bearer {access_token}'}, params={'records': bucket})
         if response['code'] == 0:
             result.extend([record['record_id'] for record in response['data']['records'] if record['deleted']])
+            if confirm is not None:
+                confirm(bucket)
         else:
             raise FeiShuError('批量删除', response.get('msg', ''))
     logger.debug('rows=%s', len(result))
     return result
+
+
+def batch_update(
+        access_token: str,
+        document: str,
+        table: str,
+        records: list[Record],
+        batcher: Batcher = None,
+        confirm: Callable[[list[Record]], None] = None,
+        open_api: str = OPEN_API,
+) -> list[Record]:
+    """
+    批量更新记录：记录编号保持不变。
+    @param access_token: 访问凭证。
+    @param document: 多维文档编号。
+    @param table: 多维表格编号。
+    @param records: 记录集合：须包含记录编号。
+    @param batcher: 分批器：未指定时每批按接口上限提交；每批编码后的字节数同样不超过上限。
+    @param confirm: 每批更新成功后回调，参数为该批更新的记录。
+    @param open_api: 开放接口地址。
+    @return: 成功更新的记录。
+    """
+    url = BATCH_UPDATE_API.format(open_api=open_api, document=document, table=table)
+    batcher = batcher or Batcher(BATCH_UPDATE_LIMIT, BATCH_UPDATE_LIMIT, BATCH_UPDATE_LIMIT)
+    result: list[Record] = []
+    for bucket in batcher.split(records, payload_size, BATCH_PAYLOAD_LIMIT):
+        response: Response[Batch[Record]] = http.post(url, headers={'Authorization': f'Bearer {access_token}'}, params={'records': bucket})
+        if response['code'] == 0:
+            result.extend(response['data']['records'])
+            if confirm is not None:
+                confirm(response['data']['records'])
+        else:
+            raise FeiShuError('批量更新', response.get('msg', ''))
+    logger.debug('rows=%s', len(result))
+    return result
+
+
+def batch_get(access_token: str, document: str, table: str, records: list[str], batcher: Batcher = None, open_api: str = OPEN_API) -> list[Record]:
+    """
+    批量获取记录：不存在或无权访问的记录不包含在结果中。
+    @param access_token: 访问凭证。
+    @param document: 多维文档编号。
+    @param table: 多维表格编号。
+    @param records: 记录编号集合。
+    @param batcher: 分批器：未指定时每批按接口上限查询。
+    @param open_api: 开放接口地址。
+    @return: 获取到的记录。
+    """
+    url = BATCH_GET_API.format(open_api=open_api, document=document, table=table)
+    batcher = batcher or Batcher(BATCH_GET_LIMIT, BATCH_GET_LIMIT, BATCH_GET_LIMIT)
+    result: list[Record] = []
+    for bucket in batcher.split(records, payload_size, BATCH_PAYLOAD_LIMIT):
+        response: Response[BatchGet] = http.post(url, headers={'Authorization': f'Bearer {access_token}'}, params={'record_ids': bucket})
+        if response['code'] == 0:
+            result.extend(response['data']['records'])
+        else:
+            raise FeiShuError('批量获取', response.get('msg', ''))
+    logger.debug('rows=%s', len(result))
+    return result
@@ -0,0 +1,163 @@
+"""
+多维表格字段解码：按列将接口返回的嵌套字段取值展开成带类型的列。
+- 文本：拼接文本片段；超链接取链接，地理位置取完整地址，其他对象取其文本或名称。
+- 数字：转为浮点数；日期、创建与更新时间：毫秒级时间戳转为本地时间。
+- 多选：选项列表；人员、群组、关联、附件：编号列表。
+- 公式、查找引用等类型不确定的字段按文本处理。
+"""
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from pandas import DataFrame, Series, to_datetime, to_numeric
+from pandas.api.types import infer_dtype
+
+from duckcp.feishu.bitable import (
+    Field, Record,
+    NUMBER, MULTI_SELECT, DATE_TIME, CHECKBOX, USER, ATTACHMENT, SINGLE_LINK, DUPLEX_LINK, GROUP_CHAT,
+    CREATED_TIME, MODIFIED_TIME, CREATED_USER, MODIFIED_USER,
+)
+from duckcp.helper.serialization import json_encode
+
+logger = logging.getLogger(__name__)
+
+RECORD_ID = 'id'  # 记录编号所在的列
+SEPARATOR = ','  # 多个取值展开成文本时的分隔符
+TEXT_KEYS = ['link', 'text', 'full_address', 'name', 'value']  # 对象展开成文本时依次尝试的属性
+IDENTITY_KEYS = ['id', 'record_id', 'file_token']  # 对象展开成编号时依次尝试的属性
+NUMBER_TYPES = {NUMBER}  # 解码为浮点数的字段类型
+TIMESTAMP_TYPES = {DATE_TIME, CREATED_TIME, MODIFIED_TIME}  # 解码为时间的字段类型
+IDENTITY_TYPES = {USER, GROUP_CHAT, SINGLE_LINK, DUPLEX_LINK, ATTACHMENT, CREATED_USER, MODIFIED_USER}  # 解码为编号列表的字段类型
+
+
+def text(value: Any) -> Optional[str]:
+    """
+    将字段取值展开成文本。
+    """
+    if value is None or isinstance(value, str):
+        return value
+    elif isinstance(value, dict):
+        for key in TEXT_KEYS:
+            if key in value:
+                return text(value[key])
+        return json_encode(value)
+    elif isinstance(value, list):
+        if all(isinstance(item, dict) and 'text' in item and 'type' in item for item in value):  # 文本片段
+            return ''.join(item['text'] or '' for item in value)
+        return SEPARATOR.join(filter(None, map(text, value)))
+    else:
+        return str(value)
+
+
+def identities(value: Any) -> Optional[list[str]]:
+    """
+    将字段取值展开成编号列表。
+    """
+    if value is None:
+        return None
+    elif isinstance(value, dict):
+        if 'link_record_ids' in value:
+            return [str(item) for item in value['link_record_ids'] or []]
+        value = [value]
+    elif not isinstance(value, list):
+        value = [value]
+    result = []
+    for item in value:
+        if isinstance(item, dict):
+            if 'record_ids' in item:
+                result.extend(str(record_id) for record_id in item['record_ids'] or [])
+            elif key := next((key for key in IDENTITY_KEYS if key in item), None):
+                result.append(str(item[key]))
+        elif item is not None:
+            result.append(str(item))
+    return result
+
+
+def options(value: Any) -> Optional[list[str]]:
+    """
+    将多选字段的取值展开成选项列表。
+    """
+    if value is None:
+        return None
+    elif isinstance(value, list):
+        return [text(item) for item in value]
+    else:
+        return [text(value)]
+
+
+def numbers(column: Series) -> Series:
+    """
+    解码为浮点数：公式等返回的嵌套结构先展开成文本。
+    """
+    try:
+        return to_numeric(column, errors='coerce').astype('Float64')
+    except TypeError:
+        return to_numeric(column.map(text, na_action='ignore'), errors='coerce').astype('Float64')
+
+
+def timestamps(column: Series) -> Series:
+    """
+    毫秒级时间戳解码为本地时间。
+    """
+    milliseconds = numbers(column)
+    stamps = to_datetime(milliseconds.astype('float64'), unit='ms', utc=True)
+    return stamps.dt.tz_convert(datetime.now().astimezone().tzinfo).dt.tz_localize(None)
+
+
+def column_type(kind: Optional[int]) -> str:
+    """
+    字段类型对应的DuckDB列类型。
+    """
+    if kind in NUMBER_TYPES:
+        return 'DOUBLE'
+    elif kind in TIMESTAMP_TYPES:
+        return 'TIMESTAMP'
+    elif kind == CHECKBOX:
+        return 'BOOLEAN'
+    elif kind == MULTI_SELECT or kind in IDENTITY_TYPES:
+        return 'VARCHAR[]'
+    else:
+        return 'VARCHAR'
+
+
+def decode_column(column: Series, kind: Optional[int]) -> Series:
+    """
+    按字段类型解码一列。
+    """
+    if kind in NUMBER_TYPES:
+        return numbers(column)
+    elif kind in TIMESTAMP_TYPES:
+        return timestamps(column)
+    elif kind == CHECKBOX:
+        return column.map(bool, na_action='ignore').astype('boolean')
+    elif kind == MULTI_SELECT:
+        return column.map(options, na_action='ignore')
+    elif kind in IDENTITY_TYPES:
+        return column.map(identities, na_action='ignore')
+    elif infer_dtype(column, skipna=True) in ('string', 'empty'):
+        return column.astype('string')
+    else:
+        return column.map(text, na_action='ignore').astype('string')
+
+
+def columns(fields: list[Field]) -> dict[str, str]:
+    """
+    多维表格各列的DuckDB类型：记录编号位于最后一列。
+    """
+    return {
+        **{field['field_name']: column_type(field['type']) for field in fields if field['field_name'] != RECORD_ID},
+        RECORD_ID: 'VARCHAR',
+    }
+
+
+def decode_records(records: list[Record], fields: list[Field]) -> DataFrame:
+    """
+    将一页记录按列解码成DataFrame：列的顺序与`columns`一致。
+    """
+    data = {
+        field['field_name']: decode_column(Series([record['fields'].get(field['field_name']) for record in records], dtype=object), field['type'])
+        for field in fields
+        if field['field_name'] != RECORD_ID
+    }
+    data[RECORD_ID] = Series([record['record_id'] for record in records], dtype='string')
+    return DataFrame(data)
@@ -0,0 +1,169 @@
+"""
+多维表格字段编码：按列将查询结果转换成飞书接口要求的字段取值。
+- 按多维表格现有字段的类型转换：日期转为毫秒级时间戳，数字、复选框、多选、人员、关联等转为对应的结构。
+- 多维表格中不存在的列，按数据类型转换：日期时间转为毫秒级时间戳，Decimal转为浮点数。
+- 系统计算的字段（公式、创建时间等）不可写入，直接忽略。
+- 空值统一转为None。
+"""
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from pandas import DataFrame, Series, Timestamp, Timedelta, NaT, to_datetime, to_numeric
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype, infer_dtype
+
+from duckcp.feishu.bitable import (
+    Field,
+    NUMBER, MULTI_SELECT, DATE_TIME, CHECKBOX, USER, URL, SINGLE_LINK, DUPLEX_LINK, GROUP_CHAT,
+    TEXT, SINGLE_SELECT, PHONE, READONLY_TYPES,
+)
+
+logger = logging.getLogger(__name__)
+
+EPOCH = Timestamp(0, tz='UTC')  # 时间戳的起点
+MILLISECOND = Timedelta(milliseconds=1)
+TRUE_TEXTS = ['true', 't', 'yes', 'y', '1']  # 表示真值的文本：不区分大小写
+SEPARATOR = ','  # 多选、人员等字段以文本提供时，多个取值之间的分隔符
+TEXT_TYPES = {TEXT, SINGLE_SELECT, PHONE}  # 以文本表示的字段类型
+
+
+def finish(values: Series, missing: Series) -> list[Any]:
+    """
+    转换成Python原生类型的列表：空值转为None。
+    """
+    return [None if empty else value for value, empty in zip(values.astype(object).tolist(), missing.tolist())]  # 勿用where：对象列会被转为浮点数
+
+
+def report(column: Series, missing: Series, converted: Series):
+    """
+    记录无法转换、只能写入空值的取值。
+    """
+    lost = converted.isna() & ~missing
+    if lost.any():
+        logger.warning('字段(%s)有%s个取值无法转换，写入空值：%s', column.name, lost.sum(), column[lost].head(3).tolist())
+
+
+def to_timestamp(value: Any) -> Optional[Timestamp]:
+    """
+    单个取值转为UTC时间：不带时区的按本地时区处理；无法识别时返回None。
+    """
+    try:
+        stamp = Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if stamp is NaT:
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(datetime.now().astimezone().tzinfo)
+    return stamp.tz_convert('UTC')
+
+
+def split(value: Any) -> list[Any]:
+    """
+    将多值字段的取值拆分成列表：文本按分隔符拆分。
+    """
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(SEPARATOR) if item.strip()]
+    elif hasattr(value, 'tolist'):  # numpy数组
+        return value.tolist()
+    elif isinstance(value, (list, tuple, set)):
+        return list(value)
+    else:
+        return [value]
+
+
+def encode_timestamps(column: Series, missing: Series) -> list[Any]:
+    """
+    日期时间转为毫秒级时间戳：不带时区的按本地时区处理；同一列中可以混合不同的时区偏移。
+    """
+    if is_datetime64_any_dtype(column):
+        stamps = column
+        if stamps.dt.tz is None:
+            stamps = stamps.dt.tz_localize(datetime.now().astimezone().tzinfo, ambiguous='NaT', nonexistent='NaT')
+    else:  # 逐个转换：文本或混合时区偏移的日期时间无法整列转换
+        stamps = to_datetime(column.map(to_timestamp, na_action='ignore'), utc=True)
+    milliseconds = ((stamps - EPOCH) // MILLISECOND).astype('Int64')
+    report(column, missing, milliseconds)
+    return finish(milliseconds, missing | milliseconds.isna())
+
+
+def encode_numbers(column: Series, missing: Series) -> list[Any]:
+    """
+    转为数字：整数保持不变，Decimal与文本转为浮点数。
+    """
+    if (is_numeric_dtype(column) and not is_bool_dtype(column)) or infer_dtype(column, skipna=True) in ('integer', 'floating', 'mixed-integer-float'):
+        return finish(column, missing)
+    try:
+        numbers = column.where(~missing, None).astype('float64')
+    except (TypeError, ValueError):
+        numbers = to_numeric(column.where(~missing, None), errors='coerce')
+        report(column, missing, numbers)
+    return finish(numbers, missing | numbers.isna())
+
+
+def encode_booleans(column: Series, missing: Series) -> list[Any]:
+    """
+    转为复选框：文本按常见的真值表示判断。
+    """
+    if is_bool_dtype(column) or is_numeric_dtype(column):
+        return finish(column.fillna(0).astype(bool), missing)
+    return finish(column.astype(str).str.strip().str.lower().isin(TRUE_TEXTS), missing)
+
+
+def encode_texts(column: Series, missing: Series) -> list[Any]:
+    """
+    转为文本。
+    """
+    if infer_dtype(column, skipna=True) == 'string':
+        return finish(column, missing)
+    return finish(column.astype(str), missing)
+
+
+def encode_column(column: Series, kind: Optional[int]) -> list[Any]:
+    """
+    按字段类型转换一列；未知类型按数据类型转换。
+    """
+    missing = column.isna()
+    if kind == DATE_TIME:
+        return encode_timestamps(column, missing)
+    elif kind == NUMBER:
+        return encode_numbers(column, missing)
+    elif kind == CHECKBOX:
+        return encode_booleans(column, missing)
+    elif kind in TEXT_TYPES:
+        return encode_texts(column, missing)
+    elif kind == MULTI_SELECT:
+        return finish(column.map(lambda value: [str(item) for item in split(value)], na_action='ignore'), missing)
+    elif kind in (USER, GROUP_CHAT):
+        return finish(column.map(lambda value: [{'id': str(item)} for item in split(value)], na_action='ignore'), missing)
+    elif kind in (SINGLE_LINK, DUPLEX_LINK):
+        return finish(column.map(lambda value: [str(item) for item in split(value)], na_action='ignore'), missing)
+    elif kind == URL:
+        return finish(column.map(lambda value: value if isinstance(value, dict) else {'text': str(value), 'link': str(value)}, na_action='ignore'), missing)
+
+    # 未知类型：按数据类型转换
+    inferred = infer_dtype(column, skipna=True)
+    if is_datetime64_any_dtype(column) or inferred in ('datetime', 'datetime64', 'date'):
+        return encode_timestamps(column, missing)
+    elif inferred == 'decimal':
+        return encode_numbers(column, missing)
+    elif column.dtype == object and inferred not in ('string', 'empty'):  # 列表等：numpy数组与标量转为原生类型
+        return [value.tolist() if hasattr(value, 'tolist') else value for value in finish(column, missing)]
+    else:
+        return finish(column, missing)
+
+
+def encode_frame(frame: DataFrame, fields: list[Field]) -> list[dict[str, Any]]:
+    """
+    将一批查询结果按列转换成多维表格记录的字段取值。
+    """
+    kinds = {field['field_name']: field['type'] for field in fields}
+    names, columns = [], []
+    for name in frame.columns:
+        kind = kinds.get(name)
+        if kind in READONLY_TYPES:
+            logger.warning('字段(%s)由系统计算，忽略写入', name)
+            continue
+        names.append(name)
+        columns.append(encode_column(frame[name], kind))
+    return [dict(zip(names, values)) for values in zip(*columns)]
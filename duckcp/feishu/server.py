@@ -0,0 +1,381 @@
+"""
+飞书开放接口的本地替身：在内存中实现访问凭证与多维表格接口，用于离线测试与性能评估。
+- 可注入每个请求的延迟、分页大小上限、每秒请求数上限以及指定接口依次返回的错误码。
+- 仓库通过`--open-api`指向替身的地址即可使用，例如`http://127.0.0.1:8000/open-apis`。
+- 通过`python -m duckcp.feishu.server`独立启动，或在进程内通过`FeiShuServer`启动。
+"""
+import logging
+import re
+from collections import Counter, deque
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from itertools import count
+from threading import Thread, Lock
+from time import sleep, monotonic
+from typing import Any, Optional, Self
+from urllib.parse import urlparse, parse_qs
+from uuid import uuid4
+
+from click import command, option, help_option, INT, FLOAT
+
+from duckcp.helper.serialization import json_encode, json_decode
+
+logger = logging.getLogger(__name__)
+
+PREFIX = '/open-apis'  # 开放接口地址的路径前缀
+TOKEN_EXPIRE = 7200  # 访问凭证的有效时长；单位秒
+MAX_PAGE_SIZE = 500  # 分页查询单页最多返回的记录数
+PAYLOAD_LIMIT = 10 * 1024 * 1024  # 请求体的字节数上限
+RATE_LIMITED_CODE = 99991400  # 请求频率超限
+INVALID_TOKEN_CODE = 99991663  # 访问凭证无效
+INVALID_PARAMETER_CODE = 1254001  # 请求参数错误
+RECORD_NOT_FOUND_CODE = 1254043  # 记录不存在
+RECORD_LIMITS = {  # 批量接口单次最多提交的记录数
+    'batch_create': 1000,
+    'batch_delete': 500,
+    'batch_update': 1000,
+    'batch_get': 100,
+}
+UI_TYPES = {1: 'Text', 2: 'Number', 3: 'SingleSelect', 4: 'MultiSelect', 5: 'DateTime', 7: 'Checkbox', 11: 'User', 15: 'Url'}  # 字段类型对应的界面类型
+ROUTES = [  # 接口名称、请求方法与路径
+    ('tenant_access_token', 'POST', re.compile(r'/auth/v3/tenant_access_token/internal/?')),
+    ('list_fields', 'GET', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/fields')),
+    ('list_records', 'POST', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/records/search')),
+    ('batch_create', 'POST', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/records/batch_create')),
+    ('batch_delete', 'POST', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/records/batch_delete')),
+    ('batch_update', 'POST', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/records/batch_update')),
+    ('batch_get', 'POST', re.compile(r'/bitable/v1/apps/(?P<document>[^/]+)/tables/(?P<table>[^/]+)/records/batch_get')),
+]
+
+type Reply = tuple[int, dict[str, Any]]  # HTTP状态码与响应内容
+
+
+def failure(code: int, message: str, status: int = HTTPStatus.OK) -> Reply:
+    """
+    接口错误响应：飞书的业务错误同样以HTTP 200返回。
+    """
+    return status, {'code': code, 'msg': message}
+
+
+def success(data: Optional[dict[str, Any]] = None, **others: Any) -> Reply:
+    """
+    接口成功响应。
+    """
+    body = {'code': 0, 'msg': 'success', **others}
+    if data is not None:
+        body['data'] = data
+    return HTTPStatus.OK, body
+
+
+def field_type(value: Any) -> int:
+    """
+    根据取值推断字段类型：2为数字，7为复选框，其余按1文本处理。
+    """
+    if isinstance(value, bool):
+        return 7
+    elif isinstance(value, (int, float)):
+        return 2
+    else:
+        return 1
+
+
+class FeiShuServer:
+    """
+    飞书开放接口的本地替身。
+    - 多维表格按(文档编号, 表格编号)区分，首次写入时自动创建；字段由写入的数据推断。
+    - 每秒请求数超过上限时返回HTTP 429；请求体超过上限时返回HTTP 413。
+    - 通过`inject`指定接口依次返回的错误码，用于模拟偶发失败。
+    """
+    host: str
+    port: int
+    latency: float  # 每个请求的额外延迟；单位秒
+    page_size: int  # 分页查询单页最多返回的记录数
+    rate_limit: Optional[int]  # 每秒最多处理的请求数：未指定时不限制
+    payload_limit: int  # 请求体的字节数上限
+    tables: dict[tuple[str, str], dict[str, dict[str, Any]]]  # 各多维表格的记录：记录编号 → 字段数据
+    fields: dict[tuple[str, str], dict[str, int]]  # 各多维表格的字段：字段名 → 字段类型
+    errors: dict[str, deque[int]]  # 各接口依次返回的错误码
+    requests: Counter  # 各接口处理的请求数
+    tokens: set[str]  # 已发放的访问凭证
+    arrivals: deque[float]  # 最近一秒内请求到达的时刻
+    lock: Lock
+    sequence: count  # 记录编号的序号
+    server: Optional[ThreadingHTTPServer]
+    thread: Optional[Thread]
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency: float = 0.0,
+            page_size: int = MAX_PAGE_SIZE,
+            rate_limit: Optional[int] = None,
+            payload_limit: int = PAYLOAD_LIMIT,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.page_size = page_size
+        self.rate_limit = rate_limit
+        self.payload_limit = payload_limit
+        self.tables = {}
+        self.fields = {}
+        self.errors = {}
+        self.requests = Counter()
+        self.tokens = set()
+        self.arrivals = deque()
+        self.lock = Lock()
+        self.sequence = count(1)
+        self.server = None
+        self.thread = None
+
+    @property
+    def open_api(self) -> str:
+        """
+        开放接口地址：用于仓库的`open_api`参数。
+        """
+        return f'http://{self.host}:{self.port}{PREFIX}'
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exception_class, exception, traceback):
+        self.stop()
+
+    def start(self) -> Self:
+        """
+        在后台线程中启动服务；端口为0时自动分配。
+        """
+        self.server = ThreadingHTTPServer((self.host, self.port), self.handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = Thread(target=self.server.serve_forever, name='feishu-server', daemon=True)
+        self.thread.start()
+        logger.info('飞书开放接口替身已启动(%s)', self.open_api)
+        return self
+
+    def stop(self):
+        """
+        停止服务。
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server, self.thread = None, None
+            logger.info('飞书开放接口替身已停止')
+
+    def inject(self, api: str, code: int, times: int = 1):
+        """
+        指定接口接下来的若干次请求返回错误码。
+        """
+        with self.lock:
+            self.errors.setdefault(api, deque()).extend([code] * times)
+
+    def define(self, document: str, table: str, fields: dict[str, int]):
+        """
+        预先定义多维表格的字段：字段名 → 字段类型。
+        """
+        with self.lock:
+            self.fields.setdefault((document, table), {}).update(fields)
+
+    def records(self, document: str, table: str) -> dict[str, dict[str, Any]]:
+        """
+        多维表格现有的记录。
+        """
+        return self.tables.setdefault((document, table), {})
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        """
+        绑定到本服务的请求处理器。
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self.reply(*server.dispatch('GET', self.path, self.headers, b''))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self.reply(*server.dispatch('POST', self.path, self.headers, body))
+
+            def reply(self, status: int, body: dict[str, Any]):
+                content = json_encode(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, pattern: str, *arguments: Any):
+                logger.debug(pattern, *arguments)
+
+        return Handler
+
+    def throttled(self) -> bool:
+        """
+        判断请求是否超过每秒请求数上限。
+        """
+        if self.rate_limit is None:
+            return False
+        now = monotonic()
+        with self.lock:
+            while self.arrivals and now - self.arrivals[0] >= 1:
+                self.arrivals.popleft()
+            if len(self.arrivals) >= self.rate_limit:
+                return True
+            self.arrivals.append(now)
+            return False
+
+    def dispatch(self, method: str, url: str, headers: Any, body: bytes) -> Reply:
+        """
+        按路径分发请求。
+        """
+        uri = urlparse(url)
+        if not uri.path.startswith(PREFIX):
+            return failure(HTTPStatus.NOT_FOUND, 'not found', HTTPStatus.NOT_FOUND)
+        path = uri.path[len(PREFIX):]
+        for api, verb, pattern in ROUTES:
+            if verb == method and (matched := pattern.fullmatch(path)):
+                break
+        else:
+            return failure(HTTPStatus.NOT_FOUND, 'not found', HTTPStatus.NOT_FOUND)
+
+        if self.latency > 0:
+            sleep(self.latency)
+        with self.lock:
+            self.requests[api] += 1
+            code = self.errors[api].popleft() if self.errors.get(api) else None
+        if self.throttled():
+            return failure(RATE_LIMITED_CODE, 'request trigger frequency limit', HTTPStatus.TOO_MANY_REQUESTS)
+        if len(body) > self.payload_limit:
+            return failure(INVALID_PARAMETER_CODE, 'request body too large', HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        if code is not None:
+            return failure(code, 'injected error')
+
+        query = {name: values[-1] for name, values in parse_qs(uri.query).items()}
+        params = json_decode(body) if body else {}
+        if api == 'tenant_access_token':
+            return self.tenant_access_token(params)
+        if headers.get('Authorization', '').removeprefix('Bearer ') not in self.tokens:
+            return failure(INVALID_TOKEN_CODE, 'invalid access token')
+        document, table = matched['document'], matched['table']
+        with self.lock:
+            if api in RECORD_LIMITS:
+                items = params.get('record_ids' if api == 'batch_get' else 'records') or []
+                if len(items) > RECORD_LIMITS[api]:
+                    return failure(INVALID_PARAMETER_CODE, f'records exceed limit {RECORD_LIMITS[api]}')
+            return getattr(self, api)(document, table, query, params)
+
+    def tenant_access_token(self, params: dict[str, Any]) -> Reply:
+        """
+        发放访问凭证：接受任意的应用编码与密钥。
+        """
+        if not params.get('app_id') or not params.get('app_secret'):
+            return failure(INVALID_PARAMETER_CODE, 'app_id or app_secret is empty')
+        token = f't-{uuid4().hex}'
+        with self.lock:
+            self.tokens.add(token)
+        return success(tenant_access_token=token, expire=TOKEN_EXPIRE)
+
+    def list_fields(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        fields = self.fields.get((document, table), {})
+        items = [{
+            'field_id': f'fld{index:08d}',
+            'field_name': name,
+            'type': kind,
+            'ui_type': UI_TYPES.get(kind, 'Text'),
+            'is_primary': index == 0,
+            'is_hidden': False,
+            'description': '',
+        } for index, (name, kind) in enumerate(fields.items())]
+        return success({'has_more': False, 'page_token': '', 'total': len(items), 'items': items})
+
+    def list_records(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        records = self.records(document, table)
+        size = min(int(query.get('page_size') or 20), self.page_size)
+        start = int(query.get('page_token') or 0)
+        page = list(records.items())[start:start + size]
+        more = start + size < len(records)
+        return success({
+            'has_more': more,
+            'page_token': str(start + size) if more else '',
+            'total': len(records),
+            'items': [{'record_id': record_id, 'fields': fields} for record_id, fields in page],
+        })
+
+    def __remember(self, document: str, table: str, fields: dict[str, Any]):
+        """
+        根据写入的数据补充字段。
+        """
+        known = self.fields.setdefault((document, table), {})
+        for name, value in fields.items():
+            if name not in known and value is not None:
+                known[name] = field_type(value)
+
+    def batch_create(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        records = self.records(document, table)
+        created = []
+        for record in params.get('records') or []:
+            record_id = f'rec{next(self.sequence):012d}'
+            fields = {name: value for name, value in (record.get('fields') or {}).items() if value is not None}
+            self.__remember(document, table, fields)
+            records[record_id] = fields
+            created.append({'record_id': record_id, 'fields': fields})
+        return success({'records': created})
+
+    def batch_delete(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        records = self.records(document, table)
+        return success({'records': [
+            {'record_id': record_id, 'deleted': records.pop(record_id, None) is not None}
+            for record_id in params.get('records') or []
+        ]})
+
+    def batch_update(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        records = self.records(document, table)
+        items = params.get('records') or []
+        absent = [record.get('record_id') for record in items if record.get('record_id') not in records]
+        if absent:
+            return failure(RECORD_NOT_FOUND_CODE, f'RecordIdNotFound: {absent[0]}')
+        updated = []
+        for record in items:
+            fields = records[record['record_id']]
+            for name, value in (record.get('fields') or {}).items():
+                if value is None:
+                    fields.pop(name, None)
+                else:
+                    fields[name] = value
+            self.__remember(document, table, fields)
+            updated.append({'record_id': record['record_id'], 'fields': fields})
+        return success({'records': updated})
+
+    def batch_get(self, document: str, table: str, query: dict[str, str], params: dict[str, Any]) -> Reply:
+        records = self.records(document, table)
+        identities = params.get('record_ids') or []
+        return success({
+            'records': [{'record_id': record_id, 'fields': records[record_id]} for record_id in identities if record_id in records],
+            'absent_record_ids': [record_id for record_id in identities if record_id not in records],
+            'forbidden_record_ids': [],
+        })
+
+
+@command(help='启动飞书开放接口的本地替身')
+@option('--host', metavar='HOST', default='127.0.0.1', show_default=True, help='监听地址')
+@option('-p', '--port', type=INT, metavar='PORT', default=8000, show_default=True, help='监听端口')
+@option('--latency', type=FLOAT, metavar='SECONDS', default=0.0, show_default=True, help='每个请求的额外延迟')
+@option('--page-size', type=INT, metavar='N', default=MAX_PAGE_SIZE, show_default=True, help='分页查询单页最多返回的记录数')
+@option('--rate-limit', type=INT, metavar='N', help='每秒最多处理的请求数')
+@help_option('-h', '--help', help='展示帮助信息')
+def main(host: str, port: int, latency: float, page_size: int, rate_limit: Optional[int]):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    with FeiShuServer(host, port, latency, page_size, rate_limit) as server:
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
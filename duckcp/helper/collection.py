@@ -1,6 +1,7 @@
 """
 数据结构帮助函数。
 """
+from typing import Any
 
 
 def chunk[T](data: list[T], size: int) -> list[list[T]]:
@@ -8,3 +9,16 @@ def chunk[T](data: list[T], size: int) -> list[list[T]]:
     将数据按照每[size]个一组分组。
     """
     return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+def split_range(lower: Any, upper: Any, count: int) -> list[Any]:
+    """
+    将闭区间[lower, upper]均分成最多count段，返回各段的起点（升序、去重）。
+    支持整数、小数、日期与时间；整数按整数步长切分，避免出现小数。
+    """
+    span = upper - lower
+    if isinstance(lower, int):
+        starts = [lower + span * index // count for index in range(count)]
+    else:
+        starts = [lower + span * index / count for index in range(count)]
+    return sorted(set(starts))
@@ -83,3 +83,25 @@ def sha512(data: str) -> str:
     :return: SHA512字符串。
     """
     return hash_encode(hashlib.sha512, data)
+
+
+# 文件版本
+
+def hash_encode_file(algorithm: Callable, file: str) -> str:
+    """
+    通过Hash算法编码文件内容：分块读取，不会一次性载入整个文件。
+    :param algorithm: hashlib包里的算法。
+    :param file: 文件路径。
+    :return: 密文字符串。
+    """
+    with open(file, 'rb') as f:
+        return hashlib.file_digest(f, algorithm).hexdigest()
+
+
+def sha256_file(file: str) -> str:
+    """
+    计算文件内容的SHA256摘要。
+    :param file: 文件路径。
+    :return: SHA256字符串。
+    """
+    return hash_encode_file(hashlib.sha256, file)
@@ -1,12 +1,16 @@
 """
 文件系统帮助函数。
 """
+import gzip
 import logging
+from datetime import datetime
 from functools import lru_cache
-from os import makedirs, unlink, getcwd, chdir
-from os.path import abspath, expanduser, expandvars, exists, join, dirname
+from glob import escape, glob
+from os import makedirs, unlink, symlink, replace, readlink
+from os.path import abspath, expanduser, expandvars, exists, join, dirname, basename, islink
 from platform import system
 from shutil import rmtree, move
+from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
@@ -57,31 +61,18 @@ def spit(file: str, content: str):
         return f.write(content)
 
 
-# 路径
-
-class WorkDirectory:
+def read_line(file: str, skip: int = 0) -> str:
     """
-    临时切换当前工作目录。
+    跳过开头若干行后，读取文件的一行内容（不含换行符）；支持gzip压缩的文件。
     """
-    origin: str  # 当前工作目录
-    directory: str  # 目标工作目录
-
-    def __init__(self, directory: str):
-        self.origin = getcwd()
-        self.directory = absolute_path(directory)
-
-    def __enter__(self):
-        """
-        将工作目录临时切换到指定的目录
-        """
-        chdir(self.directory)
+    opener = gzip.open if file.endswith('.gz') else open
+    with opener(file, 'rt', encoding='utf-8', errors='replace', newline='') as f:
+        for _ in range(skip):
+            f.readline()
+        return f.readline().rstrip('\r\n')
 
-    def __exit__(self, exception_class, exception, tracebacks):
-        """
-        将工作目录临时切换回原始目录
-        """
-        chdir(self.origin)
 
+# 路径
 
 def absolute_path(path: str) -> str:
     """
@@ -110,6 +101,48 @@ def remove_folder(folder: str):
         rmtree(folder)
 
 
+def version_folder(path: str) -> str:
+    """
+    生成目标目录的新版本目录路径：与目标目录同级，且以`.`开头，避免被Spark、DuckDB等读取方扫描到。
+    """
+    return join(dirname(path), f'.{basename(path)}.{datetime.now():%Y%m%d%H%M%S}-{uuid4().hex[:8]}')
+
+
+def publish_folder(version: str, target: str):
+    """
+    将已写入完成的版本目录原子地发布为目标目录：
+    1. 目标路径是指向当前版本目录的符号链接，通过重命名新链接覆盖旧链接完成切换。
+    2. 目标路径若是普通目录（历史数据），先将其移到旁边作为上一个版本。
+    3. 保留上一个版本供切换前已开始读取的读取方使用，删除更早的版本。
+    不支持符号链接的平台（例如未授权的Windows）退化为先移走旧目录、再重命名新目录。
+    """
+    previous = None
+    if islink(target):
+        previous = join(dirname(target), readlink(target))
+    elif exists(target):
+        previous = version_folder(target)
+        logger.warning('目录(%s)不是符号链接，移至(%s)后再发布', target, previous)
+        move(target, previous)
+
+    link = f'{version}.link'
+    try:
+        symlink(basename(version), link, target_is_directory=True)
+    except OSError as e:
+        logger.warning('无法创建符号链接(%s)：%s；改为直接重命名目录', link, e)
+        move(version, target)
+    else:
+        replace(link, target)
+    logger.info('发布目录(%s)至(%s)', version, target)
+
+    for folder in glob(join(dirname(target), f'.{escape(basename(target))}.*')):
+        if folder in (version, previous):
+            continue
+        elif islink(folder):  # 中断时遗留的链接
+            unlink(folder)
+        else:
+            remove_folder(folder)
+
+
 # XDG
 
 @lru_cache()
@@ -1,11 +1,18 @@
 import logging
 from collections.abc import Sequence, Mapping
+from datetime import date, datetime
 from numbers import Number
 from typing import Optional, Any
+from uuid import uuid4
 
 from sqlglot import parse, Expression
+from sqlglot.errors import ParseError
+from sqlglot.tokens import TokenType
+from sqlglot.dialects.dialect import Dialect
 from sqlglot.dialects.duckdb import DuckDB
-from sqlglot.expressions import With, CTE, Table, Create, Identifier, From, Delete, Insert, Schema, Values, Tuple, Copy, Literal, CopyParameter, Var, Boolean, Struct, Array, Null, PropertyEQ
+from sqlglot.expressions import With, CTE, Table, Create, Identifier, From, Delete, Insert, Schema, Values, Tuple, Copy, Literal, CopyParameter, Var, Boolean, Struct, Array, Null, PropertyEQ, Select, Star, ReadCSV, Anonymous, EQ, Column, Query, Cast, DataType, GTE, LT, Is, Drop, LikeProperty, Property, Properties, UnloggedProperty, Paren, Neg, Not, And, Or, NEQ, GT, LTE, In, Between, Like, TableAlias, Join, ColumnDef, Alter, AlterColumn, Placeholder, and_, or_
+
+from duckcp.entity.federated_table import FederatedTable
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,10 @@ def to_expression(instance: Any) -> Expression:
         return Boolean(this=instance)
     elif isinstance(instance, str):
         return Literal.string(instance)
+    elif isinstance(instance, datetime):
+        return Cast(this=Literal.string(instance.isoformat(sep=' ')), to=DataType.build('timestamptz' if instance.tzinfo else 'timestamp'))
+    elif isinstance(instance, date):
+        return Cast(this=Literal.string(instance.isoformat()), to=DataType.build('date'))
     elif isinstance(instance, Number):
         return Literal.number(instance)
     elif isinstance(instance, Sequence):
@@ -33,6 +44,68 @@ def to_expression(instance: Any) -> Expression:
         raise ValueError(f'未知数据({instance})类型({type(instance)})')
 
 
+def create_or_replace_macro(name: str, value: Any) -> str:
+    """
+    创建DuckDB方言的create or replace macro语句：宏不接受参数，返回常量值。
+    sqlglot不支持宏语法，因此拼接语句；宏名与常量值仍由sqlglot转义。
+    """
+    logger.debug('name=%s, value=%s', name, value)
+    macro = Identifier(this=name, quoted=True).sql(dialect='duckdb')
+    expression = to_expression(value).sql(dialect='duckdb')
+    return f'create or replace macro {macro}() as {expression}'
+
+
+def is_query(sql: str, dialect: str) -> bool:
+    """
+    判断SQL是否只包含一条查询语句。
+    """
+    try:
+        statements = [statement for statement in parse(sql, dialect=dialect) if statement is not None]
+    except ParseError:
+        return False
+    return len(statements) == 1 and isinstance(statements[0], Query)
+
+
+def strip_query(sql: str, dialect: str) -> str:
+    """
+    去掉查询语句末尾的分号与注释，便于作为子查询嵌入其他语句。
+    """
+    tokens = Dialect.get_or_raise(dialect).tokenize(sql)
+    while tokens and tokens[-1].token_type == TokenType.SEMICOLON:
+        tokens.pop()
+    return sql[:tokens[-1].end + 1] if tokens else sql
+
+
+def bounds_query(sql: str, column: str, dialect: str) -> str:
+    """
+    生成查询某列最小值与最大值的语句：原查询作为子查询。
+    """
+    query = sql.strip().rstrip(';')
+    field = Identifier(this=column, quoted=True).sql(dialect=dialect)
+    return f'select min({field}) as lower_bound, max({field}) as upper_bound from ({query}) as duckcp_partition'
+
+
+def partition_query(sql: str, column: str, lower: Any, upper: Any, dialect: str) -> str:
+    """
+    在原查询外层添加分区列的范围条件`lower <= column < upper`：
+    - lower或upper为空时，表示该侧不限。
+    - lower为空的分区同时包含分区列为NULL的记录。
+    """
+    query = sql.strip().rstrip(';')
+    field = Column(this=Identifier(this=column, quoted=True))
+    conditions = []
+    if lower is not None:
+        conditions.append(GTE(this=field.copy(), expression=to_expression(lower)))
+    if upper is not None:
+        conditions.append(LT(this=field.copy(), expression=to_expression(upper)))
+    if not conditions:
+        return query
+    condition = and_(*conditions)
+    if lower is None:
+        condition = or_(condition, Is(this=field.copy(), expression=Null()))
+    return f'select * from ({query}) as duckcp_partition where {condition.sql(dialect=dialect)}'
+
+
 def extract_tables(sql: str) -> set[str]:
     """
     从SQL中提取真正的表名，忽略CTE、子查询等临时的表名。
@@ -55,6 +128,141 @@ def extract_tables(sql: str) -> set[str]:
     return tables
 
 
+PUSHDOWN_EXPRESSIONS = (  # 可下推的过滤条件中允许出现的表达式：各方言的写法一致
+    Column, Identifier, Literal, Null, Boolean, Paren, Neg, Not, And, Or,
+    EQ, NEQ, GT, GTE, LT, LTE, Is, In, Between, Like,
+)
+
+
+def nullable(select: Select, table: Table) -> bool:
+    """
+    判断表在查询中是否可能因外连接而补NULL：这类表不能下推WHERE中的过滤条件。
+    """
+    joins: list[Join] = select.args.get('joins') or []
+    if (source := select.args.get('from')) is not None and source.this is table:
+        return any(join.side in ('RIGHT', 'FULL') for join in joins)
+    for index, join in enumerate(joins):
+        if join.this is table:
+            return join.side in ('LEFT', 'FULL') or any(later.side in ('RIGHT', 'FULL') for later in joins[index + 1:])
+    return True  # 嵌套在括号连接等结构中：保守处理
+
+
+def federate(sql: str, repositories: set[str]) -> tuple[str, list[FederatedTable]]:
+    """
+    找出SQL中以仓库编码限定的表（`仓库.表`或`仓库.模式.表`），替换成本地的表名，并分析可下推的列与过滤条件：
+    - 列：查询中未限定表名、或限定为该表的列名；出现`*`时需要所有列。
+    - 过滤条件：WHERE中只引用该表列的合取项，且只包含比较、IN、BETWEEN、LIKE、IS NULL等通用表达式。
+    本地执行时仍保留完整的WHERE，下推只用于减少传输的数据量。
+    """
+    logger.debug('sql=%s, repositories=%s', sql, repositories)
+    statements = [statement for statement in parse(sql, dialect=DuckDB) if statement is not None]
+    if len(statements) != 1:
+        return sql, []
+    expression = statements[0]
+
+    tables = []
+    for table in list(expression.find_all(Table)):
+        repository = table.catalog or table.db
+        if not repository or repository not in repositories:
+            continue
+        name = table.alias_or_name
+        select = table.parent_select
+        if table.catalog:
+            remote = Table(this=table.this.copy(), db=table.args['db'].copy())
+        else:
+            remote = Table(this=table.this.copy())
+
+        columns, conditions = set(), []
+        if select is None or any(
+                isinstance(column, Star) or isinstance(column, Column) and isinstance(column.this, Star) and column.table in ('', name)
+                for column in select.expressions
+        ):
+            columns = None
+        else:
+            for column in select.find_all(Column):
+                if column.table in ('', name):
+                    columns.add(column.name)
+            for join in select.args.get('joins') or []:
+                columns.update(identifier.name for identifier in join.args.get('using') or [])
+
+        if select is not None and (where := select.args.get('where')) is not None and not nullable(select, table):
+            single = select.args.get('from') is not None and not select.args.get('joins')
+            for condition in where.this.flatten() if isinstance(where.this, And) else [where.this]:
+                references = list(condition.find_all(Column))
+                if (
+                        references
+                        and all(isinstance(node, PUSHDOWN_EXPRESSIONS) for node in condition.walk())
+                        and all(column.table == name or column.table == '' and single for column in references)
+                ):
+                    condition = condition.copy()
+                    for column in condition.find_all(Column):
+                        column.set('table', None)
+                        column.set('db', None)
+                        column.set('catalog', None)
+                    conditions.append(condition)
+
+        view = f'duckcp_{uuid4().hex}'
+        alias = table.args.get('alias') or TableAlias(this=table.this.copy())
+        table.replace(Table(this=Identifier(this=view, quoted=True), alias=alias.copy()))
+        tables.append(FederatedTable(view, repository, remote, columns, conditions))
+    return expression.sql(dialect='duckdb'), tables
+
+
+def csv_pattern(expression: Expression) -> Optional[str]:
+    """
+    若表达式是只有一个字符串参数的`read_csv`或`read_csv_auto`调用，返回文件模式；否则返回None。
+    带有其他参数的调用由用户自行指定了格式，不做处理。
+    """
+    if isinstance(expression, ReadCSV) and not expression.expressions:
+        argument = expression.this
+    elif isinstance(expression, Anonymous) and expression.name.lower() == 'read_csv_auto' and len(expression.expressions) == 1:
+        argument = expression.expressions[0]
+    else:
+        return None
+    return argument.this if isinstance(argument, Literal) and argument.is_string else None
+
+
+def read_csv(pattern: str, options: dict[str, Any]) -> ReadCSV:
+    """
+    生成显式指定格式参数的`read_csv`调用。
+    """
+    return ReadCSV(this=Literal.string(pattern), expressions=[EQ(
+        this=Column(this=Identifier(this=name)),
+        expression=to_expression(value),
+    ) for name, value in options.items()])
+
+
+def extract_csv_patterns(sql: str) -> set[str]:
+    """
+    从SQL中提取由DuckDB自动探测格式的CSV文件模式。
+    """
+    logger.debug('sql=%s', sql)
+    patterns = set()
+    for statement in parse(sql, dialect=DuckDB) or []:
+        for expression in statement.find_all(ReadCSV, Anonymous):
+            if pattern := csv_pattern(expression):
+                patterns.add(pattern)
+    return patterns
+
+
+def replace_csv_options(sql: str, options: dict[str, dict[str, Any]]) -> str:
+    """
+    为CSV文件模式显式指定格式参数，即：
+    `read_csv('<pattern>')`改写成`read_csv('<pattern>', <name> = <value>, ...)`。
+    """
+    logger.debug('sql=%s, options=%s', sql, options)
+
+    def transform(expression: Expression) -> Expression:
+        pattern = csv_pattern(expression)
+        return read_csv(pattern, options[pattern]) if pattern in options else expression
+
+    return ';\n'.join(
+        statement.transform(transform).sql(dialect=DuckDB)
+        for statement in parse(sql, dialect=DuckDB) or []
+        if statement is not None
+    )
+
+
 def create_or_replace_table(
         catalog: Optional[str],
         schema: Optional[str],
@@ -79,6 +287,77 @@ def create_or_replace_table(
                 catalog=Identifier(this='temp', quoted=False))))
 
 
+def create_table(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        columns: dict[str, str],
+) -> Expression:
+    """
+    创建DuckDB方言的create or replace table语句：按给定的列名与类型建表。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, columns=%s', catalog, schema, table, columns)
+    return Create(
+        this=Schema(
+            this=Table(
+                this=Identifier(this=table, quoted=True),
+                db=Identifier(this=schema, quoted=True) if schema else None,
+                catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+            expressions=[
+                ColumnDef(this=Identifier(this=name, quoted=True), kind=DataType.build(kind, dialect='duckdb'))
+                for name, kind in columns.items()
+            ]),
+        kind='table',
+        replace=True)
+
+
+def alter_column_type(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        column: str,
+        kind: str,
+        reset: bool = False,
+) -> Expression:
+    """
+    创建DuckDB方言的alter table ... alter column ... set data type语句：`reset`为真时不转换原有的值，直接置为空值。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, column=%s, kind=%s, reset=%s', catalog, schema, table, column, kind, reset)
+    return Alter(
+        this=Table(
+            this=Identifier(this=table, quoted=True),
+            db=Identifier(this=schema, quoted=True) if schema else None,
+            catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+        kind='TABLE',
+        actions=[AlterColumn(
+            this=Identifier(this=column, quoted=True),
+            dtype=DataType.build(kind, dialect='duckdb'),
+            using=Null() if reset else None)])
+
+
+def insert_into_table(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        source: str,
+) -> Expression:
+    """
+    创建DuckDB方言的insert into ... select * from ...语句。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, source=%s', catalog, schema, table, source)
+    return Insert(
+        this=Table(
+            this=Identifier(this=table, quoted=True),
+            db=Identifier(this=schema, quoted=True) if schema else None,
+            catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+        expression=Select(
+            expressions=[Star()]
+        ).from_(Table(
+            this=Identifier(this=source, quoted=True),
+            db=Identifier(this='main', quoted=False),
+            catalog=Identifier(this='temp', quoted=False))))
+
+
 def delete_from(
         catalog: Optional[str],
         schema: Optional[str],
@@ -100,11 +379,12 @@ def insert_into(
         schema: Optional[str],
         table: str,
         columns: list[str],
+        rows: int = 1,
 ) -> Expression:
     """
-    创建通用的新增记录语句。
+    创建通用的新增记录语句：每条语句包含`rows`行参数，参数占位符随生成语句的方言变化。
     """
-    logger.debug('catalog=%s, schema=%s, table=%s, columns=%s', catalog, schema, table, columns)
+    logger.debug('catalog=%s, schema=%s, table=%s, columns=%s, rows=%s', catalog, schema, table, columns, rows)
     return Insert(
         this=Schema(
             this=Table(
@@ -114,8 +394,11 @@ def insert_into(
             expressions=[Identifier(this=column, quoted=True) for column in columns]),
         expression=Values(
             expressions=[Tuple(
-                expressions=['?'] * len(columns)
-            )]))
+                expressions=[Placeholder()] * len(columns)
+            )] * rows))
+
+
+COLUMNS_PARAMETERS = {'partition_by', 'force_quote'}  # COPY语句中取值为列名列表的参数
 
 
 def copy_to(
@@ -133,6 +416,103 @@ def copy_to(
             catalog=Identifier(this='temp', quoted=True)),
         files=[Literal.string(file_name)],
         params=[
-            CopyParameter(this=Var(this=name), expression=to_expression(value))
+            CopyParameter(this=Var(this=name), expression=Tuple(expressions=[
+                Identifier(this=column, quoted=True)
+                for column in value
+            ]) if name in COLUMNS_PARAMETERS else to_expression(value))
             for name, value in parameters.items()
         ])
+
+
+def create_staging_table(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        staging: str,
+) -> Expression:
+    """
+    创建Postgres方言的暂存表语句：与目标表结构相同，且不写WAL日志。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, staging=%s', catalog, schema, table, staging)
+    return Create(
+        kind='TABLE',
+        this=Schema(
+            this=Table(
+                this=Identifier(this=staging, quoted=True),
+                db=Identifier(this=schema, quoted=True) if schema else None,
+                catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+            expressions=[LikeProperty(
+                this=Table(
+                    this=Identifier(this=table, quoted=True),
+                    db=Identifier(this=schema, quoted=True) if schema else None,
+                    catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+                expressions=[Property(this='INCLUDING', value=Var(this='DEFAULTS'))])]),
+        properties=Properties(expressions=[UnloggedProperty()]))
+
+
+def copy_from_stdin(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        columns: list[str],
+) -> Expression:
+    """
+    创建Postgres方言的COPY语句：从标准输入读取CSV格式的数据，未加引号的空字段表示NULL。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, columns=%s', catalog, schema, table, columns)
+    return Copy(
+        this=Schema(
+            this=Table(
+                this=Identifier(this=table, quoted=True),
+                db=Identifier(this=schema, quoted=True) if schema else None,
+                catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+            expressions=[Identifier(this=column, quoted=True) for column in columns]),
+        kind=True,
+        files=[Var(this='STDIN')],
+        params=[
+            CopyParameter(this=Var(this='FORMAT'), expression=Var(this='CSV')),
+        ])
+
+
+def insert_from(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+        source: str,
+        columns: list[str],
+) -> Expression:
+    """
+    创建通用的复制表数据语句：将同一模式下来源表的指定列插入目标表。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s, source=%s, columns=%s', catalog, schema, table, source, columns)
+    return Insert(
+        this=Schema(
+            this=Table(
+                this=Identifier(this=table, quoted=True),
+                db=Identifier(this=schema, quoted=True) if schema else None,
+                catalog=Identifier(this=catalog, quoted=True) if catalog else None),
+            expressions=[Identifier(this=column, quoted=True) for column in columns]),
+        expression=Select(
+            expressions=[Column(this=Identifier(this=column, quoted=True)) for column in columns]
+        ).from_(Table(
+            this=Identifier(this=source, quoted=True),
+            db=Identifier(this=schema, quoted=True) if schema else None,
+            catalog=Identifier(this=catalog, quoted=True) if catalog else None)))
+
+
+def drop_table(
+        catalog: Optional[str],
+        schema: Optional[str],
+        table: str,
+) -> Expression:
+    """
+    创建通用的删除表语句：表不存在时忽略。
+    """
+    logger.debug('catalog=%s, schema=%s, table=%s', catalog, schema, table)
+    return Drop(
+        kind='TABLE',
+        exists=True,
+        this=Table(
+            this=Identifier(this=table, quoted=True),
+            db=Identifier(this=schema, quoted=True) if schema else None,
+            catalog=Identifier(this=catalog, quoted=True) if catalog else None))
@@ -0,0 +1,22 @@
+"""
+运行环境帮助函数。
+"""
+import os
+from typing import Optional
+
+
+def cpu_count() -> int:
+    """
+    当前机器的CPU核数。
+    """
+    return os.cpu_count() or 1
+
+
+def memory_size() -> Optional[int]:
+    """
+    当前机器的物理内存字节数；无法获取时（例如Windows）返回None。
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
@@ -0,0 +1,13 @@
+-- 增量文件清单：由系统管理；记录迁移已处理过的来源文件
+create table if not exists manifests (
+  transformer_id bigint not null references transformers (id) -- 所属迁移
+    on update cascade
+    on delete cascade,
+  path text not null,                                         -- 文件路径：相对于来源仓库目录
+  size bigint not null,                                       -- 文件字节数
+  mtime bigint not null,                                      -- 修改时间：纳秒
+  checksum text not null,                                     -- 内容摘要
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  primary key (transformer_id, path)
+);
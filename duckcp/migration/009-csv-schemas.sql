@@ -0,0 +1,13 @@
+-- CSV格式缓存：由系统管理；记录文件仓库中CSV文件模式的探测结果
+create table if not exists csv_schemas (
+  repository_id bigint not null references repositories (id) -- 所属仓库
+    on update cascade
+    on delete cascade,
+  pattern text not null,                                       -- 文件模式：与迁移脚本中的写法一致
+  header text,                                                 -- 探测时的表头行：无表头则为空
+  options jsonb not null,                                      -- 格式参数：分隔符、字段类型等
+  elapsed real not null,                                       -- 探测耗时：秒
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  primary key (repository_id, pattern)
+);
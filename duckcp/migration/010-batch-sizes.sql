@@ -0,0 +1,12 @@
+-- 批大小：由系统管理；记录批量写入时自适应调整得到的最佳批大小
+create table if not exists batch_sizes (
+  storage_id bigint not null references storages (id) -- 所属存储单元
+    on update cascade
+    on delete cascade,
+  operation text not null,                              -- 写入操作：insert、create、delete
+  size int not null,                                    -- 最佳批大小：每批的记录数
+  throughput real not null,                             -- 最佳批大小对应的吞吐量：行/秒
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  primary key (storage_id, operation)
+);
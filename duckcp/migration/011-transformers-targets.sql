@@ -0,0 +1,12 @@
+-- 迁移的额外目标：同一份查询结果同时写入多个存储单元
+create table if not exists transformers_targets (
+  transformer_id bigint not null references transformers (id) -- 所属迁移
+    on update cascade
+    on delete cascade,
+  storage_id bigint not null references storages (id)         -- 额外的目标存储单元
+    on update cascade
+    on delete cascade,
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  primary key (transformer_id, storage_id)
+);
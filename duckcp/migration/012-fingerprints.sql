@@ -0,0 +1,9 @@
+-- 来源数据指纹：由系统管理；记录迁移上次成功执行时，来源仓库中指纹查询的结果摘要
+create table if not exists fingerprints (
+  transformer_id bigint not null primary key references transformers (id) -- 所属迁移
+    on update cascade
+    on delete cascade,
+  checksum text not null,                                                  -- 指纹摘要：包含迁移脚本与目标
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null
+);
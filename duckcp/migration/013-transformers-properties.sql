@@ -0,0 +1,2 @@
+-- 数据迁移：增加迁移选项
+alter table transformers add column properties jsonb default '{}' not null; -- 迁移选项
@@ -0,0 +1,2 @@
+-- 数据快照：增加记录的摘要
+alter table snapshots add column digests jsonb default '[]' not null; -- 记录的摘要：与记录一一对应
@@ -0,0 +1,17 @@
+-- 数据仓库：增加联邦类型；Sqlite无法修改检查约束，因此重建数据表
+pragma foreign_keys = off;
+begin;
+create table repositories_next (
+  id integer primary key autoincrement,
+  kind text not null,        -- 仓库类型
+  code text not null unique, -- 编码
+  properties jsonb not null, -- 连接信息
+  created_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  updated_at timestamp default (datetime(current_timestamp, 'localtime')) not null,
+  check ( kind in ('postgres', 'odps', 'duckdb', 'sqlite', 'bitable', 'file', 'federation') )
+);
+insert into repositories_next select * from repositories;
+drop table repositories;
+alter table repositories_next rename to repositories;
+commit;
+pragma foreign_keys = on;
@@ -1,10 +1,11 @@
 import logging
 from collections.abc import Sequence
 from enum import Enum
-from typing import Any, NamedTuple
+from typing import Any, NamedTuple, Optional
 
 from duckcp.repository.bitable_repository import BiTableRepository
 from duckcp.repository.duckdb_repository import DuckDBRepository
+from duckcp.repository.federation_repository import FederationRepository
 from duckcp.repository.file_repository import FileRepository
 from duckcp.repository.odps_repository import OdpsRepository
 from duckcp.repository.postgres_repository import PostgresRepository
@@ -13,6 +14,8 @@ from duckcp.transform.bitable_transform import bitable_transform
 from duckcp.transform.database_transform import database_transform
 from duckcp.transform.duckdb_transform import duckdb_transform
 from duckcp.transform.file_transform import file_transform
+from duckcp.transform.odps_transform import odps_transform
+from duckcp.transform.postgres_transform import postgres_transform
 from duckcp.typing.transform_type import Transform
 
 logger = logging.getLogger(__name__)
@@ -27,14 +30,14 @@ class RepositoryKind(Enum):
         PostgresRepository,
         ['database'],
         ['table'],
-        database_transform,
+        postgres_transform,
     )
     Odps = (
         'odps',
         OdpsRepository,
         ['end_point', 'project', 'access_key', 'access_secret'],
         ['table'],
-        database_transform,
+        odps_transform,
     )
     BiTable = (
         'bitable',
@@ -64,6 +67,13 @@ class RepositoryKind(Enum):
         ['file'],
         file_transform,
     )
+    Federation = (
+        'federation',
+        FederationRepository,
+        [],
+        [],
+        None,  # 只能作为迁移来源
+    )
 
     @staticmethod
     def codes() -> list[str]:
@@ -137,12 +147,19 @@ class RepositoryKind(Enum):
                 raise AssertionError(f'{self.code}类型仓库的存储缺少`{option}`')
 
     @property
-    def transform(self) -> Transform:
+    def transform(self) -> Optional[Transform]:
         """
-        当前类型仓库的迁移函数。
+        当前类型仓库的迁移函数：只能作为迁移来源的仓库为空。
         """
         return self.value[4]
 
+    def ensure_target(self):
+        """
+        确保当前类型的仓库可以作为迁移目标。
+        """
+        if self.transform is None:
+            raise AssertionError(f'{self.code}类型仓库只能作为迁移来源，不能作为迁移目标')
+
 
 def repository_constructor[T: tuple](record: Sequence[Any]) -> T:
     """
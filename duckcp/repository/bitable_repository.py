@@ -3,15 +3,16 @@ from typing import Any, Sequence, cast, NamedTuple
 
 import duckdb
 from duckdb.duckdb import DuckDBPyConnection
-from pandas import DataFrame
 
 from duckcp.configuration import meta_configuration as metadata
 from duckcp.entity.connection import Connection
 from duckcp.entity.executor import Executor
 from duckcp.entity.repository import Repository
-from duckcp.feishu import tenant_access_token, bitable
+from duckcp.feishu import OPEN_API, tenant_access_token, bitable
+from duckcp.feishu.field_decoder import decode_records, columns
 from duckcp.helper.sql import extract_tables
 from duckcp.helper.validation import ensure
+from duckcp.repository.duckdb_repository import connect_duckdb, load_frames
 from duckcp.service.authentication_service import Authenticator, authenticate
 from duckcp.typing.connection_protocol import ConnectionProtocol
 from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
@@ -32,11 +33,13 @@ class BiTableCursor:
     cursor: duckdb.DuckDBPyConnection
     authenticator: Authenticator  # 授信服务。
     tables: dict[str, BiTable]
+    open_api: str  # 开放接口地址
 
-    def __init__(self, cursor: DuckDBPyConnection, authenticator: Authenticator, tables: dict[str, BiTable]):
+    def __init__(self, cursor: DuckDBPyConnection, authenticator: Authenticator, tables: dict[str, BiTable], open_api: str):
         self.cursor = cursor
         self.authenticator = authenticator
         self.tables = tables
+        self.open_api = open_api
 
     @property
     def description(self) -> Sequence[SupportsGetItemProtocol]:
@@ -50,17 +53,18 @@ class BiTableCursor:
 
     def __prepare(self, sql: str):
         """
-        根据SQL语句中查询用到的表，动态地从远程多维表格中实时加载最新的数据。
+        根据SQL语句中查询用到的表，动态地从远程多维表格中实时加载最新的数据：
+        按字段类型建表，逐页按列解码后写入，不再由DuckDB推断嵌套对象的类型。
         """
         for table_name in extract_tables(sql):
             if table := self.tables.get(table_name):
-                records = bitable.list_records(self.authenticator(), table.document_code, table.code)
-                frame = DataFrame([{
-                    **record['fields'],
-                    'id': record['record_id'],
-                } for record in records])
-                self.cursor.execute(f' set global pandas_analyze_sample = {len(frame)} ')
-                self.cursor.register(table.name, frame)
+                access_token = self.authenticator()
+                fields = bitable.cached_fields(access_token, table.document_code, table.code, self.open_api)
+                rows = load_frames(self.cursor, table.name, (
+                    decode_records(records, fields)
+                    for records in bitable.record_pages(access_token, table.document_code, table.code, self.open_api)
+                ), columns(fields))
+                logger.debug('table=%s, rows=%s', table.name, rows)
 
     def executemany(self, sql: str, parameters: list[Sequence[Any]]):
         """
@@ -82,6 +86,12 @@ class BiTableCursor:
         """
         return self.cursor.fetchall()
 
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        return self.cursor.fetchmany(size)
+
 
 class BiTableConnection(Connection):
     """
@@ -89,18 +99,20 @@ class BiTableConnection(Connection):
     """
     authenticator: Authenticator  # 授信服务。
     tables: dict[str, BiTable]
+    open_api: str  # 开放接口地址
 
-    def __init__(self, connection: ConnectionProtocol, authenticator: Authenticator, tables: dict[str, BiTable]):
+    def __init__(self, connection: ConnectionProtocol, authenticator: Authenticator, tables: dict[str, BiTable], open_api: str):
         super().__init__(connection)
         self.authenticator = authenticator
         self.tables = tables
+        self.open_api = open_api
 
     def executor(self) -> Executor:
         """
         创建新的语句对象，对于执行查询语句。
         """
         cursor = cast(DuckDBPyConnection, self.connection.cursor())
-        return Executor(BiTableCursor(cursor, self.authenticator, self.tables))
+        return Executor(BiTableCursor(cursor, self.authenticator, self.tables, self.open_api))
 
 
 class BiTableRepository(Repository):
@@ -112,7 +124,14 @@ class BiTableRepository(Repository):
         """
         创建DuckDB内存数据库连接。
         """
-        return duckdb.connect(':memory:')
+        return connect_duckdb(':memory:', self.properties)
+
+    @property
+    def open_api(self) -> str:
+        """
+        飞书开放接口地址：未指定时使用飞书官方地址。
+        """
+        return (self.properties or {}).get('open_api') or OPEN_API
 
     @property
     def authenticator(self) -> Authenticator:
@@ -125,9 +144,11 @@ class BiTableRepository(Repository):
         ensure(bool(self.properties.get('access_secret')), '缺少访问密钥')
         access_secret = self.properties.get('access_secret')
         logger.debug('access_key=%s', access_key)
-        return authenticate('feishu', access_key, {
+        platform = 'feishu' if self.open_api == OPEN_API else f'feishu:{self.open_api}'  # 不同地址的凭证分开缓存
+        return authenticate(platform, access_key, {
             'access_key': access_key,
             'access_secret': access_secret,
+            'open_api': self.open_api,
         }, tenant_access_token)
 
     def connect(self) -> Connection:
@@ -151,4 +172,4 @@ class BiTableRepository(Repository):
                     ''', self.id, constructor=BiTable._make)
                 }
         connection = self.establish_connection()
-        return BiTableConnection(connection, self.authenticator, tables)
+        return BiTableConnection(connection, self.authenticator, tables, self.open_api)
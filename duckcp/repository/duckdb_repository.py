@@ -1,12 +1,96 @@
 import logging
+from collections.abc import Iterable
+from typing import Any, Optional
+from uuid import uuid4
 
 import duckdb
 from duckdb.duckdb import DuckDBPyConnection
+from pandas import DataFrame
 
+from duckcp.configuration import Configuration
 from duckcp.entity.repository import Repository
+from duckcp.helper.sql import create_or_replace_table, create_table, insert_into_table, alter_column_type
+from duckcp.helper.system import cpu_count, memory_size
 
 logger = logging.getLogger(__name__)
 
+SETTINGS = ['threads', 'memory_limit', 'temp_directory', 'preserve_insertion_order']  # 仓库可配置的DuckDB选项
+MEMORY_RATIO = 0.8  # DuckDB默认最多使用80%的物理内存
+
+
+def connect_duckdb(database: str, properties: Optional[dict[str, Any]], **config: Any) -> DuckDBPyConnection:
+    """
+    创建DuckDB数据库连接，并应用仓库中的资源配置：
+    - 仓库未指定线程数与内存上限时，按同时执行的迁移数均分本机的CPU与内存。
+    - 其他额外的配置通过`config`传入。
+    """
+    for name in SETTINGS:
+        if properties and properties.get(name) is not None:
+            config[name] = properties[name]
+    if Configuration.concurrency > 1:
+        if 'threads' not in config:
+            config['threads'] = max(1, cpu_count() // Configuration.concurrency)
+        if 'memory_limit' not in config and (memory := memory_size()) is not None:
+            config['memory_limit'] = f'{int(memory * MEMORY_RATIO / Configuration.concurrency) // 2 ** 20}MiB'
+    logger.debug('database=%s, config=%s', database, config)
+    return duckdb.connect(database, config=config)
+
+
+def common_type(connection: DuckDBPyConnection, left: str, right: str) -> str:
+    """
+    两种字段类型的公共类型：与union all合并两列时的规则一致。
+    """
+    if left == right:
+        return left
+    return str(connection.sql(f'select v from (select null::{left} as v union all select null::{right})').types[0])
+
+
+def load_frames(
+        connection: DuckDBPyConnection,
+        table: str,
+        frames: Iterable[DataFrame],
+        columns: Optional[dict[str, str]] = None,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+) -> int:
+    """
+    将按批次读取的DataFrame依次写入DuckDB表，返回写入的总行数：
+    - 首批重建表，后续批次追加；表的字段类型由首批数据推断。
+    - 后续批次的类型与表不一致时放宽字段类型：此前全为空值的列直接改为新类型，其余列改为两者的公共类型。
+    - 指定各列的类型时，先按类型建表，各批数据按列的顺序追加。
+    - 每批映射成临时视图后写入，内存中只保留当前一批。
+    """
+    view = f'duckcp_{uuid4().hex}'  # 视图名不能与目标表重名
+    rows = 0
+    types: dict[str, str] = {}  # 按数据推断时，目标表各列当前的类型
+    empty: set[str] = set()  # 按数据推断时，已写入的数据中全为空值的列
+    if columns is not None:
+        connection.execute(create_table(catalog, schema, table, columns).sql(dialect='duckdb'))
+    for index, data in enumerate(frames):
+        connection.execute(f' set global pandas_analyze_sample = {len(data)} ')
+        connection.register(view, data)
+        if columns is None:
+            kinds = dict(zip(data.columns, map(str, connection.table(view).types)))
+            filled = {name for name in data.columns if not data[name].isna().all()}
+            if index == 0:
+                types, empty = kinds, set(data.columns) - filled
+            else:
+                for name in filled:
+                    kind = kinds[name] if name in empty else common_type(connection, types[name], kinds[name])
+                    if kind != types[name]:
+                        logger.info('表(%s)的字段(%s)类型由%s放宽为%s', table, name, types[name], kind)
+                        connection.execute(alter_column_type(catalog, schema, table, name, kind, name in empty).sql(dialect='duckdb'))
+                        types[name] = kind
+                empty -= filled
+        if index == 0 and columns is None:
+            ast = create_or_replace_table(catalog, schema, table, view)
+        else:
+            ast = insert_into_table(catalog, schema, table, view)
+        connection.execute(ast.sql(dialect='duckdb'))
+        connection.unregister(view)
+        rows += len(data)
+    return rows
+
 
 class DuckDBRepository(Repository):
     """
@@ -19,4 +103,4 @@ class DuckDBRepository(Repository):
         """
         file = self.properties['file'] if self.properties and 'file' in self.properties else ':memory:'
         logger.debug('file=%s', file)
-        return duckdb.connect(file)
+        return connect_duckdb(file, self.properties)
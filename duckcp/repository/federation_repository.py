@@ -0,0 +1,182 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence, cast
+
+from duckdb.duckdb import DuckDBPyConnection
+from sqlglot import select
+from sqlglot.errors import ParseError
+from sqlglot.expressions import Column, Identifier, Star, and_
+
+from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.connection import Connection
+from duckcp.entity.executor import Executor
+from duckcp.entity.federated_table import FederatedTable
+from duckcp.entity.partitioned_cursor import SQL_DIALECTS
+from duckcp.entity.repository import Repository
+from duckcp.helper.sql import federate, drop_table
+from duckcp.repository.duckdb_repository import connect_duckdb, load_frames
+from duckcp.typing.connection_protocol import ConnectionProtocol
+from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
+
+logger = logging.getLogger(__name__)
+
+WHOLE_TABLE_KINDS = {'bitable'}  # 总是整表读取的仓库类型：不下推列与过滤条件
+
+
+class FederationCursor:
+    """
+    联邦查询游标：SQL中以仓库编码限定的表（`仓库.表`或`仓库.模式.表`），执行前从对应仓库读取至本地DuckDB，再在本地执行查询。
+    - 只读取查询用到的列，并将WHERE中只涉及该表的通用过滤条件下推至来源仓库执行。
+    - 多张表由多个线程并行读取，每张表使用来源仓库的独立连接，按批次流式写入本地表。
+    - 本地表在下一次执行或关闭游标时删除。
+    """
+    cursor: DuckDBPyConnection
+    repositories: dict[str, Repository]  # 可引用的仓库：按编码索引
+    views: list[str]  # 上一次执行时读取的本地表
+
+    def __init__(self, cursor: DuckDBPyConnection, repositories: dict[str, Repository]):
+        self.cursor = cursor
+        self.repositories = repositories
+        self.views = []
+
+    @property
+    def description(self) -> Sequence[SupportsGetItemProtocol]:
+        return self.cursor.description
+
+    def __reset(self):
+        """
+        删除上一次执行时读取的本地表。
+        """
+        for view in self.views:
+            self.cursor.execute(drop_table(None, None, view).sql(dialect='duckdb'))
+        self.views = []
+
+    def close(self):
+        """
+        关闭游标
+        """
+        self.__reset()
+        self.cursor.close()
+
+    def __load(self, table: FederatedTable):
+        """
+        从来源仓库读取一张表至本地：先探测表的列，再只读取用到的列与满足下推条件的记录。
+        """
+        repository = self.repositories[table.repository]
+        dialect = SQL_DIALECTS.get(repository.kind, 'duckdb')
+        with repository.connect() as connection:
+            projection, conditions = [Star()], []
+            if repository.kind not in WHOLE_TABLE_KINDS and (table.columns is not None or table.conditions):
+                with connection.executor() as executor:
+                    columns, _ = executor.execute(select('*').from_(table.table).limit(0).sql(dialect=dialect))
+                names = {column.lower() for column in columns}
+                if table.columns is not None:
+                    used = {column.lower() for column in table.columns}
+                    projection = [Column(this=Identifier(this=column, quoted=True)) for column in columns if column.lower() in used]
+                    projection = projection or [Column(this=Identifier(this=columns[0], quoted=True))]  # 例如只统计行数
+                conditions = [
+                    condition
+                    for condition in table.conditions
+                    if all(column.name.lower() in names for column in condition.find_all(Column))
+                ]
+            query = select(*projection).from_(table.table)
+            if conditions:
+                query = query.where(and_(*conditions))
+            sql = query.sql(dialect=dialect)
+            logger.info('从仓库(%s)读取数据(%s)', table.repository, sql)
+
+            with self.cursor.cursor() as cursor:
+                with connection.prepare(sql) as statement:
+                    rows = load_frames(cursor, table.view, statement.frames())
+            logger.debug('view=%s, rows=%s', table.view, rows)
+
+    def __prepare(self, sql: str) -> str:
+        """
+        读取SQL中引用的其他仓库的表，返回改写成本地表名后的SQL。
+        """
+        try:
+            sql, tables = federate(sql, set(self.repositories))
+        except ParseError:
+            return sql
+        if tables:
+            self.views = [table.view for table in tables]
+            with ThreadPoolExecutor(len(tables)) as pool:
+                for future in [pool.submit(self.__load, table) for table in tables]:
+                    future.result()
+        return sql
+
+    def executemany(self, sql: str, parameters: list[Sequence[Any]]):
+        """
+        批量执行。
+        """
+        self.__reset()
+        self.cursor.executemany(self.__prepare(sql), parameters)
+
+    def execute(self, sql: str, parameters: Sequence[Any] = None):
+        """
+        单句执行。
+        """
+        self.__reset()
+        return self.cursor.execute(self.__prepare(sql), parameters)
+
+    def fetchall(self) -> list[Sequence[Any]]:
+        """
+        获取查询结果。
+        """
+        return self.cursor.fetchall()
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        return self.cursor.fetchmany(size)
+
+
+class FederationConnection(Connection):
+    """
+    联邦查询连接：本地DuckDB内存数据库。
+    """
+    repositories: dict[str, Repository]  # 可引用的仓库：按编码索引
+
+    def __init__(self, connection: ConnectionProtocol, repositories: dict[str, Repository]):
+        super().__init__(connection)
+        self.repositories = repositories
+
+    def executor(self) -> Executor:
+        """
+        创建新的语句对象，对于执行查询语句。
+        """
+        cursor = cast(DuckDBPyConnection, self.connection.cursor())
+        return Executor(FederationCursor(cursor, self.repositories))
+
+
+class FederationRepository(Repository):
+    """
+    联邦查询类型仓库：在本地DuckDB中关联多个仓库的数据。
+    """
+
+    def establish_connection(self) -> DuckDBPyConnection:
+        """
+        创建DuckDB内存数据库连接。
+        """
+        return connect_duckdb(':memory:', self.properties)
+
+    def connect(self) -> Connection:
+        """
+        连接本地DuckDB，并加载可引用的其他仓库。
+        """
+        from duckcp.repository import repository_constructor  # 避免循环引用：仓库类型中包含本类型
+
+        with metadata.connect() as meta:
+            repositories = {
+                repository.code: repository
+                for repository in meta.records('''
+                  select
+                    *
+                  from
+                    repositories
+                  where
+                    kind != ?
+                ''', self.kind, constructor=repository_constructor)
+            }
+        return FederationConnection(self.establish_connection(), repositories)
@@ -1,36 +1,207 @@
 import logging
-from collections.abc import Iterator
-from contextlib import contextmanager
+from os.path import isfile
+from time import perf_counter
+from typing import cast, Optional, Any, Sequence
 
-import duckdb
-from duckdb.duckdb import DuckDBPyConnection
+from duckdb.duckdb import DuckDBPyConnection, ConversionException
+from sqlglot.errors import ParseError
+from sqlglot.expressions import Literal
 
 from duckcp.entity.connection import Connection
+from duckcp.entity.executor import Executor
 from duckcp.entity.repository import Repository
-from duckcp.helper.fs import WorkDirectory
+from duckcp.helper.fs import read_line
+from duckcp.helper.sql import extract_csv_patterns, replace_csv_options
 from duckcp.helper.validation import ensure
+from duckcp.repository.duckdb_repository import connect_duckdb
+from duckcp.service.csv_schema_service import csv_schema_find, csv_schema_save
+from duckcp.typing.connection_protocol import ConnectionProtocol
+from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
 
 logger = logging.getLogger(__name__)
 
+EMPTY = '(empty)'  # sniff_csv用该值表示未使用的字符
+
+
+class FileCursor:
+    """
+    文件仓库游标：缓存`read_csv`自动探测的CSV格式与字段类型，再次查询时直接指定参数并关闭自动探测。
+    - 只处理参数只有文件模式的`read_csv`与`read_csv_auto`调用。
+    - 探测结果按仓库与文件模式缓存；首个匹配文件的表头变化时重新探测。
+    - 表头相同的文件取值仍可能变化：按缓存的字段类型转换失败时，重新探测并再执行一次。
+    - 无法在本地找到匹配文件时，交由DuckDB自行探测。
+    """
+    cursor: DuckDBPyConnection
+    repository_id: Optional[int]  # 所属仓库：为空时不缓存
+    cached: bool  # 最近一次执行的语句是否使用了缓存的探测结果
+
+    def __init__(self, cursor: DuckDBPyConnection, repository_id: Optional[int]):
+        self.cursor = cursor
+        self.repository_id = repository_id
+        self.cached = False
+
+    @property
+    def description(self) -> Sequence[SupportsGetItemProtocol]:
+        return self.cursor.description
+
+    def close(self):
+        """
+        关闭游标
+        """
+        self.cursor.close()
+
+    def __sniff(self, pattern: str, file: str) -> dict[str, Any]:
+        """
+        探测CSV文件的格式，并保存至元数据库。
+        """
+        started_at = perf_counter()
+        self.cursor.execute('select * from sniff_csv(?)', [file])
+        columns = [column[0] for column in self.cursor.description]
+        sniffed = dict(zip(columns, self.cursor.fetchone()))
+        elapsed = perf_counter() - started_at
+        options = {
+            'delim': sniffed['Delimiter'],
+            'quote': '' if sniffed['Quote'] == EMPTY else sniffed['Quote'],
+            'escape': '' if sniffed['Escape'] == EMPTY else sniffed['Escape'],
+            'new_line': sniffed['NewLineDelimiter'],
+            'comment': '' if sniffed['Comment'] == EMPTY else sniffed['Comment'],
+            'skip': sniffed['SkipRows'],
+            'header': sniffed['HasHeader'],
+            'columns': {column['name']: column['type'] for column in sniffed['Columns']},
+        }
+        if sniffed['DateFormat']:
+            options['dateformat'] = sniffed['DateFormat']
+        if sniffed['TimestampFormat']:
+            options['timestampformat'] = sniffed['TimestampFormat']
+        header = read_line(file, options['skip']) if options['header'] else None
+        logger.info('探测文件(%s)的CSV格式，耗时%.3f秒', file, elapsed)
+        csv_schema_save(self.repository_id, pattern, header, options, elapsed)
+        return {'auto_detect': False, **options}
+
+    def __options(self, pattern: str, refresh: bool) -> Optional[dict[str, Any]]:
+        """
+        获取文件模式的CSV格式参数：优先使用缓存，`refresh`为真时重新探测。
+        """
+        files = self.cursor.execute('select file from glob(?)', [pattern]).fetchall()
+        if not files or not isfile(files[0][0]):
+            logger.debug('文件模式(%s)没有匹配的本地文件', pattern)
+            return None
+        file = files[0][0]
+        schema = csv_schema_find(self.repository_id, pattern)
+        if schema is None or refresh:
+            return self.__sniff(pattern, file)
+        if 'columns' not in schema.options:
+            logger.info('文件模式(%s)的缓存没有字段类型，重新探测CSV格式', pattern)
+            return self.__sniff(pattern, file)
+        if schema.header is not None and schema.header != read_line(file, schema.options['skip']):
+            logger.info('文件(%s)的表头发生变化，重新探测CSV格式', file)
+            return self.__sniff(pattern, file)
+        logger.info('复用文件模式(%s)缓存的CSV格式与字段类型，跳过探测(上次探测耗时%.3f秒)', pattern, schema.elapsed)
+        self.cached = True
+        return {'auto_detect': False, **schema.options}
+
+    def __prepare(self, sql: str, refresh: bool = False) -> str:
+        """
+        为SQL中自动探测格式的CSV文件显式指定格式参数。
+        """
+        self.cached = False
+        if self.repository_id is None or 'read_csv' not in sql.lower():
+            return sql
+        try:
+            patterns = extract_csv_patterns(sql)
+        except ParseError:
+            logger.debug('无法解析SQL，跳过CSV格式缓存')
+            return sql
+        options = {}
+        for pattern in patterns:
+            if (option := self.__options(pattern, refresh)) is not None:
+                options[pattern] = option
+        return replace_csv_options(sql, options) if options else sql
+
+    def executemany(self, sql: str, parameters: list[Sequence[Any]]):
+        """
+        批量执行。
+        """
+        try:
+            self.cursor.executemany(self.__prepare(sql), parameters)
+        except ConversionException:
+            if not self.cached:
+                raise
+            logger.info('按缓存的字段类型读取CSV失败，重新探测后再次执行')
+            self.cursor.executemany(self.__prepare(sql, True), parameters)
+
+    def execute(self, sql: str, parameters: Sequence[Any]):
+        """
+        单句执行。
+        """
+        try:
+            return self.cursor.execute(self.__prepare(sql), parameters)
+        except ConversionException:
+            if not self.cached:
+                raise
+            logger.info('按缓存的字段类型读取CSV失败，重新探测后再次执行')
+            return self.cursor.execute(self.__prepare(sql, True), parameters)
+
+    def fetchall(self) -> list[Sequence[Any]]:
+        """
+        获取查询结果。
+        """
+        return self.cursor.fetchall()
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        return self.cursor.fetchmany(size)
+
+
+class FileConnection(Connection):
+    """
+    文件仓库连接：查询中的相对路径基于仓库目录解析，无需切换进程的工作目录。
+    """
+    folder: str  # 仓库目录
+    repository_id: Optional[int]  # 所属仓库：用于缓存CSV格式
+
+    def __init__(self, connection: ConnectionProtocol, folder: str, repository_id: Optional[int]):
+        super().__init__(connection)
+        self.folder = folder
+        self.repository_id = repository_id
+
+    def executor(self) -> Executor:
+        """
+        创建新的语句对象，对于执行查询语句。
+        `file_search_path`只作用于当前会话，因此每个游标都需要单独设置。
+        """
+        cursor = cast(DuckDBPyConnection, self.connection.cursor())
+        folder = Literal.string(self.folder).sql(dialect='duckdb')
+        cursor.execute(f'set file_search_path = {folder}')
+        return Executor(FileCursor(cursor, self.repository_id))
+
 
 class FileRepository(Repository):
     """
     文件类型仓库。
     """
 
+    @property
+    def folder(self) -> str:
+        """
+        仓库目录。
+        """
+        ensure(bool(self.properties), '缺少连接参数')
+        ensure(bool(self.properties.get('folder')), '缺少文件夹')
+        return self.properties.get('folder')
+
     def establish_connection(self) -> DuckDBPyConnection:
         """
         创建DuckDB内存数据库连接。
         """
-        return duckdb.connect(':memory:')
+        return connect_duckdb(':memory:', self.properties)
 
-    @contextmanager
-    def connect(self) -> Iterator[Connection]:
+    def connect(self) -> Connection:
         """
-        建立在目标目录下的临时连接。
+        建立基于仓库目录的连接。
         """
-        ensure(bool(self.properties), '缺少连接参数')
-        ensure(bool(self.properties.get('folder')), '缺少文件夹')
-        folder = self.properties.get('folder')
-        with WorkDirectory(folder):
-            yield Connection(self.establish_connection())
+        folder = self.folder
+        logger.debug('folder=%s', folder)
+        return FileConnection(self.establish_connection(), folder, self.id)
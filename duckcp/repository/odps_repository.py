@@ -1,21 +1,208 @@
 import logging
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from threading import Lock
+from typing import Any, Sequence, Optional, cast
 
-from odps import ODPS, dbapi as odps
+from odps import ODPS, dbapi
+from odps.errors import InstanceTypeNotSupported
+from odps.models import Instance
+from odps.tunnel.io.types import odps_schema_to_arrow_schema
+from pandas import DataFrame
 
+from duckcp.configuration import Configuration
+from duckcp.entity.connection import Connection
+from duckcp.entity.executor import Executor, BATCH_SIZE
 from duckcp.entity.repository import Repository
+from duckcp.helper.system import cpu_count
 from duckcp.helper.validation import ensure
+from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
 
 logger = logging.getLogger(__name__)
 
+PENDING_INSTANCES: dict[tuple[int, str], list[Instance]] = {}  # 预先提交、尚未使用的实例：按仓库与查询语句索引
+PENDING_LOCK = Lock()
+
+
+def claim_instance(repository_id: Optional[int], sql: str) -> Optional[Instance]:
+    """
+    取出预先提交的实例：没有则返回None。
+    """
+    with PENDING_LOCK:
+        instances = PENDING_INSTANCES.get((repository_id, sql))
+        return instances.pop(0) if instances else None
+
+
+def discard_instances():
+    """
+    终止所有预先提交、但最终未被使用的实例，避免继续占用MaxCompute资源。
+    """
+    with PENDING_LOCK:
+        instances = [instance for instances in PENDING_INSTANCES.values() for instance in instances]
+        PENDING_INSTANCES.clear()
+    for instance in instances:
+        logger.info('终止未使用的MaxCompute实例(%s)', instance.id)
+        try:
+            instance.stop()
+        except Exception as e:
+            logger.warning('终止MaxCompute实例(%s)失败：%s', instance.id, e)
+
+
+class OdpsCursor:
+    """
+    MaxCompute游标：查询语句作为实例提交，执行成功后通过实例通道以Arrow格式下载结果。
+    - 结果按记录区间切分，由多个线程并行下载，并按原顺序返回。
+    - 内存中最多同时保留`threads + 1`批数据。
+    - 带参数的语句仍交由DB-API游标执行。
+    - 优先使用预先提交的实例，只需等待其执行完成。
+    """
+    cursor: dbapi.Cursor
+    threads: int  # 并行下载的线程数
+    repository_id: Optional[int]  # 所属仓库：用于查找预先提交的实例
+    instance: Optional[Instance]  # 当前查询的实例
+    reader: Any  # 实例通道的Arrow读取器：非查询语句为空
+    rows: Optional[Iterator[tuple[Any, ...]]]  # 逐行读取时的结果
+
+    def __init__(self, cursor: dbapi.Cursor, threads: int, repository_id: Optional[int]):
+        self.cursor = cursor
+        self.threads = threads
+        self.repository_id = repository_id
+        self.instance = None
+        self.reader = None
+        self.rows = None
+
+    @property
+    def description(self) -> Sequence[SupportsGetItemProtocol]:
+        if self.instance is None:
+            return self.cursor.description
+        if self.reader is None:  # 与DB-API一致：非查询语句返回一列原始结果
+            return [('_c0', 'string', None, None, None, None, True)]
+        return [(column.name, column.type.name, None, None, None, None, True) for column in self.reader.schema.columns]
+
+    def close(self):
+        """
+        关闭游标
+        """
+        self.instance = None
+        self.reader = None
+        self.rows = None
+        self.cursor.close()
+
+    def executemany(self, sql: str, parameters: list[Sequence[Any]]):
+        """
+        批量执行。
+        """
+        self.instance = None
+        self.cursor.executemany(sql, parameters)
+
+    def execute(self, sql: str, parameters: Sequence[Any] = None):
+        """
+        单句执行：无参数的语句作为实例提交，并等待执行成功。
+        """
+        self.instance = None
+        self.reader = None
+        self.rows = None
+        if parameters:
+            return self.cursor.execute(sql, parameters)
+        if (instance := claim_instance(self.repository_id, sql)) is not None:
+            logger.info('使用预先提交的MaxCompute实例(%s)', instance.id)
+        else:
+            db = cast(ODPS, self.cursor.connection.odps)
+            instance = db.run_sql(sql)
+            logger.info('提交MaxCompute实例(%s)', instance.id)
+        instance.wait_for_success()
+        try:
+            self.reader = instance.open_reader(tunnel=True, arrow=True, limit=False)
+            logger.info('MaxCompute实例(%s)执行成功，共%s行结果', instance.id, self.reader.count)
+        except InstanceTypeNotSupported:
+            logger.info('MaxCompute实例(%s)执行成功', instance.id)
+        self.instance = instance
+
+    def fetch_frames(self, size: int) -> Iterator[DataFrame]:
+        """
+        按记录区间并行下载查询结果，每个区间对应一批DataFrame。
+        """
+        if self.instance is None:
+            records = self.cursor.fetchall()
+            yield DataFrame(records, columns=[column[0] for column in self.cursor.description or []])
+            return
+        if self.reader is None:
+            with self.instance.open_reader() as reader:
+                yield DataFrame([(reader.raw,)], columns=['_c0'])
+            return
+        count = self.reader.count
+        if count == 0:
+            yield odps_schema_to_arrow_schema(self.reader.schema).empty_table().to_pandas()
+            return
+        logger.debug('count=%s, size=%s, threads=%s', count, size, self.threads)
+        with ThreadPoolExecutor(self.threads) as pool:
+            downloads = deque()
+            for start in range(0, count, size):
+                downloads.append(pool.submit(self.reader.read_all, start, min(size, count - start)))
+                if len(downloads) > self.threads:
+                    yield downloads.popleft().result().to_pandas()
+            while downloads:
+                yield downloads.popleft().result().to_pandas()
+
+    def __records(self) -> Iterator[tuple[Any, ...]]:
+        """
+        逐行返回查询结果。
+        """
+        for frame in self.fetch_frames(BATCH_SIZE):
+            yield from frame.itertuples(index=False, name=None)
+
+    def fetchall(self) -> list[Sequence[Any]]:
+        """
+        获取查询结果。
+        """
+        if self.instance is None:
+            return self.cursor.fetchall()
+        if self.rows is None:
+            self.rows = self.__records()
+        return list(self.rows)
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        if self.instance is None:
+            return self.cursor.fetchmany(size)
+        if self.rows is None:
+            self.rows = self.__records()
+        return list(islice(self.rows, size))
+
+
+class OdpsConnection(Connection):
+    """
+    MaxCompute连接：查询结果通过实例通道并行下载。
+    """
+    threads: int  # 并行下载的线程数
+    repository_id: Optional[int]  # 所属仓库：用于查找预先提交的实例
+
+    def __init__(self, connection: dbapi.Connection, threads: int, repository_id: Optional[int]):
+        super().__init__(connection)
+        self.threads = threads
+        self.repository_id = repository_id
+
+    def executor(self) -> Executor:
+        """
+        创建新的语句对象，对于执行查询语句。
+        """
+        cursor = cast(dbapi.Cursor, self.connection.cursor())
+        return Executor(OdpsCursor(cursor, self.threads, self.repository_id))
+
 
 class OdpsRepository(Repository):
     """
     MaxCompute(ODPS)类型仓库。
     """
 
-    def establish_connection(self) -> odps.Connection:
+    @property
+    def odps(self) -> ODPS:
         """
-        创建Odps仓库连接。
+        MaxCompute入口对象。
         """
         ensure(bool(self.properties), '缺少连接参数')
         ensure(bool(self.properties.get('end_point')), '缺少接入点')
@@ -28,5 +215,36 @@ class OdpsRepository(Repository):
         access_secret = self.properties.get('access_secret')
 
         logger.debug('end_point=%s, project=%s, access_key=%s', end_point, project, access_key)
-        db = ODPS(access_key, access_secret, project, end_point)
-        return odps.connect(db)
+        return ODPS(access_key, access_secret, project, end_point)
+
+    def establish_connection(self) -> dbapi.Connection:
+        """
+        创建Odps仓库连接。
+        """
+        return dbapi.connect(self.odps)
+
+    @property
+    def threads(self) -> int:
+        """
+        并行下载的线程数：未指定时，按同时执行的迁移数均分本机的CPU。
+        """
+        if self.properties and self.properties.get('threads'):
+            return self.properties['threads']
+        return max(1, cpu_count() // Configuration.concurrency)
+
+    def connect(self) -> Connection:
+        """
+        连接MaxCompute。
+        """
+        return OdpsConnection(self.establish_connection(), self.threads, self.id)
+
+    def submit(self, sql: str):
+        """
+        异步提交查询实例，不等待执行结果；后续执行相同的语句时直接使用该实例。
+        """
+        if self.id is None:
+            return
+        instance = self.odps.run_sql(sql)
+        logger.info('预先提交MaxCompute实例(%s)', instance.id)
+        with PENDING_LOCK:
+            PENDING_INSTANCES.setdefault((self.id, sql), []).append(instance)
@@ -1,12 +1,195 @@
 import logging
+from collections.abc import Iterator
+from os import remove, close, makedirs
+from os.path import getsize
+from tempfile import mkstemp
+from time import perf_counter
+from typing import Any, Sequence, Optional, cast
 
 import psycopg2
+from duckdb.duckdb import DuckDBPyConnection
+from pandas import DataFrame
+from sqlglot import select
 
+from duckcp.entity.connection import Connection
+from duckcp.entity.executor import Executor
 from duckcp.entity.repository import Repository
+from duckcp.helper.sql import is_query, read_csv, strip_query
 from duckcp.helper.validation import ensure
+from duckcp.repository.duckdb_repository import connect_duckdb
+from duckcp.typing.supports_get_item_protocol import SupportsGetItemProtocol
 
 logger = logging.getLogger(__name__)
 
+DUCKDB_TYPES = {  # Postgres类型编号(OID)对应的DuckDB类型；其他类型均按文本处理
+    16: 'BOOLEAN',
+    20: 'BIGINT',
+    21: 'SMALLINT',
+    23: 'INTEGER',
+    26: 'UBIGINT',
+    700: 'FLOAT',
+    701: 'DOUBLE',
+    1082: 'DATE',
+    1083: 'TIME',
+    1114: 'TIMESTAMP',
+    1184: 'TIMESTAMPTZ',
+    2950: 'UUID',
+}
+NUMERIC = 1700  # numeric类型编号：声明了精度时映射成DECIMAL，否则按文本处理
+DECIMAL_PRECISION = 38  # DuckDB中DECIMAL的最大精度
+PARAMETER_LIMIT = 65535  # Postgres协议中单条语句的参数个数上限
+
+
+def duckdb_type(column: psycopg2.extensions.Column) -> str:
+    """
+    根据Postgres结果列的类型，选择解析CSV时使用的DuckDB类型。
+    """
+    if column.type_code == NUMERIC:
+        if column.precision is not None and 0 < column.precision <= DECIMAL_PRECISION:
+            return f'DECIMAL({column.precision}, {column.scale or 0})'
+        return 'VARCHAR'  # 未声明精度或超出DuckDB的精度上限：按文本读取，避免丢失精度
+    return DUCKDB_TYPES.get(column.type_code, 'VARCHAR')
+
+
+class PostgresCursor:
+    """
+    Postgres游标：开启COPY导出时，查询语句通过`COPY (...) TO STDOUT`以CSV格式导出至临时文件，再由DuckDB按列解析。
+    - 跳过psycopg2逐个值的类型转换，结果直接以列式的DataFrame返回。
+    - 字段类型由查询结果的列类型决定，无需DuckDB探测。
+    - 带参数的语句、非查询语句，或未开启COPY导出时，仍由psycopg2游标执行。
+    """
+    cursor: psycopg2.extensions.cursor
+    copy: bool  # 是否通过COPY导出查询结果
+    properties: Optional[dict[str, Any]]  # 仓库的连接参数：用于配置解析结果的DuckDB
+    duckdb: Optional[DuckDBPyConnection]  # 解析导出结果的DuckDB连接
+    file: Optional[str]  # 导出结果的临时文件
+
+    def __init__(self, cursor: psycopg2.extensions.cursor, copy: bool, properties: Optional[dict[str, Any]]):
+        self.cursor = cursor
+        self.copy = copy
+        self.properties = properties
+        self.duckdb = None
+        self.file = None
+
+    @property
+    def description(self) -> Sequence[SupportsGetItemProtocol]:
+        return self.duckdb.description if self.duckdb is not None else self.cursor.description
+
+    def __reset(self):
+        """
+        释放上一次COPY导出的资源。
+        """
+        if self.duckdb is not None:
+            self.duckdb.close()
+            self.duckdb = None
+        if self.file is not None:
+            remove(self.file)
+            self.file = None
+
+    def close(self):
+        """
+        关闭游标
+        """
+        self.__reset()
+        self.cursor.close()
+
+    def executemany(self, sql: str, parameters: list[Sequence[Any]]):
+        """
+        批量执行。
+        """
+        self.__reset()
+        self.cursor.executemany(sql, parameters)
+
+    def execute(self, sql: str, parameters: Sequence[Any] = None):
+        """
+        单句执行。
+        """
+        self.__reset()
+        if not self.copy or parameters or not is_query(sql, 'postgres'):
+            return self.cursor.execute(sql, parameters)
+
+        query = strip_query(sql, 'postgres')  # 去掉末尾的分号与注释，避免嵌入子查询后语法错误
+        self.cursor.execute(f'select * from ({query}) as duckcp_copy limit 0')
+        columns = {column.name: duckdb_type(column) for column in self.cursor.description}
+        if len(columns) < len(self.cursor.description):  # DuckDB要求列名唯一
+            logger.info('查询结果中存在重名的列，不使用COPY导出')
+            return self.cursor.execute(sql, parameters)
+
+        folder = self.properties.get('temp_directory') if self.properties else None  # 与DuckDB共用临时目录，未指定时使用系统临时目录
+        if folder:
+            makedirs(folder, exist_ok=True)
+        descriptor, self.file = mkstemp(prefix='duckcp-', suffix='.csv', dir=folder or None)
+        close(descriptor)
+        started_at = perf_counter()
+        self.cursor.execute('show datestyle')
+        datestyle = self.cursor.fetchone()[0]
+        self.cursor.execute('set datestyle to iso')  # 日期与时间按ISO格式导出，便于DuckDB解析
+        with open(self.file, 'wb') as f:
+            self.cursor.copy_expert(f"copy ({query}) to stdout with (format csv, encoding 'UTF8')", f)
+        self.cursor.execute('select set_config(%s, %s, false)', ['datestyle', datestyle])  # 恢复会话的日期格式：导出失败时事务回滚，设置随之撤销
+        logger.info('通过COPY导出查询结果%s字节，耗时%.3f秒', getsize(self.file), perf_counter() - started_at)
+
+        self.duckdb = connect_duckdb(':memory:', self.properties)
+        self.duckdb.execute(select('*').from_(read_csv(self.file, {
+            'header': False,
+            'delim': ',',
+            'quote': '"',
+            'escape': '"',
+            'allow_quoted_nulls': False,  # 与Postgres一致：只有未加引号的空值是NULL
+            'columns': columns,
+        })).sql(dialect='duckdb'))
+
+    def fetch_frames(self, size: int) -> Iterator[DataFrame]:
+        """
+        按批次获取查询结果：COPY导出的结果由DuckDB直接转换成DataFrame。
+        """
+        if self.duckdb is None:
+            columns = [column[0] for column in self.cursor.description] if self.cursor.description else []
+            records = self.cursor.fetchmany(size)
+            yield DataFrame(records, columns=columns)
+            while records := self.cursor.fetchmany(size):
+                yield DataFrame(records, columns=columns)
+            return
+        reader = self.duckdb.fetch_record_batch(size)
+        empty = True
+        for batch in reader:
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            yield reader.schema.empty_table().to_pandas()
+
+    def fetchall(self) -> list[Sequence[Any]]:
+        """
+        获取查询结果。
+        """
+        return self.duckdb.fetchall() if self.duckdb is not None else self.cursor.fetchall()
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        return self.duckdb.fetchmany(size) if self.duckdb is not None else self.cursor.fetchmany(size)
+
+
+class PostgresConnection(Connection):
+    """
+    Postgres连接：按仓库配置选择查询结果的导出方式。
+    """
+    copy: bool  # 是否通过COPY导出查询结果
+    properties: Optional[dict[str, Any]]  # 仓库的连接参数
+
+    def __init__(self, connection: psycopg2.extensions.connection, copy: bool, properties: Optional[dict[str, Any]]):
+        super().__init__(connection)
+        self.copy = copy
+        self.properties = properties
+
+    def executor(self) -> Executor:
+        """
+        创建新的语句对象，对于执行查询语句。
+        """
+        cursor = cast(psycopg2.extensions.cursor, self.connection.cursor())
+        return Executor(PostgresCursor(cursor, self.copy, self.properties))
+
 
 class PostgresRepository(Repository):
     """
@@ -33,3 +216,31 @@ class PostgresRepository(Repository):
             user=username,
             password=password
         )
+
+    def parameter_limit(self, connection: Connection) -> Optional[int]:
+        """
+        连接上单条语句允许的参数个数上限：由Postgres协议决定。
+        """
+        return PARAMETER_LIMIT
+
+    @property
+    def staging(self) -> bool:
+        """
+        迁移时是否通过暂存表写入：未指定时逐行插入目标表。
+        """
+        return bool(self.properties and self.properties.get('staging'))
+
+    @property
+    def writers(self) -> int:
+        """
+        通过暂存表迁移时并行写入的连接数：未指定时只使用一个连接。
+        """
+        if self.properties and self.properties.get('writers'):
+            return self.properties['writers']
+        return 1
+
+    def connect(self) -> Connection:
+        """
+        连接Postgres。
+        """
+        return PostgresConnection(self.establish_connection(), bool(self.properties.get('copy')), self.properties)
@@ -1,7 +1,10 @@
 import logging
 import sqlite3
-from typing import Any
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
 
+from duckcp.entity.connection import Connection
 from duckcp.entity.repository import Repository
 from duckcp.helper.serialization import json_encode, json_decode
 
@@ -36,12 +39,25 @@ sqlite3.register_converter('json', to_value)
 sqlite3.register_adapter(dict, to_json)
 sqlite3.register_adapter(list, to_json)
 
+# 批量写入期间临时使用的配置：WAL日志、关闭同步刷盘、扩大页缓存（负数单位为KiB，即256MiB）。
+BULK_LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -262144,
+}
+
 
 class SqliteRepository(Repository):
     """
     Sqlite类型仓库。
     """
 
+    def parameter_limit(self, connection: Connection) -> Optional[int]:
+        """
+        连接上单条语句允许的参数个数上限：取决于SQLite编译时的配置。
+        """
+        return connection.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
     def establish_connection(self) -> sqlite3.Connection:
         """
         创建Sqlite连接。
@@ -51,3 +67,30 @@ class SqliteRepository(Repository):
         connection = sqlite3.connect(file, detect_types=sqlite3.PARSE_DECLTYPES, autocommit=True)
         connection.execute('PRAGMA foreign_keys=ON')  # 启用on delete cascade
         return connection
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[Connection]:
+        """
+        建立用于批量写入数据的连接：
+        1. 临时调整日志、同步与缓存配置。
+        2. 在单个显式事务内执行全部写入，成功则提交，失败则回滚。
+        3. 结束后恢复原始配置。
+        """
+        with self.connect() as connection:
+            database = connection.connection
+            origins = {name: database.execute(f'PRAGMA {name}').fetchone()[0] for name in BULK_LOAD_PRAGMAS}
+            logger.debug('origins=%s', origins)
+            for name, value in BULK_LOAD_PRAGMAS.items():
+                database.execute(f'PRAGMA {name}={value}')
+            try:
+                database.execute('BEGIN')
+                try:
+                    yield connection
+                except BaseException:
+                    database.execute('ROLLBACK')
+                    raise
+                else:
+                    database.execute('COMMIT')
+            finally:
+                for name, value in origins.items():
+                    database.execute(f'PRAGMA {name}={value}')
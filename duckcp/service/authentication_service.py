@@ -2,10 +2,13 @@
 开放平台认证服务。
 """
 import logging
+from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional
 
 from duckcp.configuration import meta_configuration as metadata
 from duckcp.entity.credential import Credential
+from duckcp.entity.token_cache import TokenCache
 from duckcp.helper.validation import ensure
 from duckcp.typing.authentication_token_type import AuthenticationToken
 from duckcp.typing.authenticator_type import Authenticator
@@ -13,22 +16,33 @@ from duckcp.typing.credential_refresher_type import CredentialRefresher
 
 logger = logging.getLogger(__name__)
 
+RENEW_AHEAD = timedelta(minutes=10)  # 到期前提前续期的时长
+
+caches: dict[tuple[str, str], TokenCache] = {}  # 进程内的访问凭证缓存：按平台与应用索引
+caches_lock = Lock()
+
 
 def authenticate(platform_code: str, app_code: str, token: AuthenticationToken, refresher: CredentialRefresher) -> Authenticator:
     """
-    认证并获取最新的访问凭证。
+    认证并获取最新的访问凭证：
+    - 优先使用进程内缓存；冷启动时才读取元数据库中的凭证。
+    - 多个线程同时发现凭证过期时，只刷新一次。
+    - 在到期前于后台续期，调用方无需等待刷新。
     """
     logger.debug('platform_code=%s, app_code=%s, token=%s', platform_code, app_code, token)
     ensure(platform_code is not None and app_code is not None and token is not None, '缺少应用信息')
+    with caches_lock:
+        cache = caches.setdefault((platform_code, app_code), TokenCache())
 
-    def authenticator() -> Optional[str]:
+    def load() -> Optional[tuple[str, datetime]]:
         """
-        认证闭包：包含了认证信息。
+        从元数据库读取未过期的凭证。
         """
         with metadata.connect() as meta:
-            access_token = meta.value('''
+            return meta.record('''
               select
-                access_token
+                access_token,
+                expired_at
               from
                 credentials
               where
@@ -36,17 +50,54 @@ def authenticate(platform_code: str, app_code: str, token: AuthenticationToken,
                 and app_code = ?
                 and datetime(current_timestamp, 'localtime') < expired_at
             ''', platform_code, app_code)
-            if access_token is None:
-                access_token, expired_at = refresher(token)
-                credential = meta.record('''
-                  insert or replace into credentials
-                    (platform_code, app_code, access_token, expired_at)
-                  values
-                    (?, ?, ?, ?)
-                  returning *
-                ''', platform_code, app_code, access_token, expired_at, constructor=Credential._make)
-                logger.info('刷新凭证(%s, %s)', platform_code, app_code)
-                logger.debug('credential=%s', credential)
+
+    def refresh() -> tuple[str, datetime]:
+        """
+        向开放平台申请新凭证，并保存至元数据库。
+        """
+        access_token, expired_at = refresher(token)
+        with metadata.connect() as meta:
+            credential = meta.record('''
+              insert or replace into credentials
+                (platform_code, app_code, access_token, expired_at)
+              values
+                (?, ?, ?, ?)
+              returning *
+            ''', platform_code, app_code, access_token, expired_at, constructor=Credential._make)
+        logger.info('刷新凭证(%s, %s)', platform_code, app_code)
+        logger.debug('credential=%s', credential)
+        return access_token, expired_at
+
+    def update(access_token: str, expired_at: datetime):
+        """
+        更新缓存，并安排到期前的后台续期。
+        """
+        cache.put(access_token, expired_at)
+        cache.schedule(expired_at - RENEW_AHEAD, renew)
+
+    def renew():
+        """
+        后台续期：失败时保留原凭证，到期后由调用方同步刷新。
+        """
+        with cache.lock:
+            try:
+                update(*refresh())
+            except Exception as e:
+                logger.warning('续期凭证(%s, %s)失败：%s', platform_code, app_code, e)
+
+    def authenticator() -> Optional[str]:
+        """
+        认证闭包：包含了认证信息。
+        """
+        if (access_token := cache.token()) is not None:
+            return access_token
+        with cache.lock:
+            if (access_token := cache.token()) is not None:  # 等待期间已由其他线程刷新
+                return access_token
+            credential = load() if cache.cold else None
+            cache.cold = False
+            access_token, expired_at = credential if credential is not None else refresh()
+            update(access_token, expired_at)
             return access_token
 
     return authenticator
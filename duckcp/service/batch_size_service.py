@@ -0,0 +1,63 @@
+"""
+批大小服务：记录批量写入时自适应调整得到的最佳批大小，供下次迁移直接使用。
+"""
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.batch_size import BatchSize
+from duckcp.entity.batcher import Batcher
+
+logger = logging.getLogger(__name__)
+
+REFINE_FACTOR = 1.25  # 已有历史批大小时的调整幅度：只在其附近微调
+
+
+def batch_size_find(storage_id: int, operation: str) -> Optional[BatchSize]:
+    """
+    找到存储单元某种写入操作的最佳批大小。
+    """
+    with metadata.connect() as meta:
+        return meta.record('''
+          select
+            *
+          from batch_sizes
+          where storage_id = ?
+            and operation = ?
+        ''', storage_id, operation, constructor=BatchSize._make)
+
+
+def batch_size_save(storage_id: int, operation: str, size: int, throughput: float):
+    """
+    保存存储单元某种写入操作的最佳批大小。
+    """
+    with metadata.connect() as meta:
+        meta.execute('''
+          insert into batch_sizes
+            (storage_id, operation, size, throughput)
+          values
+            (?, ?, ?, ?)
+          on conflict (storage_id, operation) do update set
+            size = excluded.size,
+            throughput = excluded.throughput,
+            updated_at = datetime(current_timestamp, 'localtime')
+        ''', storage_id, operation, size, throughput)
+
+
+@contextmanager
+def batch_size_tuning(storage_id: int, operation: str, minimum: int, maximum: int) -> Iterator[Batcher]:
+    """
+    创建自适应分批器：从上次保存的最佳批大小开始（没有则从上限开始），写入成功后保存本次得到的最佳批大小。
+    """
+    saved = batch_size_find(storage_id, operation)
+    if saved is not None:
+        batcher = Batcher(saved.size, minimum, maximum, REFINE_FACTOR)
+    else:
+        batcher = Batcher(maximum, minimum, maximum)
+    logger.debug('storage_id=%s, operation=%s, size=%s', storage_id, operation, batcher.size)
+    yield batcher
+    if batcher.best_size is not None:
+        batch_size_save(storage_id, operation, batcher.best_size, batcher.best_throughput)
+        logger.info('批量%s的最佳批大小为%s，吞吐量%.0f行/秒', operation, batcher.best_size, batcher.best_throughput)
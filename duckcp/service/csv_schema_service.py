@@ -0,0 +1,43 @@
+"""
+CSV格式缓存服务：记录文件模式的格式与字段类型探测结果，避免每次迁移都重新探测。
+"""
+import logging
+from typing import Optional, Any
+
+from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.csv_schema import CsvSchema
+
+logger = logging.getLogger(__name__)
+
+
+def csv_schema_find(repository_id: int, pattern: str) -> Optional[CsvSchema]:
+    """
+    找到文件模式的格式缓存。
+    """
+    with metadata.connect() as meta:
+        return meta.record('''
+          select
+            *
+          from csv_schemas
+          where repository_id = ?
+            and pattern = ?
+        ''', repository_id, pattern, constructor=CsvSchema._make)
+
+
+def csv_schema_save(repository_id: int, pattern: str, header: Optional[str], options: dict[str, Any], elapsed: float):
+    """
+    保存文件模式的格式探测结果。
+    """
+    with metadata.connect() as meta:
+        meta.execute('''
+          insert into csv_schemas
+            (repository_id, pattern, header, options, elapsed)
+          values
+            (?, ?, ?, ?, ?)
+          on conflict (repository_id, pattern) do update set
+            header = excluded.header,
+            options = excluded.options,
+            elapsed = excluded.elapsed,
+            updated_at = datetime(current_timestamp, 'localtime')
+        ''', repository_id, pattern, header, options, elapsed)
+        logger.info('缓存文件模式(%s)的CSV格式', pattern)
@@ -0,0 +1,48 @@
+"""
+来源数据指纹服务：迁移执行前先在来源仓库上执行代价很低的指纹查询，结果与上次成功执行时一致则跳过迁移。
+"""
+import logging
+from typing import Optional
+
+from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.fingerprint import Fingerprint
+from duckcp.entity.repository import Repository
+from duckcp.helper.digest import sha256
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint_find(transformer_id: int) -> Optional[Fingerprint]:
+    """
+    找到迁移上次成功执行时的指纹。
+    """
+    with metadata.connect() as meta:
+        return meta.record('select * from fingerprints where transformer_id = ?', transformer_id, constructor=Fingerprint._make)
+
+
+def fingerprint_save(transformer_id: int, checksum: str):
+    """
+    保存迁移成功执行时的指纹。
+    """
+    with metadata.connect() as meta:
+        meta.execute('''
+          insert into fingerprints
+            (transformer_id, checksum)
+          values
+            (?, ?)
+          on conflict (transformer_id) do update set
+            checksum = excluded.checksum,
+            updated_at = datetime(current_timestamp, 'localtime')
+        ''', transformer_id, checksum)
+        logger.debug('transformer_id=%s, checksum=%s', transformer_id, checksum)
+
+
+def fingerprint_compute(repository: Repository, sql: str, *salts: str) -> str:
+    """
+    在来源仓库上执行指纹查询，计算结果的摘要：迁移脚本、目标等会影响迁移结果的内容一并计入。
+    """
+    with repository.connect() as connection:
+        with connection.executor() as executor:
+            columns, records = executor.execute(sql)
+    logger.debug('columns=%s, records=%s', columns, records)
+    return sha256('\n'.join([*salts, repr(columns), *[repr(tuple(record)) for record in records]]))
@@ -0,0 +1,72 @@
+"""
+增量文件清单服务：记录迁移已处理过的来源文件，只向迁移脚本暴露新增或变化的文件。
+"""
+import logging
+from glob import glob
+from os import stat
+from os.path import join, relpath, isfile
+
+from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.manifest import Manifest
+from duckcp.helper.digest import sha256_file
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_list(transformer_id: int) -> dict[str, Manifest]:
+    """
+    列出迁移已处理过的文件。
+    """
+    with metadata.connect() as meta:
+        return {
+            manifest.path: manifest
+            for manifest in meta.records('select * from manifests where transformer_id = ?', transformer_id, constructor=Manifest._make)
+        }
+
+
+def manifest_delta(transformer_id: int, folder: str, pattern: str) -> tuple[list[str], list[Manifest]]:
+    """
+    对比目录下匹配模式的文件与已处理的清单：
+    - 大小与修改时间均未变化的文件，视为未变化，不计算摘要。
+    - 否则计算内容摘要：摘要不同则为新增或变化的文件；摘要相同则只需刷新清单。
+    @return: 新增或变化文件的绝对路径，以及需要在迁移成功后写入的清单。
+    """
+    logger.debug('transformer_id=%s, folder=%s, pattern=%s', transformer_id, folder, pattern)
+    manifests = manifest_list(transformer_id)
+    files = []
+    changes = []
+    for file in sorted(glob(join(folder, pattern), recursive=True)):
+        if not isfile(file):
+            continue
+        path = relpath(file, folder)
+        status = stat(file)
+        manifest = manifests.get(path)
+        if manifest is not None and manifest.size == status.st_size and manifest.mtime == status.st_mtime_ns:
+            continue
+        checksum = sha256_file(file)
+        if manifest is None or manifest.checksum != checksum:
+            files.append(file)
+        changes.append(Manifest(transformer_id, path, status.st_size, status.st_mtime_ns, checksum))
+    logger.info('目录(%s)中匹配(%s)的文件：新增或变化%s个', folder, pattern, len(files))
+    return files, changes
+
+
+def manifest_save(manifests: list[Manifest]):
+    """
+    保存已处理的文件清单。
+    """
+    if not manifests:
+        return
+    with metadata.connect() as meta:
+        meta.batch('''
+          insert into manifests
+            (transformer_id, path, size, mtime, checksum)
+          values
+            (?, ?, ?, ?, ?)
+          on conflict (transformer_id, path) do update set
+            size = excluded.size,
+            mtime = excluded.mtime,
+            checksum = excluded.checksum,
+            updated_at = datetime(current_timestamp, 'localtime')
+        ''', [manifest[:5] for manifest in manifests])
+        logger.info('保存文件清单%s条', len(manifests))
@@ -2,15 +2,33 @@
 元信息数据库管理服务。
 """
 import logging
-from importlib.resources import path
+from importlib.resources import files, as_file
 from os import unlink, chmod
 from os.path import exists
 
 from duckcp import migration
 from duckcp.configuration import meta_configuration as metadata, Configuration
+from duckcp.entity.executor import Executor
 
 logger = logging.getLogger(__name__)
 
+LEGACY_VERSION = 7  # 记录版本号之前创建的元信息数据库已执行的脚本：001至007
+
+
+def meta_migrate(meta: Executor, version: int) -> int:
+    """
+    按编号顺序执行尚未执行的迁移脚本，并在数据库中记录已执行的最新编号；返回最新编号。
+    """
+    with as_file(files(migration)) as folder:
+        for script in sorted(folder.glob('**/*.sql')):
+            number = int(script.name.split('-', 1)[0])
+            if number > version:
+                logger.info('执行脚本(%s)', script.name)
+                meta.script(script.read_text(encoding='utf-8'))
+                meta.execute(f'pragma user_version = {number}')
+                version = number
+    return version
+
 
 def meta_create():
     """
@@ -19,15 +37,28 @@ def meta_create():
     if not exists(Configuration.file):
         logger.info('配置文件(%s)初始化', Configuration.file)
         with metadata.connect() as meta:
-            with path(migration) as folder:
-                for script in sorted(folder.glob('**/*.sql')):
-                    logger.info('执行脚本(%s)', script.name)
-                    meta.execute(script.read_text(encoding='utf-8'))
+            meta_migrate(meta, 0)
         chmod(Configuration.file, 0o600)  # 配置文件里包含部分敏感信息，因此只允许当前用户访问
     else:
         logger.warning('配置文件(%s)已存在', Configuration.file)
 
 
+def meta_upgrade():
+    """
+    升级元信息数据库：执行已有数据库中尚未执行的迁移脚本。
+    """
+    if exists(Configuration.file):
+        with metadata.connect() as meta:
+            version = meta.value('pragma user_version')
+            if version == 0 and meta.value("select count(*) as tables from sqlite_master where type = 'table' and name = 'repositories'"):
+                version = LEGACY_VERSION
+            logger.debug('version=%s', version)
+            if meta_migrate(meta, version) > version:
+                logger.info('配置文件(%s)升级完成', Configuration.file)
+    else:
+        logger.debug('配置文件(%s)不存在；忽略升级操作', Configuration.file)
+
+
 def meta_delete():
     """
     删除元信息数据库。
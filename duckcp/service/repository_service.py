@@ -20,6 +20,14 @@ def repository_find[T: Repository](code: str) -> Optional[T]:
         return meta.record('select * from repositories where code = ?', code, constructor=repository_constructor)
 
 
+def repository_find_by_id[T: Repository](id: int) -> Optional[T]:
+    """
+    根据编号查找仓库。
+    """
+    with metadata.connect() as meta:
+        return meta.record('select * from repositories where id = ?', id, constructor=repository_constructor)
+
+
 def repository_exists(code: str) -> bool:
     """
     判断编码对应的仓库是否已存在。
@@ -85,7 +93,7 @@ def repository_create(code: str, kind_code: str, properties: dict[str, Any]):
         ''', code, kind.code, {
             key: value
             for key, value in properties.items()
-            if bool(value)
+            if bool(value) or value is False  # 保留显式关闭的开关选项
         }, constructor=repository_constructor)
         logger.info('创建仓库(%s)', code)
         logger.debug('repository=%s', repository)
@@ -121,7 +129,7 @@ def repository_update(code: str, kind_code: str, properties: dict[str, Any]):
         ''', kind.code, {
             key: value
             for key, value in properties.items()
-            if bool(value)  # 移除手工强制设为空值的项
+            if bool(value) or value is False  # 移除手工强制设为空值的项；保留显式关闭的开关选项
         }, code, constructor=repository_constructor)
         logger.info('更新仓库(%s)', code)
         logger.debug('repository=%s', repository)
@@ -15,17 +15,36 @@ def snapshot_find(storage_id: int) -> Optional[Snapshot]:
         return meta.record('select * from snapshots where storage_id = ?', storage_id, constructor=Snapshot._make)
 
 
-def take_snapshot(storage_id: int, checksum: str, records: list[str]):
+def take_snapshot(storage_id: int, checksum: str, records: list[str], digests: list[str]):
     """
     保存快照。
     """
     with metadata.connect() as meta:
         snapshot = meta.record('''
           insert or replace into snapshots
-            (storage_id, checksum, records)
+            (storage_id, checksum, records, digests)
           values
-            (?, ?, ?)
+            (?, ?, ?, ?)
           returning *
-        ''', storage_id, checksum, records, constructor=Snapshot._make)
+        ''', storage_id, checksum, records, digests, constructor=Snapshot._make)
         logger.info('创建快照(%s)', storage_id)
         logger.debug('snapshot=%s', snapshot)
+
+
+def snapshot_journal(storage_id: int, records: list[str], digests: list[str]):
+    """
+    记录同步进度：多维表格中现有的记录及其摘要；同步完成前清空快照摘要。
+    """
+    with metadata.connect() as meta:
+        meta.execute('''
+          insert into snapshots
+            (storage_id, checksum, records, digests)
+          values
+            (?, '', ?, ?)
+          on conflict (storage_id) do update set
+            checksum = excluded.checksum,
+            records = excluded.records,
+            digests = excluded.digests,
+            updated_at = datetime(current_timestamp, 'localtime')
+        ''', storage_id, records, digests)
+        logger.debug('storage_id=%s, records=%s', storage_id, len(records))
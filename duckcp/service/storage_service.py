@@ -47,11 +47,12 @@ def storage_create(repository_code: str, code: str, properties: dict[str, Any]):
     ensure(repository_code is not None, '缺少仓库名称')
     ensure(code is not None, f'仓库({repository_code})缺少存储单元名称')
     properties = {name: value for name, value in properties.items() if bool(value)} if properties else {}
-    ensure(bool(properties), f'仓库({repository_code})的存储单元({code})缺少存储参数')
 
     repository = repository_service.repository_find(repository_code)
     ensure(repository is not None, f'仓库({repository_code})不存在')
     kind = RepositoryKind.of(repository.kind)
+    kind.ensure_target()
+    ensure(bool(properties), f'仓库({repository_code})的存储单元({code})缺少存储参数')
     kind.ensure_medium_properties(properties)
     ensure(not storage_exists(repository.code, code), f'仓库({repository_code})的存储单元({code})已存在')
 
@@ -2,14 +2,16 @@
 定时任务调度服务。
 """
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
-from duckcp.configuration import meta_configuration as metadata
+from duckcp.configuration import meta_configuration as metadata, Configuration
 from duckcp.entity.task import Task
 from duckcp.entity.task_transformer import TaskTransformer
 from duckcp.helper.validation import ensure
 from duckcp.projection.task_projection import TaskProjection
 from duckcp.projection.task_transformer_projection import TaskTransformerProjection
+from duckcp.repository.odps_repository import discard_instances
 from duckcp.service import transformer_service
 
 logger = logging.getLogger(__name__)
@@ -107,14 +109,18 @@ def task_list() -> list[TaskProjection]:
         ''', constructor=TaskProjection._make)
 
 
-def task_execute(code: str):
+def task_execute(code: str, parallel: int = 1):
     """
     执行迁移任务。
+    - parallel为1时，按顺序依次执行迁移。
+    - parallel大于1时，按顺序提交迁移，最多同时执行parallel个；DuckDB连接按并发数均分CPU与内存。
+    - 执行前预先提交所有迁移的查询（例如MaxCompute），使各查询的排队与计算时间相互重叠；任务结束时终止未使用的查询。
     """
-    logger.debug('code=%s', code)
+    logger.debug('code=%s, parallel=%s', code, parallel)
     ensure(task_exists(code), f'任务({code})不存在')
+    ensure(parallel is not None and parallel > 0, f'任务({code})的并发数({parallel})必须大于0')
     with metadata.connect() as meta:
-        for transformer_code in meta.values('''
+        transformer_codes = meta.values('''
           select
             transformers.code
           from
@@ -130,8 +136,43 @@ def task_execute(code: str):
             tasks_transformers.transformer_id = transformers.id
           order by
             tasks_transformers.sort
-        ''', code):
-            transformer_service.transformer_execute(transformer_code)
+        ''', code)
+
+    try:
+        for transformer_code in transformer_codes:
+            try:
+                transformer_service.transformer_submit(transformer_code)
+            except Exception as e:  # 预先提交失败不影响执行：执行时会重新提交并报告错误
+                logger.warning('迁移(%s)预先提交失败：%s', transformer_code, e)
+        if parallel == 1:
+            for transformer_code in transformer_codes:
+                transformer_service.transformer_execute(transformer_code)
+        else:
+            task_execute_parallel(transformer_codes, parallel)
+    finally:
+        discard_instances()
+
+
+def task_execute_parallel(transformer_codes: list[str], parallel: int):
+    """
+    并行执行迁移：按顺序提交迁移，最多同时执行parallel个；任一迁移失败时，等待其他迁移结束后，
+    按提交顺序抛出首个失败迁移的错误，因此报告的错误与各迁移的完成先后无关。
+    """
+    Configuration.concurrency = min(parallel, len(transformer_codes)) or 1
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = {
+                executor.submit(transformer_service.transformer_execute, transformer_code): transformer_code
+                for transformer_code in transformer_codes
+            }
+            for future in as_completed(futures):
+                if (error := future.exception()) is not None:
+                    logger.error('迁移(%s)执行失败：%s', futures[future], error)
+            errors = [future.exception() for future in futures if future.exception() is not None]  # 按提交顺序
+            if errors:
+                raise errors[0]
+    finally:
+        Configuration.concurrency = 1
 
 
 def task_bind(code: str, transformer_code: str, sort: int):
@@ -1,18 +1,33 @@
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from os.path import exists
-from typing import Optional
+from typing import Optional, Any
 
 from duckcp.configuration import meta_configuration as metadata
+from duckcp.entity.connection import Connection
+from duckcp.entity.executor import Executor
+from duckcp.entity.partitioned_cursor import PartitionedCursor
+from duckcp.entity.repository import Repository
+from duckcp.entity.statement import Statement
+from duckcp.entity.storage import Storage
 from duckcp.entity.transform_context import TransformContext
 from duckcp.entity.transformer import Transformer
+from duckcp.entity.transformer_target import TransformerTarget
 from duckcp.helper.fs import absolute_path, slurp
+from duckcp.helper.sql import create_or_replace_macro
 from duckcp.helper.validation import ensure
 from duckcp.projection.transformer_projection import TransformerProjection
 from duckcp.repository import RepositoryKind
-from duckcp.service import repository_service, storage_service
+from duckcp.repository.duckdb_repository import connect_duckdb, load_frames
+from duckcp.service import repository_service, storage_service, manifest_service, fingerprint_service
 
 logger = logging.getLogger(__name__)
 
+INCREMENTAL_FILES = 'incremental_files'  # 增量读取时，迁移脚本中获取新增或变化文件列表的宏
+FAN_OUT_BUFFER = 'duckcp_buffer'  # 多目标迁移时，缓存查询结果的DuckDB表
+
 
 def transformer_find(code: str) -> Optional[Transformer]:
     """
@@ -29,21 +44,42 @@ def transformer_exists(code: str) -> bool:
     return transformer_find(code) is not None
 
 
+def ensure_transformer_properties(code: str, repository: Repository, properties: dict[str, Any]):
+    """
+    确保迁移选项与来源仓库的类型匹配。
+    """
+    if properties.get('incremental'):
+        ensure(repository.kind == RepositoryKind.File.code, f'迁移({code})的增量读取仅支持{RepositoryKind.File.code}类型的来源仓库')
+    if properties.get('partition_column') or properties.get('partitions'):
+        ensure(bool(properties.get('partition_column')) and bool(properties.get('partitions')), f'迁移({code})的分区读取需要同时指定分区列与分区数')
+        ensure(properties['partitions'] > 1, f'迁移({code})的分区数({properties['partitions']})必须大于1')
+        ensure(not properties.get('incremental'), f'迁移({code})的分区读取不支持增量读取')
+
+
+def ensure_target_storage(storage: Storage):
+    """
+    确保存储单元所属的仓库可以作为迁移目标。
+    """
+    repository = repository_service.repository_find_by_id(storage.repository_id)
+    RepositoryKind.of(repository.kind).ensure_target()
+
+
 def transformer_create(
         code: str,
         source_repository_code: str,
         target_repository_code: str,
         target_storage_code: str,
         script_file: str,
+        properties: dict[str, Any] = None,
 ):
     """
     添加迁移。
     """
     logger.debug(
-        'code=%s, source_repository_code=%s, target_repository_code=%s, target_storage_code=%s, script_file=%s',
+        'code=%s, source_repository_code=%s, target_repository_code=%s, target_storage_code=%s, script_file=%s, properties=%s',
         code, source_repository_code,
         target_repository_code, target_storage_code,
-        script_file
+        script_file, properties,
     )
     ensure(code is not None, '缺少迁移名称')
     ensure(source_repository_code is not None, f'迁移({code})缺少来源仓库名称')
@@ -56,16 +92,19 @@ def transformer_create(
     ensure(repository is not None, f'来源仓库({source_repository_code})不存在')
     storage = storage_service.storage_find(target_repository_code, target_storage_code)
     ensure(storage is not None, f'目标仓库({target_repository_code})的存储单元({target_storage_code})不存在')
+    ensure_target_storage(storage)
     script_file = absolute_path(script_file)
+    properties = {name: value for name, value in properties.items() if bool(value)} if properties else {}
+    ensure_transformer_properties(code, repository, properties)
 
     with metadata.connect() as meta:
         transformer = meta.record('''
           insert into transformers
-            (code, source_id, target_id, script_file)
+            (code, source_id, target_id, script_file, properties)
           values
-            (?, ?, ?, ?)
+            (?, ?, ?, ?, ?)
           returning *
-        ''', code, repository.id, storage.id, script_file, constructor=Transformer._make)
+        ''', code, repository.id, storage.id, script_file, properties, constructor=Transformer._make)
         logger.info('创建迁移(%s)', code)
         logger.debug('transformer=%s', transformer)
 
@@ -75,22 +114,25 @@ def transformer_update(
         source_repository_code: str,
         target_repository_code: str,
         target_storage_code: str,
-        script_file: str
+        script_file: str,
+        properties: dict[str, Any] = None,
 ):
     """
     更新迁移信息。
     """
     logger.debug(
-        'code=%s, source_repository_code=%s, target_repository_code=%s, target_storage_code=%s, script_file=%s',
+        'code=%s, source_repository_code=%s, target_repository_code=%s, target_storage_code=%s, script_file=%s, properties=%s',
         code, source_repository_code,
         target_repository_code, target_storage_code,
-        script_file
+        script_file, properties,
     )
     ensure(code is not None, '缺少迁移名称')
+    properties = {key: value for key, value in properties.items() if value is not None} if properties else {}
     ensure(
         source_repository_code is not None
         or (target_repository_code is not None and target_storage_code is not None)
-        or script_file is not None,
+        or script_file is not None
+        or bool(properties),
         '缺少更新内容'
     )
 
@@ -100,13 +142,14 @@ def transformer_update(
     if source_repository_code is not None:
         repository = repository_service.repository_find(source_repository_code)
         ensure(repository is not None, f'来源仓库({source_repository_code})不存在')
-        source_id = repository.id
     else:
-        source_id = transformer.source_id
+        repository = repository_service.repository_find_by_id(transformer.source_id)
+    source_id = repository.id
 
     if target_repository_code is not None and target_storage_code is not None:
         storage = storage_service.storage_find(target_repository_code, target_storage_code)
         ensure(storage is not None, f'目标仓库({target_repository_code})的存储单元({target_storage_code})不存在')
+        ensure_target_storage(storage)
         target_id = storage.id
     else:
         target_id = transformer.target_id
@@ -116,6 +159,13 @@ def transformer_update(
     else:
         script_file = transformer.script_file
 
+    properties = {
+        key: value
+        for key, value in {**transformer.properties, **properties}.items()
+        if bool(value)  # 移除手工强制设为空值的项
+    }
+    ensure_transformer_properties(code, repository, properties)
+
     with metadata.connect() as meta:
         transformer = meta.record('''
           update
@@ -124,11 +174,12 @@ def transformer_update(
             source_id = ?,
             target_id = ?,
             script_file = ?,
+            properties = ?,
             updated_at = datetime(current_timestamp, 'localtime')
           where
             code = ?
           returning *
-        ''', source_id, target_id, script_file, code, constructor=Transformer._make)
+        ''', source_id, target_id, script_file, properties, code, constructor=Transformer._make)
         logger.info('更新迁移(%s)', code)
         logger.debug('transformer=%s', transformer)
 
@@ -228,8 +279,156 @@ def transformer_list(
         ''', *parameters, constructor=TransformerProjection._make)
 
 
+def transformer_target_find(transformer_id: int, storage_id: int) -> Optional[TransformerTarget]:
+    """
+    查找迁移的额外目标。
+    """
+    with metadata.connect() as meta:
+        return meta.record('''
+          select
+            *
+          from transformers_targets
+          where transformer_id = ?
+            and storage_id = ?
+        ''', transformer_id, storage_id, constructor=TransformerTarget._make)
+
+
+def transformer_bind(code: str, target_repository_code: str, target_storage_code: str):
+    """
+    为迁移绑定额外的目标存储单元：查询结果只计算一次，同时写入所有目标。
+    """
+    logger.debug('code=%s, target_repository_code=%s, target_storage_code=%s', code, target_repository_code, target_storage_code)
+    transformer = transformer_find(code)
+    ensure(transformer is not None, f'迁移({code})不存在')
+    storage = storage_service.storage_find(target_repository_code, target_storage_code)
+    ensure(storage is not None, f'目标仓库({target_repository_code})的存储单元({target_storage_code})不存在')
+    ensure_target_storage(storage)
+    ensure(storage.id != transformer.target_id, f'存储单元({target_storage_code})已是迁移({code})的目标')
+    ensure(transformer_target_find(transformer.id, storage.id) is None, f'迁移({code})与存储单元({target_storage_code})已绑定')
+    with metadata.connect() as meta:
+        target = meta.record('''
+          insert into transformers_targets
+            (transformer_id, storage_id)
+          values
+            (?, ?)
+          returning *
+        ''', transformer.id, storage.id, constructor=TransformerTarget._make)
+        logger.info('绑定迁移(%s)与仓库(%s)的存储单元(%s)', code, target_repository_code, target_storage_code)
+        logger.debug('target=%s', target)
+
+
+def transformer_unbind(code: str, target_repository_code: str, target_storage_code: str):
+    """
+    解绑迁移的额外目标存储单元。
+    """
+    logger.debug('code=%s, target_repository_code=%s, target_storage_code=%s', code, target_repository_code, target_storage_code)
+    transformer = transformer_find(code)
+    ensure(transformer is not None, f'迁移({code})不存在')
+    storage = storage_service.storage_find(target_repository_code, target_storage_code)
+    ensure(storage is not None, f'目标仓库({target_repository_code})的存储单元({target_storage_code})不存在')
+    ensure(transformer_target_find(transformer.id, storage.id) is not None, f'迁移({code})与存储单元({target_storage_code})未绑定')
+    with metadata.connect() as meta:
+        meta.execute('''
+          delete from transformers_targets
+          where transformer_id = ?
+            and storage_id = ?
+        ''', transformer.id, storage.id)
+        logger.info('解绑迁移(%s)与仓库(%s)的存储单元(%s)', code, target_repository_code, target_storage_code)
+
+
+def transformer_targets(transformer_id: int) -> list[tuple[Repository, Storage]]:
+    """
+    列出迁移绑定的额外目标：按绑定顺序返回目标仓库与存储单元。
+    """
+    with metadata.connect() as meta:
+        targets = meta.records('''
+          select
+            repositories.code as repository_code,
+            storages.code as storage_code
+          from
+            transformers_targets
+          inner join
+            storages
+          on
+            transformers_targets.storage_id = storages.id
+            and transformers_targets.transformer_id = ?
+          inner join
+            repositories
+          on
+            storages.repository_id = repositories.id
+          order by
+            transformers_targets.created_at,
+            storages.id
+        ''', transformer_id)
+    return [
+        (repository_service.repository_find(target.repository_code), storage_service.storage_find(target.repository_code, target.storage_code))
+        for target in targets
+    ]
+
+
 # 执行迁移
 
+def transformer_submit(code: str):
+    """
+    预先向来源仓库提交迁移的查询语句，使排队与计算时间与其他迁移重叠：只对支持异步查询的仓库生效。
+    增量迁移的脚本依赖执行时计算的文件列表、分区迁移执行的是拆分后的语句，设置了指纹的迁移可能被跳过，均不预先提交。
+    """
+    logger.debug('code=%s', code)
+    transformer = transformer_find(code)
+    if transformer is None or not exists(transformer.script_file):
+        return
+    if any(transformer.properties.get(name) for name in ('incremental', 'partition_column', 'fingerprint')):
+        return
+    source_repository = repository_service.repository_find_by_id(transformer.source_id)
+    source_repository.submit(slurp(transformer.script_file))
+
+
+@contextmanager
+def prepare_source(transformer: Transformer, repository: Repository, sql: str, files: Optional[list[str]]) -> Iterator[Statement]:
+    """
+    在来源仓库上准备迁移的查询语句：
+    - 指定分区列时，按分区并行读取，每个分区使用独立的连接。
+    - 增量迁移时，先定义获取新增或变化文件列表的宏。
+    """
+    if column := transformer.properties.get('partition_column'):
+        cursor = PartitionedCursor(repository, column, transformer.properties['partitions'])
+        with Statement(Executor(cursor), sql) as statement:
+            yield statement
+        return
+    with repository.connect() as connection:
+        if files is not None:
+            with connection.executor() as executor:
+                executor.execute(create_or_replace_macro(INCREMENTAL_FILES, files))
+        with connection.prepare(sql) as statement:
+            yield statement
+
+
+def fan_out(statement: Statement, targets: list[tuple[Repository, Storage]]):
+    """
+    将一份查询结果同时写入多个目标：
+    1. 按批次读取查询结果，缓存至内存中的DuckDB表；超出内存上限时由DuckDB溢出到临时文件。
+    2. 每个目标通过独立的DuckDB游标读取缓存，并行执行各自的写入逻辑。
+    3. 所有目标执行完毕后，任一目标失败则抛出其异常。
+    """
+    with connect_duckdb(':memory:', None) as buffer:
+        rows = load_frames(buffer, FAN_OUT_BUFFER, statement.frames())
+        logger.info('缓存查询结果%s行，同时写入%s个存储单元', rows, len(targets))
+
+        def transform(repository: Repository, storage: Storage):
+            with Connection(buffer.cursor()) as connection:
+                with connection.prepare(f'select * from {FAN_OUT_BUFFER}') as source:
+                    RepositoryKind.of(repository.kind).transform(source, repository, storage)
+            logger.info('迁移数据到仓库(%s)的存储单元(%s)', repository.code, storage.code)
+
+        with ThreadPoolExecutor(len(targets)) as pool:
+            futures = [pool.submit(transform, repository, storage) for repository, storage in targets]
+        for (repository, storage), future in zip(targets, futures):
+            if future.exception() is not None:
+                logger.error('迁移数据到仓库(%s)的存储单元(%s)失败：%s', repository.code, storage.code, future.exception())
+        for future in futures:
+            future.result()
+
+
 def transformer_execute(code: str):
     """
     执行迁移。
@@ -267,7 +466,29 @@ def transformer_execute(code: str):
         target_storage = storage_service.storage_find(context.target_repository_code, context.target_storage_code)
         kind = RepositoryKind.of(target_repository.kind)
 
-        with source_repository.connect() as source_connection:
-            with source_connection.prepare(sql) as statement:
+        targets = transformer_targets(transformer.id)
+        checksum = None
+        if fingerprint := transformer.properties.get('fingerprint'):
+            storages = [target_storage.id] + [storage.id for _, storage in targets]
+            checksum = fingerprint_service.fingerprint_compute(source_repository, fingerprint, sql, repr(storages))
+            if (saved := fingerprint_service.fingerprint_find(transformer.id)) is not None and saved.checksum == checksum:
+                logger.info('仓库(%s)的来源数据指纹未变化，跳过迁移(%s)', source_repository.code, code)
+                return
+
+        files, manifests = None, []
+        if pattern := transformer.properties.get('incremental'):
+            files, manifests = manifest_service.manifest_delta(transformer.id, source_repository.folder, pattern)
+            if not files:
+                manifest_service.manifest_save(manifests)
+                logger.info('仓库(%s)中匹配(%s)的文件未变化，跳过迁移(%s)', source_repository.code, pattern, code)
+                return
+
+        with prepare_source(transformer, source_repository, sql, files) as statement:
+            if targets:
+                fan_out(statement, [(target_repository, target_storage)] + targets)
+            else:
                 kind.transform(statement, target_repository, target_storage)
                 logger.info('从仓库(%s)迁移数据到仓库(%s)的存储单元(%s)', source_repository.code, target_repository.code, target_storage.code)
+        manifest_service.manifest_save(manifests)
+        if checksum is not None:
+            fingerprint_service.fingerprint_save(transformer.id, checksum)
@@ -1,23 +1,33 @@
 """
 数据迁移至多维表格，原理如下：
-1. 在来源仓库上执行SQL。
+1. 在来源仓库上执行SQL，并按多维表格现有字段的类型逐列转换成接口要求的取值。
 2. 对比查询结果与快照是否一致。
-3. 若快照已失效，则清空多维表格的记录。
-4. 清空多维表格后，再添加新记录到多维表格。
+3. 若快照已失效，则按每条记录的摘要与快照中的记录匹配：未变化的记录保留，变化的记录原地更新（记录编号不变），多余的记录删除，不足的记录新增。
+   因此多维表格中记录的顺序不再与查询结果的顺序（ORDER BY）一致：保留与更新的记录位置不变，新增的记录追加在末尾。
+   存储单元开启`rewrite`时，与早期版本一致：删除全部现有记录，再按查询结果的顺序重新新增。
+4. 删除、更新与新增的每一批成功后，立即将现有的记录及其摘要保存至本地缓存；
+   同步中断后再次执行时，已完成的部分按摘要匹配后保留，不会重复创建记录。
 5. 记录保存完成后，讲记录编码保存至本地缓存。
 """
 import logging
+from collections import defaultdict
+from itertools import zip_longest
 from typing import Any
 
+from pandas import DataFrame
+
 from duckcp.entity.statement import Statement
 from duckcp.entity.storage import Storage
-from duckcp.feishu.bitable import batch_delete, batch_create, Record
+from duckcp.feishu.bitable import batch_delete, batch_create, batch_update, cached_fields, Record, BATCH_CREATE_LIMIT, BATCH_DELETE_LIMIT, BATCH_UPDATE_LIMIT
+from duckcp.feishu.field_encoder import encode_frame
 from duckcp.helper.digest import sha256
 from duckcp.repository.bitable_repository import BiTableRepository
-from duckcp.service import snapshot_service
+from duckcp.service import snapshot_service, batch_size_service
 
 logger = logging.getLogger(__name__)
 
+MIN_BATCH_SIZE = 50  # 自适应调整批大小时的下限
+
 
 def digest(records: list[dict[str, Any]]) -> str:
     """
@@ -41,26 +51,84 @@ def bitable_transform(statement: Statement, repository: BiTableRepository, stora
     table = storage.properties['table']
     logger.debug('document=%s, table=%s', document, table)
 
-    # 1. 获取数据并计算摘要
-    records = statement.all()
+    # 1. 获取数据，按多维表格的字段类型逐列转换，并计算摘要
+    fields = cached_fields(authenticator(), document, table, repository.open_api)
+    columns, values = statement.execute()
+    records = encode_frame(DataFrame(values, columns=columns, dtype=object), fields)  # 保留原始取值：可空整数列不转为浮点数
     checksum = digest(records)
     logger.debug('records=%s, checksum=%s', records, checksum)
 
     # 2. 对比快照
     snapshot = snapshot_service.snapshot_find(storage.id)
-    if snapshot is not None and snapshot.checksum != checksum and bool(snapshot.records):
-        # 快照失效，先清空历史数据
-        batch_delete(authenticator(), document, table, snapshot.records)
-        logger.info('清空飞书文档(%s)多维表格(%s)', document, table)
-
-    # 3. 保存数据
-    if snapshot is None or snapshot.checksum != checksum and bool(records):
-        # 无快照或快照失效，则添加数据
-        records = batch_create(authenticator(), document, table, [
-            Record(fields=record)
-            for record in records
-        ])
-        snapshot_service.take_snapshot(storage.id, checksum, [record['record_id'] for record in records])
-        logger.info('保存飞书文档(%s)多维表格(%s)记录%s条', document, table, len(records))
-    else:
+    if snapshot is not None and snapshot.checksum == checksum:
         logger.info('飞书文档(%s)多维表格(%s)数据未变化', document, table)
+        return
+
+    # 3. 按摘要匹配现有记录：未变化的记录保留，其余的优先原地更新，多余的删除、不足的新增
+    existing: dict[str, str] = dict(zip_longest(snapshot.records, snapshot.digests[:len(snapshot.records)], fillvalue='')) if snapshot is not None else {}
+    digests = [digest([record]) for record in records]
+    available: dict[str, list[str]] = defaultdict(list)
+    for record_id, record_digest in existing.items():
+        available[record_digest].append(record_id)
+    changed = []  # 没有相同摘要的现有记录，需要写入的记录序号
+    for index, record_digest in enumerate(digests):
+        if available[record_digest]:
+            available[record_digest].pop()
+        else:
+            changed.append(index)
+    stale = [record_id for record_ids in available.values() for record_id in record_ids]
+    updating = list(zip(stale, changed))
+    deleting = stale[len(updating):]
+    creating = changed[len(updating):]
+    if storage.properties.get('rewrite'):  # 保持查询结果的顺序：删除全部现有记录后按顺序重新新增
+        changed = list(range(len(records)))
+        updating, deleting, creating = [], list(existing.keys()), changed
+    logger.info(
+        '同步飞书文档(%s)多维表格(%s)：保留%s条，更新%s条，删除%s条，新增%s条',
+        document, table, len(records) - len(changed), len(updating), len(deleting), len(creating),
+    )
+
+    # 4. 每批成功后立即记录现有的记录及其摘要：同步中断后再次执行时，只处理剩余的差异
+    def journal():
+        snapshot_service.snapshot_journal(storage.id, list(existing.keys()), list(existing.values()))
+
+    if deleting:
+        def deleted(bucket: list[str]):
+            for record_id in bucket:
+                existing.pop(record_id, None)
+            journal()
+
+        with batch_size_service.batch_size_tuning(storage.id, 'delete', MIN_BATCH_SIZE, BATCH_DELETE_LIMIT) as batcher:
+            batch_delete(authenticator(), document, table, deleting, batcher, deleted, repository.open_api)
+
+    if updating:
+        updates = {record_id: digests[index] for record_id, index in updating}
+
+        def updated(bucket: list[Record]):
+            for record in bucket:
+                existing[record['record_id']] = updates[record['record_id']]
+            journal()
+
+        with batch_size_service.batch_size_tuning(storage.id, 'update', MIN_BATCH_SIZE, BATCH_UPDATE_LIMIT) as batcher:
+            batch_update(authenticator(), document, table, [
+                Record(record_id=record_id, fields=records[index])
+                for record_id, index in updating
+            ], batcher, updated, repository.open_api)
+
+    if creating:
+        pending = iter([digests[index] for index in creating])  # 接口按提交顺序返回创建的记录
+
+        def created(bucket: list[Record]):
+            for record in bucket:
+                existing[record['record_id']] = next(pending)
+            journal()
+
+        with batch_size_service.batch_size_tuning(storage.id, 'create', MIN_BATCH_SIZE, BATCH_CREATE_LIMIT) as batcher:
+            batch_create(authenticator(), document, table, [
+                Record(fields=records[index])
+                for index in creating
+            ], batcher, created, repository.open_api)
+
+    # 5. 保存快照
+    snapshot_service.take_snapshot(storage.id, checksum, list(existing.keys()), list(existing.values()))
+    logger.info('保存飞书文档(%s)多维表格(%s)记录%s条', document, table, len(existing))
@@ -3,18 +3,31 @@
 1. 在来源仓库上执行SQL。
 2. 根据查询结果生成DELETE语句与INSERT语句。
 3. 先执行删除语句清空表。
-4. 再执行插入语句新增记录。
+4. 再执行插入语句新增记录：仓库限制了单条语句的参数个数时，每条语句插入多行，减少语句的执行次数；
+   每条语句的行数在参数个数上限内按吞吐量自适应调整，并保存供下次迁移使用。
+删除与插入在仓库提供的批量写入连接上执行，例如SQLite会在单个事务内完成。
 """
 import logging
+from itertools import chain
+from typing import Any, Sequence
 
+from duckcp.entity.partitioned_cursor import SQL_DIALECTS
 from duckcp.entity.repository import Repository
 from duckcp.entity.statement import Statement
 from duckcp.entity.storage import Storage
 from duckcp.helper.sql import delete_from, insert_into
+from duckcp.service import batch_size_service
 
 logger = logging.getLogger(__name__)
 
 
+def flatten(records: list[Sequence[Any]]) -> tuple[Any, ...]:
+    """
+    将多行记录展开成一条多行插入语句的参数。
+    """
+    return tuple(chain.from_iterable(records))
+
+
 def database_transform(statement: Statement, repository: Repository, storage: Storage):
     """
     将数据源迁移到关系型数据库表中。
@@ -22,15 +35,28 @@ def database_transform(statement: Statement, repository: Repository, storage: St
     catalog = storage.properties.get('catalog')
     schema = storage.properties.get('schema')
     table = storage.properties['table']
+    dialect = SQL_DIALECTS.get(repository.kind, 'duckdb')  # 按仓库方言生成参数占位符，例如Postgres使用%s
 
     # 通过sqlglot生成SQL，避免字符串转义或SQL注入等问题。
-    with repository.connect() as connection:
+    with repository.bulk_load() as connection:
         with connection.executor() as executor:
-            sql = delete_from(catalog, schema, table).sql()
+            sql = delete_from(catalog, schema, table).sql(dialect=dialect)
             logger.info('清空表(%s)', sql)
             executor.execute(sql)
 
             columns, records = statement.execute()
-            sql = insert_into(catalog, schema, table, columns).sql()
-            logger.info('批量添加数据(%s)', sql)
-            executor.batch(sql, records)
+            limit = repository.parameter_limit(connection)
+            if not limit or not columns:
+                sql = insert_into(catalog, schema, table, columns).sql(dialect=dialect)
+                logger.info('批量添加数据(%s)', sql)
+                executor.batch(sql, records)
+                return
+
+            maximum = max(1, limit // len(columns))
+            with batch_size_service.batch_size_tuning(storage.id, 'insert', 1, maximum) as batcher:
+                logger.info('批量添加数据：每条语句最多插入%s行，从%s行开始自适应调整', maximum, batcher.size)
+                statements: dict[int, str] = {}  # 按行数缓存生成的语句
+                for group in batcher.split(records):
+                    if len(group) not in statements:
+                        statements[len(group)] = insert_into(catalog, schema, table, columns, len(group)).sql(dialect=dialect)
+                    executor.batch(statements[len(group)], [flatten(group)])
@@ -1,15 +1,16 @@
 """
 数据迁移至DuckDB数据库表，原理如下：
-1. 在来源仓库上执行SQL，并将查询结果封装成DataFrame。
-2. 将DataFrame映射成DuckDB的只读视图。
-3. 执行`create ore replace table ... from ...`替换目标表内的数据。
+1. 在来源仓库上执行SQL，并按批次流式读取查询结果，每批封装成DataFrame。
+2. 将每批DataFrame依次映射成DuckDB的只读视图。
+3. 首批执行`create or replace table ... from ...`重建目标表，后续批次执行`insert into ... select ...`追加数据。
+4. 所有批次在同一事务内写入，提交后才替换目标表内的数据；失败则回滚，目标表保持原样。
+内存中最多只保留一批数据；目标表的字段类型由首批数据推断，后续批次的类型不一致时放宽为公共类型。
 """
 import logging
 
 from duckcp.entity.statement import Statement
 from duckcp.entity.storage import Storage
-from duckcp.helper.sql import create_or_replace_table
-from duckcp.repository.duckdb_repository import DuckDBRepository
+from duckcp.repository.duckdb_repository import DuckDBRepository, load_frames
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +25,12 @@ def duckdb_transform(statement: Statement, repository: DuckDBRepository, storage
 
     with repository.establish_connection() as connection:
         with connection.cursor() as cursor:
-            data = statement()
-            cursor.execute(f' set global pandas_analyze_sample = {len(data)} ')
-            cursor.register(storage.code, data)  # 表的全名是`temp.main.<table>`
-            # 通过sqlglot生成SQL，避免字符串转义或SQL注入等问题。
-            ast = create_or_replace_table(catalog, schema, table, storage.code)
-            sql = ast.sql(dialect='duckdb')
-            logger.debug('sql=%s', sql)
-            cursor.execute(sql)
+            cursor.begin()
+            try:
+                rows = load_frames(cursor, table, statement.frames(), catalog=catalog, schema=schema)
+            except BaseException:
+                cursor.rollback()
+                raise
+            else:
+                cursor.commit()
+            logger.debug('rows=%s', rows)
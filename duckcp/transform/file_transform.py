@@ -3,32 +3,51 @@
 1. 在来源仓库上执行SQL，并将查询结果封装成DataFrame。
 2. 将DataFrame映射成DuckDB的只读视图。
 3. 执行`COPY ... to ...`导出数据到本地文件。
+目标文件路径基于仓库目录解析成绝对路径，不依赖进程的工作目录，因此多个迁移可在不同线程中同时执行。
+输出为目录（分区导出或每线程独立文件）时，先导出到同级的暂存目录，成功后再原子地替换目标目录，
+读取方不会扫描到写了一半的数据；追加模式下直接写入目标目录。
 """
 import logging
+from os.path import join
 
 from duckcp.entity.statement import Statement
 from duckcp.entity.storage import Storage
-from duckcp.helper.fs import WorkDirectory
+from duckcp.helper.fs import version_folder, publish_folder, remove_folder
 from duckcp.helper.sql import copy_to
-from duckcp.repository.duckdb_repository import DuckDBRepository
+from duckcp.repository.file_repository import FileRepository
 
 logger = logging.getLogger(__name__)
 
 
-def file_transform(statement: Statement, repository: DuckDBRepository, storage: Storage):
+def file_transform(statement: Statement, repository: FileRepository, storage: Storage):
     """
     将数据源迁移到本地文件中。
     """
-    folder = repository.properties['folder']
-    with WorkDirectory(folder):
-        with repository.establish_connection() as connection:
-            with connection.cursor() as cursor:
-                data = statement()
-                cursor.execute(f' set global pandas_analyze_sample = {len(data)} ')
-                cursor.register(storage.code, data)  # 表的全名是`temp.main.<table>`
-                file_name = storage.properties.pop('file')
-                # 通过sqlglot生成SQL，避免字符串转义或SQL注入等问题。
-                ast = copy_to(storage.code, file_name, storage.properties)
-                sql = ast.sql(dialect='duckdb')
-                logger.debug('sql=%s', sql)
+    properties = dict(storage.properties)
+    file_name = join(repository.folder, properties.pop('file'))  # 绝对路径保持不变
+    staged = (
+            (bool(properties.get('partition_by')) or bool(properties.get('per_thread_output')))
+            and not properties.get('append')
+            and not properties.get('overwrite_or_ignore')
+    )
+    output = version_folder(file_name) if staged else file_name
+    logger.debug('file_name=%s, output=%s', file_name, output)
+
+    with repository.establish_connection() as connection:
+        with connection.cursor() as cursor:
+            data = statement()
+            cursor.execute(f' set global pandas_analyze_sample = {len(data)} ')
+            cursor.register(storage.code, data)  # 表的全名是`temp.main.<table>`
+            # 通过sqlglot生成SQL，避免字符串转义或SQL注入等问题。
+            ast = copy_to(storage.code, output, properties)
+            sql = ast.sql(dialect='duckdb')
+            logger.debug('sql=%s', sql)
+            try:
                 cursor.execute(sql)
+            except BaseException:
+                if staged:
+                    remove_folder(output)
+                raise
+
+    if staged:
+        publish_folder(output, file_name)
@@ -0,0 +1,58 @@
+"""
+数据迁移至MaxCompute(ODPS)表，原理如下：
+1. 在来源仓库上执行SQL，并按批次流式读取查询结果。
+2. 创建表通道的覆盖写入会话；指定分区时只覆盖该分区，分区不存在则自动创建。
+3. 每批数据以Arrow格式写入独立的数据块，多个数据块由线程池并行上传。
+4. 所有数据块上传成功后一次性提交，提交前目标表保持原样。
+内存中最多同时保留`threads + 1`批数据。
+"""
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from odps.tunnel import TableTunnel
+from pandas import DataFrame
+
+from duckcp.entity.statement import Statement
+from duckcp.entity.storage import Storage
+from duckcp.repository.odps_repository import OdpsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def odps_transform(statement: Statement, repository: OdpsRepository, storage: Storage):
+    """
+    将数据源迁移到MaxCompute表中。
+    """
+    catalog = storage.properties.get('catalog')
+    schema = storage.properties.get('schema')
+    table = storage.properties['table']
+    partition = storage.properties.get('partition')
+    threads = repository.threads
+
+    db = repository.odps
+    target = db.get_table(table, project=catalog, schema=schema)
+    session = TableTunnel(db).create_upload_session(target, partition_spec=partition, overwrite=True, create_partition=bool(partition))
+    logger.info('创建MaxCompute表(%s)的上传会话(%s)', target.full_table_name, session.id)
+
+    def upload(block: int, data: DataFrame) -> int:
+        with session.open_arrow_writer(block) as writer:
+            writer.write(data)
+        logger.debug('block=%s, rows=%s', block, len(data))
+        return len(data)
+
+    rows = 0
+    blocks = []
+    with ThreadPoolExecutor(threads) as pool:
+        uploads = deque()
+        for block, data in enumerate(statement.frames()):
+            if data.empty:
+                continue
+            blocks.append(block)
+            uploads.append(pool.submit(upload, block, data))
+            if len(uploads) > threads:
+                rows += uploads.popleft().result()
+        while uploads:
+            rows += uploads.popleft().result()
+    session.commit(blocks)
+    logger.info('上传%s个数据块，共%s行', len(blocks), rows)
@@ -0,0 +1,200 @@
+"""
+数据迁移至Postgres表：默认与其他关系型数据库相同，清空目标表后逐批插入；仓库启用暂存表时原理如下：
+1. 在目标表所在模式下创建结构相同的暂存表(UNLOGGED)。
+2. 在来源仓库上执行SQL，并按批次流式读取查询结果。
+3. 各批数据放入共享的有界队列，由多个写入连接并行取出，以CSV格式通过`COPY ... FROM STDIN`写入暂存表：
+   列表转为数组字面量，字典转为JSON，二进制转为十六进制。
+4. 所有写入连接提交成功后，在同一个事务内清空目标表、从暂存表复制数据并删除暂存表。
+替换前目标表保持原样；任一环节失败时删除暂存表，目标表不受影响。
+暂存表需要在目标模式下建表的权限，因此需要通过仓库选项启用。
+"""
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from io import StringIO
+from queue import Queue, Empty, Full
+from threading import Event
+from collections.abc import Mapping
+from datetime import date, time
+from time import perf_counter
+from typing import Optional, Any
+from uuid import uuid4
+
+from pandas import DataFrame
+from pandas.api.types import infer_dtype
+
+from duckcp.entity.statement import Statement
+from duckcp.entity.storage import Storage
+from duckcp.helper.serialization import json_encode
+from duckcp.helper.sql import create_staging_table, copy_from_stdin, delete_from, insert_from, drop_table
+from duckcp.repository.postgres_repository import PostgresRepository
+from duckcp.transform.database_transform import database_transform
+
+logger = logging.getLogger(__name__)
+
+WAIT_SECONDS = 0.1  # 等待队列时，检查是否已取消或失败的间隔
+PLAIN_TYPES = {'empty', 'string', 'integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean', 'datetime', 'datetime64', 'date', 'time'}  # CSV可直接写出的列类型
+
+
+def is_array(value: Any) -> bool:
+    """
+    判断取值是否为列表或数组。
+    """
+    return isinstance(value, (list, tuple)) or getattr(value, 'ndim', 0) > 0
+
+
+def element(value: Any) -> str:
+    """
+    数组字面量中的一个元素：嵌套列表转为子数组，其余取值加引号并转义。
+    """
+    if value is None:
+        return 'NULL'
+    elif is_array(value):
+        return array(value)
+    text = to_text(value)
+    if isinstance(text, bool):
+        text = 'true' if text else 'false'
+    text = text.isoformat() if isinstance(text, (date, time)) else str(text)
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def array(values: Any) -> str:
+    """
+    转为Postgres的数组字面量，例如`{"a","b"}`。
+    """
+    values = values.tolist() if hasattr(values, 'tolist') else values
+    return '{' + ','.join(map(element, values)) + '}'
+
+
+def to_text(value: Any) -> Any:
+    """
+    转为COPY可以识别的Postgres文本格式：列表转为数组字面量，字典转为JSON，二进制转为十六进制；其他取值保持不变。
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\x' + bytes(value).hex()
+    elif isinstance(value, Mapping):
+        return json_encode(value)
+    elif is_array(value):
+        return array(value)
+    return value
+
+
+def to_csv(data: DataFrame) -> StringIO:
+    """
+    将一批数据转为CSV：无法直接写出的列逐个转为Postgres的文本格式，可无损转为整数的浮点列按整数写出。
+    与Postgres的CSV格式一致，空值写成未加引号的空字段表示NULL，其余取值均加引号，因此空字符串不会被当成NULL。
+    """
+    data = data.convert_dtypes()
+    for name in data.columns:
+        if data[name].dtype == object and infer_dtype(data[name], skipna=True) not in PLAIN_TYPES:
+            data[name] = data[name].map(to_text, na_action='ignore')
+    buffer = StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator='\n')
+    writer.writerows(data.astype(object).where(data.notna(), None).itertuples(index=False, name=None))
+    buffer.seek(0)
+    return buffer
+
+
+def postgres_transform(statement: Statement, repository: PostgresRepository, storage: Storage):
+    """
+    将数据源迁移到Postgres表中。
+    """
+    if not repository.staging:
+        return database_transform(statement, repository, storage)
+
+    catalog = storage.properties.get('catalog')
+    schema = storage.properties.get('schema')
+    table = storage.properties['table']
+    staging = f'{table}_duckcp_{uuid4().hex[:8]}'
+
+    connection = repository.establish_connection()
+    try:
+        with connection.cursor() as cursor:
+            sql = create_staging_table(catalog, schema, table, staging).sql(dialect='postgres')
+            logger.info('创建暂存表(%s)', sql)
+            cursor.execute(sql)
+        connection.commit()
+        try:
+            columns = load(statement, repository, catalog, schema, staging)
+            with connection.cursor() as cursor:
+                cursor.execute(delete_from(catalog, schema, table).sql(dialect='postgres'))
+                if columns:
+                    cursor.execute(insert_from(catalog, schema, table, staging, columns).sql(dialect='postgres'))
+                    logger.info('替换表(%s)的数据，共%s行', table, cursor.rowcount)
+                cursor.execute(drop_table(catalog, schema, staging).sql(dialect='postgres'))
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(drop_table(catalog, schema, staging).sql(dialect='postgres'))
+                connection.commit()
+            except Exception as e:
+                logger.warning('删除暂存表(%s)失败：%s', staging, e)
+            raise
+    finally:
+        connection.close()
+
+
+def load(statement: Statement, repository: PostgresRepository, catalog: Optional[str], schema: Optional[str], staging: str) -> list[str]:
+    """
+    通过多个写入连接并行写入暂存表，返回查询结果的列名。
+    """
+    writers = repository.writers
+    queue = Queue(maxsize=writers)
+    cancelled = Event()
+
+    def write(number: int):
+        rows, elapsed = 0, 0.0
+        connection = repository.establish_connection()
+        try:
+            with connection.cursor() as cursor:
+                while not cancelled.is_set():
+                    try:
+                        data = queue.get(timeout=WAIT_SECONDS)
+                    except Empty:
+                        continue
+                    if data is None:
+                        break
+                    started_at = perf_counter()
+                    buffer = to_csv(data)
+                    cursor.copy_expert(copy_from_stdin(catalog, schema, staging, list(data.columns)).sql(dialect='postgres'), buffer)
+                    elapsed += perf_counter() - started_at
+                    rows += len(data)
+                else:
+                    connection.rollback()
+                    return
+            connection.commit()
+            logger.info('写入连接%s：写入%s行，耗时%.3f秒，%.0f行/秒', number, rows, elapsed, rows / elapsed if elapsed else 0)
+        finally:
+            connection.close()
+
+    def check(futures: list[Future]):
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def put(futures: list[Future], item: Optional[DataFrame]):
+        while True:
+            try:
+                return queue.put(item, timeout=WAIT_SECONDS)
+            except Full:
+                check(futures)
+
+    logger.info('通过%s个连接并行写入暂存表(%s)', writers, staging)
+    with ThreadPoolExecutor(writers) as pool:
+        futures = [pool.submit(write, number) for number in range(1, writers + 1)]
+        try:
+            columns = []
+            for data in statement.frames():
+                columns = list(data.columns)
+                if not data.empty:
+                    put(futures, data)
+            for _ in futures:
+                put(futures, None)
+            for future in futures:
+                future.result()
+        except BaseException:
+            cancelled.set()
+            raise
+    return columns
@@ -35,3 +35,9 @@ class CursorProtocol(Protocol):
         获取查询结果。
         """
         ...
+
+    def fetchmany(self, size: int) -> list[Sequence[Any]]:
+        """
+        获取下一批查询结果。
+        """
+        ...
@@ -0,0 +1,19 @@
+from collections.abc import Iterator
+from typing import Protocol, runtime_checkable
+
+from pandas import DataFrame
+
+from duckcp.typing.cursor_protocol import CursorProtocol
+
+
+@runtime_checkable
+class FrameCursorProtocol(CursorProtocol, Protocol):
+    """
+    一个抽象基类，定义可直接按批次返回DataFrame的游标协议：省去逐行转换的开销。
+    """
+
+    def fetch_frames(self, size: int) -> Iterator[DataFrame]:
+        """
+        按批次获取查询结果，每批最多包含`size`行记录；至少返回一批（可能为空）。
+        """
+        ...